@@ -0,0 +1,110 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+STEP_EXTENSIONS = (".step", ".stp")
+
+
+# Function to expand a directory, a glob pattern or a file into a list of STEP files
+def collect_step_files(pattern: str):
+    if os.path.isdir(pattern):
+        files = [
+            os.path.join(pattern, name)
+            for name in os.listdir(pattern)
+            if name.lower().endswith(STEP_EXTENSIONS)
+        ]
+    else:
+        files = glob.glob(pattern, recursive=True)
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+# Runs once in every worker so that the OCC imports are paid before the first part
+def _warm_worker():
+    import compute_step_properties  # noqa: F401
+    import is_sheet_metal  # noqa: F401
+    import OCC.Core.BRepAdaptor  # noqa: F401, imported lazily by get_holes
+
+
+# Function to analyze one part, never raises so that one bad file does not stop the batch
+def analyze_part(file_path: str):
+    from compute_step_properties import analyze_step_file
+    from get_holes import detect_holes
+    from is_sheet_metal import is_sheet_metal
+
+    start = time.perf_counter()
+    try:
+        analysis = analyze_step_file(file_path)
+        # the shape cache makes the following loads free
+        sheet_metal = is_sheet_metal(file_path)
+        holes = detect_holes(file_path)
+        return {
+            "file": file_path,
+            "ok": True,
+            "properties": analysis.to_dict(),
+            "is_sheet_metal": sheet_metal,
+            "holes": holes,
+            "elapsed_s": time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {
+            "file": file_path,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+            "elapsed_s": time.perf_counter() - start,
+        }
+
+
+# Function to analyze many parts over a process pool, yields results as they complete
+def analyze_batch(file_paths, workers=None):
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as executor:
+        # biggest files first so that a large part does not end up alone at the tail
+        ordered = sorted(file_paths, key=os.path.getsize, reverse=True)
+        futures = [executor.submit(analyze_part, path) for path in ordered]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyze a directory or glob of STEP files, one JSON line per part"
+    )
+    parser.add_argument("inputs", nargs="+", help="directories, glob patterns or STEP files")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("-o", "--output", default=None, help="write JSON lines to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    file_paths = []
+    for pattern in args.inputs:
+        file_paths.extend(collect_step_files(pattern))
+    if not file_paths:
+        parser.error("no STEP file found")
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    failures = 0
+    try:
+        for result in analyze_batch(file_paths, args.workers):
+            failures += not result["ok"]
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(file_paths)} parts, {failures} failed, {elapsed:.2f} s "
+        f"({len(file_paths) / elapsed:.2f} parts/s)",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Benchmark of the threejs edge export, one JSON file per edge against one merged buffer per shape.
+
+Every edge file is one more loader.load request and one more THREE.Line draw
+call in the browser, so the file count below is also the request and draw
+call count of the generated page.
+
+    python benchmarks/bench_edges.py [models/WP-15.step]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCC.Core.Tesselator import ShapeTesselator
+
+from utils import load_step_file
+from xLogic_threejs_renderer import export_edgedata_to_json, export_edges_to_json
+
+
+# Function to read the edge polylines of a shape the way ThreejsRenderer.DisplayShape does
+def edge_point_sets(shape, mesh_quality=1.0):
+    tess = ShapeTesselator(shape)
+    tess.Compute(compute_edges=True, mesh_quality=mesh_quality, parallel=True)
+    return [
+        [tess.GetEdgeVertex(i_edge, i_vert) for i_vert in range(tess.ObjEdgeGetVertexCount(i_edge))]
+        for i_edge in range(tess.ObjGetEdgeCount())
+    ]
+
+
+def write_per_edge(folder, point_sets):
+    total = 0
+    for i, point_set in enumerate(point_sets):
+        edge_hash = f"edg{i:08d}"
+        with open(os.path.join(folder, f"{edge_hash}.json"), "w") as f:
+            total += f.write(export_edgedata_to_json(edge_hash, point_set))
+    return len(point_sets), total
+
+
+def write_merged(folder, point_sets):
+    with open(os.path.join(folder, "edgmerged.json"), "w") as f:
+        return 1, f.write(export_edges_to_json("edgmerged", point_sets))
+
+
+def bench(name, point_sets, repeat=3):
+    print(f"{name}: {len(point_sets)} edges, {sum(len(p) for p in point_sets)} points")
+    for label, write in (("per edge", write_per_edge), ("merged", write_merged)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as folder:
+                files, size = write(folder, point_sets)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"  {label:>8}: {files} files / requests, {size / 1024:.1f} KiB, {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "models/WP-15.step"
+    bench(os.path.basename(file_path), edge_point_sets(load_step_file(file_path)))
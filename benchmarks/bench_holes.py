@@ -0,0 +1,96 @@
+"""Benchmark of hole detection on models/WP-15.step and a synthetic perforated plate.
+
+Compares the former face by face traversal, which adapts every shared edge
+twice, with find_holes_in_step on the unique edge index. The index is built
+on the first call for a shape and cached, so find_holes_in_step is timed cold
+(index dropped before every run, built again) and warm (index cached).
+
+    python benchmarks/bench_holes.py [--holes 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCC.Core.BRepAdaptor import BRepAdaptor_Curve
+from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox, BRepPrimAPI_MakeCylinder
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core.GeomAbs import GeomAbs_Circle
+from OCC.Core.TopAbs import TopAbs_EDGE, TopAbs_FACE
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopoDS import TopoDS_Compound
+from OCC.Core.gp import gp_Ax2, gp_Dir, gp_Pnt
+
+from get_holes import find_holes_in_step
+from shape_cache import CACHE_DIR, read_brep, write_brep
+from topology_index import forget_topology_index
+from utils import load_step_file
+
+
+# The traversal find_holes_in_step used before the edge index, kept for comparison
+def legacy_circle_count(shape):
+    count = 0
+    explorer_faces = TopExp_Explorer(shape, TopAbs_FACE)
+    while explorer_faces.More():
+        explorer_edges = TopExp_Explorer(explorer_faces.Current(), TopAbs_EDGE)
+        while explorer_edges.More():
+            if BRepAdaptor_Curve(explorer_edges.Current()).GetType() == GeomAbs_Circle:
+                count += 1
+            explorer_edges.Next()
+        explorer_faces.Next()
+    return count
+
+
+# Function to build (once, then cached as BRep) a 2 mm plate with a grid of through holes
+def perforated_plate(hole_count, pitch=5.0, radius=1.5, thickness=2.0):
+    path = os.path.join(CACHE_DIR, f"bench_perforated_{hole_count}.bbrep")
+    if os.path.exists(path):
+        return read_brep(path)
+    side = int(hole_count ** 0.5 + 0.999)
+    plate = BRepPrimAPI_MakeBox(side * pitch, side * pitch, thickness).Shape()
+    tools = TopoDS_Compound()
+    builder = BRep_Builder()
+    builder.MakeCompound(tools)
+    for i in range(hole_count):
+        x = (i % side + 0.5) * pitch
+        y = (i // side + 0.5) * pitch
+        axis = gp_Ax2(gp_Pnt(x, y, -1.0), gp_Dir(0, 0, 1))
+        builder.Add(tools, BRepPrimAPI_MakeCylinder(axis, radius, thickness + 2.0).Shape())
+    shape = BRepAlgoAPI_Cut(plate, tools).Shape()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_brep(shape, path)
+    return shape
+
+
+def bench(name, shape, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        circle_visits = legacy_circle_count(shape)
+    legacy = (time.perf_counter() - start) / repeat
+    cold = 0.0
+    for _ in range(repeat):
+        forget_topology_index(shape)
+        start = time.perf_counter()
+        holes, merged = find_holes_in_step(shape)
+        cold += time.perf_counter() - start
+    cold /= repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        find_holes_in_step(shape)
+    warm = (time.perf_counter() - start) / repeat
+    print(
+        f"{name}: {len(holes)} holes ({len(merged)} merged end circles), "
+        f"legacy traversal {legacy * 1000:.1f} ms for {circle_visits} circle visits, "
+        f"find_holes_in_step {cold * 1000:.1f} ms cold (index built), {warm * 1000:.1f} ms warm (index cached)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--holes", type=int, default=5000)
+    args = parser.parse_args()
+    bench("WP-15.step", load_step_file("models/WP-15.step"))
+    bench("perforated plate", perforated_plate(args.holes))
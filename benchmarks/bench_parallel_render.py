@@ -0,0 +1,64 @@
+"""Benchmark of DisplayShapes on a synthetic assembly of many small solids.
+
+Tessellates the same assembly with one worker and with a process pool, for
+both renderers.
+
+    python benchmarks/bench_parallel_render.py [--solids 200] [--workers 16]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox, BRepPrimAPI_MakeCylinder
+from OCC.Core.gp import gp_Ax2, gp_Dir, gp_Pnt
+
+from xLogic_threejs_renderer import ThreejsRenderer
+from xLogic_x3dom_renderer import XLogicX3DomRenderer
+
+
+# Function to build solid_count distinct brackets, a box with a few holes each
+def assembly(solid_count):
+    items = []
+    for i in range(solid_count):
+        x = (i % 20) * 60.0
+        y = (i // 20) * 60.0
+        solid = BRepPrimAPI_MakeBox(gp_Pnt(x, y, 0.0), 50.0, 40.0, 5.0 + i % 7).Shape()
+        for j in range(4):
+            axis = gp_Ax2(gp_Pnt(x + 8.0 + j * 11.0, y + 20.0, -1.0), gp_Dir(0, 0, 1))
+            solid = BRepAlgoAPI_Cut(solid, BRepPrimAPI_MakeCylinder(axis, 3.0, 20.0).Shape()).Shape()
+        items.append((solid, (0.65, 0.65, 0.7), f"bracket {i}"))
+    return items
+
+
+def bench(name, make_renderer, items, workers):
+    folder = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        make_renderer(folder).DisplayShapes(items, workers=workers, export_edges=True)
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--solids", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    items = assembly(args.solids)
+    for name, make_renderer in (
+        ("threejs", lambda folder: ThreejsRenderer(folder, use_cache=False)),
+        ("x3dom", lambda folder: XLogicX3DomRenderer(folder)),
+    ):
+        serial = bench(name, make_renderer, items, 1)
+        parallel = bench(name, make_renderer, items, args.workers)
+        print(
+            f"\n{name}: {len(items)} solids, 1 worker {serial:.2f} s, "
+            f"{args.workers} workers {parallel:.2f} s ({serial / parallel:.1f}x)"
+        )
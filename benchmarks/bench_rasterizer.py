@@ -0,0 +1,64 @@
+"""Benchmark of the NumPy software rasterizer used for headless thumbnails.
+
+Renders every standard view of a synthetic torus tessellated in about
+--triangles triangles, or of a STEP part (needs pythonocc), and writes the
+images to --output.
+
+    python benchmarks/bench_rasterizer.py [--triangles 100000] [--size 512] [--step part.step]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from png_io import write_png
+from software_render import VIEW_CAMERAS, render_mesh
+
+
+# Function to tessellate a torus in about triangle_count triangles
+def synthetic_torus(triangle_count, major_radius=40.0, minor_radius=12.0):
+    rings = max(3, int(np.sqrt(triangle_count / 2)))
+    u, v = np.meshgrid(np.linspace(0.0, 2.0 * np.pi, rings, endpoint=False), np.linspace(0.0, 2.0 * np.pi, rings, endpoint=False), indexing="ij")
+    radius = major_radius + minor_radius * np.cos(v)
+    vertices = np.column_stack(
+        (radius.ravel() * np.cos(u.ravel()), radius.ravel() * np.sin(u.ravel()), minor_radius * np.sin(v.ravel()))
+    )
+    i, j = np.meshgrid(np.arange(rings), np.arange(rings), indexing="ij")
+    a = (i * rings + j).ravel()
+    b = (((i + 1) % rings) * rings + j).ravel()
+    c = (i * rings + (j + 1) % rings).ravel()
+    d = (((i + 1) % rings) * rings + (j + 1) % rings).ravel()
+    triangles = np.concatenate((np.column_stack((a, b, d)), np.column_stack((a, d, c))))
+    return vertices, triangles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--triangles", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--step", help="render this STEP file instead of the torus")
+    parser.add_argument("--output", default="bench_rasterizer")
+    args = parser.parse_args()
+
+    if args.step:
+        from software_render import mesh_from_shape
+        from utils import load_step_file
+
+        start = time.perf_counter()
+        vertices, triangles = mesh_from_shape(load_step_file(args.step))
+        print(f"tessellation: {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        vertices, triangles = synthetic_torus(args.triangles)
+    print(f"{len(triangles)} triangles, {args.size}x{args.size} pixels")
+
+    os.makedirs(args.output, exist_ok=True)
+    for view in VIEW_CAMERAS:
+        start = time.perf_counter()
+        width, height, rgb = render_mesh(vertices, triangles, view, args.size, args.size)
+        elapsed = time.perf_counter() - start
+        write_png(os.path.join(args.output, f"{view}.png"), width, height, rgb)
+        print(f"{view:>6}: {elapsed * 1000:8.1f} ms")
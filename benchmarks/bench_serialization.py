@@ -0,0 +1,90 @@
+"""Benchmark of the edge serialization on a synthetic set of polylines.
+
+Compares the former exports, a Python list dumped with json.dumps(indent=4)
+for threejs and a string built with += per point for X3D, with geometry_io:
+packed float32 as base64 in the JSON document, as a raw sidecar file, and the
+X3D coordinate text.
+
+    python benchmarks/bench_serialization.py [--points 1000000] [--edges 1000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geometry_io import buffer_geometry_json, format_points, merge_point_sets
+
+
+# The threejs export used before geometry_io, kept for comparison
+def legacy_threejs_json(point_sets):
+    points_coordinates = []
+    for point_set in point_sets:
+        for point in point_set:
+            points_coordinates.extend(iter(point))
+    return json.dumps({"data": {"attributes": {"position": {"array": points_coordinates}}}}, indent=4)
+
+
+# The X3D export used before geometry_io, kept for comparison
+def legacy_x3d_points(point_sets):
+    str_x3d = ""
+    for point_set in point_sets:
+        for p in point_set:
+            str_x3d += f"{p[0]} {p[1]} {p[2]} "
+    return str_x3d
+
+
+# Function to build edge_count helices of about point_count points in total, as discretized edges come
+def synthetic_point_sets(point_count, edge_count):
+    per_edge = max(2, point_count // edge_count)
+    t = np.linspace(0.0, 4.0 * np.pi, per_edge)
+    point_sets = []
+    for i in range(edge_count):
+        points = np.column_stack((10.0 * np.cos(t) + i, 10.0 * np.sin(t), t * 3.7 + 0.001 * i))
+        point_sets.append([tuple(point) for point in points.tolist()])
+    return point_sets
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--edges", type=int, default=1000)
+    args = parser.parse_args()
+
+    point_sets = synthetic_point_sets(args.points, args.edges)
+    print(f"{sum(len(p) for p in point_sets)} points in {len(point_sets)} edges")
+
+    def merged_json(precision=None, sidecar_path=None):
+        positions, indices, edge_offsets = merge_point_sets(point_sets)
+        document = buffer_geometry_json(
+            "edges", positions, indices, {"edge_offsets": edge_offsets.tolist()}, precision, sidecar_path
+        )
+        return json.dumps(document, separators=(",", ":"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        sidecar_path = os.path.join(folder, "edges.bin")
+        results = [
+            ("threejs legacy json", *timed(legacy_threejs_json, point_sets)),
+            ("threejs base64", *timed(merged_json)),
+            ("threejs base64, 3 decimals", *timed(merged_json, 3)),
+            ("threejs sidecar", *timed(merged_json, None, sidecar_path)),
+        ]
+        sidecar_size = os.path.getsize(sidecar_path)
+    results += [
+        ("x3d legacy +=", *timed(legacy_x3d_points, point_sets)),
+        ("x3d format_points", *timed(lambda: " ".join(format_points(p) for p in point_sets))),
+    ]
+    for name, output, elapsed in results:
+        size = len(output) + (sidecar_size if name == "threejs sidecar" else 0)
+        print(f"{name:>28}: {elapsed * 1000:8.1f} ms, {size / 1024 / 1024:7.2f} MiB")
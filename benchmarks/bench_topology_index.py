@@ -0,0 +1,50 @@
+"""Benchmark of the topology index cache: built cold, read back from disk, found in memory.
+
+The disk tier only pays off when reading the arrays back is faster than
+building them again, the numbers below tell whether it does for a part.
+
+    python benchmarks/bench_topology_index.py [models/WP-15.step]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology_index import TopologyIndex, TopologyIndexCache
+from utils import load_step_file, shape_cache_key
+
+
+def timed(function, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def bench(file_path, repeat=5):
+    shape = load_step_file(file_path)
+    shape_key = shape_cache_key(file_path)
+    index, build = timed(lambda: TopologyIndex.build(shape), repeat)
+    print(f"{os.path.basename(file_path)}: {index.face_count} faces, {index.edge_count} edges")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = TopologyIndexCache(directory=folder)
+        _, cold = timed(lambda: cache.get(shape, shape_key), 1)
+
+        def from_disk():
+            cache.clear()
+            return cache.get(shape, shape_key)
+
+        _, disk = timed(from_disk, repeat)
+        _, memory = timed(lambda: cache.get(shape, shape_key), repeat)
+        _, key = timed(lambda: shape_cache_key(file_path), repeat)
+    print(f"  build       : {build * 1000:8.2f} ms")
+    print(f"  cold (+save): {cold * 1000:8.2f} ms")
+    print(f"  disk        : {disk * 1000:8.2f} ms")
+    print(f"  memory      : {memory * 1000:8.3f} ms")
+    print(f"  shape key   : {key * 1000:8.2f} ms (hash of the STEP file, paid by callers without one)")
+
+
+if __name__ == "__main__":
+    bench(sys.argv[1] if len(sys.argv) > 1 else "models/WP-15.step")
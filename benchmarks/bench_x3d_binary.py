@@ -0,0 +1,90 @@
+"""Benchmark of the XLogicX3DomRenderer mesh formats on the STEP files of models/.
+
+Prints, for each model and mesh format (ascii TriangleSet text, binary and
+quantized BinaryGeometry), the export time and the bytes the browser has to
+download. Before exporting, the quantized coordinates of every solid are
+decoded back and checked to be within half a quantization step. With --keep
+the pages are left in a folder; serve it with python -m http.server and open
+<model>-<format>/index.html, the browser console prints the load time of the
+scene.
+
+    python benchmarks/bench_x3d_binary.py [--keep DIR] [models/*.step ...]
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCC.Core.Tesselator import ShapeTesselator
+from OCC.Core.TopAbs import TopAbs_SOLID
+from OCC.Core.TopExp import TopExp_Explorer
+
+from geometry_io import INT16_MAX, as_points, dequantize_positions, quantize_positions
+from utils import load_step_file
+from xLogic_x3dom_renderer import MESH_FORMATS, XLogicX3DomRenderer
+
+
+def solids(shape):
+    explorer = TopExp_Explorer(shape, TopAbs_SOLID)
+    found = []
+    while explorer.More():
+        found.append(explorer.Current())
+        explorer.Next()
+    return found or [shape]
+
+
+# Function to check the int16 round trip of the mesh coordinates of a shape, returns the largest error
+def quantization_error(shape, mesh_quality=1.0):
+    tesselator = ShapeTesselator(shape)
+    tesselator.Compute(mesh_quality=mesh_quality, parallel=True)
+    positions = as_points(tesselator.GetVerticesPositionAsTuple())
+    coords, center, size = quantize_positions(positions)
+    error = np.abs(dequantize_positions(coords, center, size) - positions).max(axis=0, initial=0.0)
+    # rounding to the nearest step, plus float64 noise
+    bound = size / INT16_MAX / 2.0 * (1.0 + 1e-6)
+    assert (error <= bound).all(), f"quantization error {error} above half a step {bound}"
+    return float(error.max())
+
+
+def bench(file_path, folder):
+    shape = load_step_file(file_path)
+    parts = solids(shape)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    error = max(quantization_error(part) for part in parts)
+    print(f"\n{name:>14} quantized: max round trip error {error:.3g} mm")
+    for mesh_format in MESH_FORMATS:
+        path = os.path.join(folder, f"{name}-{mesh_format}")
+        os.makedirs(path, exist_ok=True)
+        renderer = XLogicX3DomRenderer(path=path, mesh_format=mesh_format)
+        start = time.perf_counter()
+        for part in parts:
+            renderer.DisplayShape(part)
+        renderer.generate_html_file(False, 1.0)
+        elapsed = time.perf_counter() - start
+        report = renderer.size_report()
+        print(
+            f"\n{name:>14} {mesh_format:>9}: {len(parts)} solids, "
+            f"{report['total_bytes'] / 1024:9.1f} KiB, export {elapsed * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", nargs="*", help="STEP files, all of models/ by default")
+    parser.add_argument("--keep", help="folder where the generated pages are left")
+    args = parser.parse_args()
+    file_paths = args.inputs or sorted(glob.glob("models/*.step") + glob.glob("models/*.STEP") + glob.glob("models/*.stp"))
+    folder = args.keep or tempfile.mkdtemp()
+    try:
+        for file_path in file_paths:
+            bench(file_path, folder)
+    finally:
+        if not args.keep:
+            shutil.rmtree(folder)
@@ -0,0 +1,91 @@
+"""Benchmark of the X3D export memory on synthetic triangle sets and edges.
+
+Compares the former export, the whole document built with += and then parsed
+and serialized again by ElementTree, with X3DWriter streaming to the file.
+
+    python benchmarks/bench_x3d_writer.py [--shapes 20] [--triangles 50000] [--edges 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.etree import ElementTree
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geometry_io import format_points
+from x3d_writer import X3DWriter
+
+
+# Function to build a TriangleSet fragment the size of what the tesselator exports
+def synthetic_triangle_set(triangle_count, seed):
+    points = np.random.default_rng(seed).random((triangle_count * 3, 3)) * 100.0
+    return (
+        "<TriangleSet solid='false'>"
+        f"<Coordinate point='{format_points(points)}'/>"
+        f"<Normal vector='{format_points(points / 100.0)}'/>"
+        "</TriangleSet>\n"
+    )
+
+
+def edge_point_sets(edge_count):
+    t = np.linspace(0.0, 1.0, 50)
+    for i in range(edge_count):
+        yield np.column_stack((t * i, t, t * 0.5))
+
+
+def legacy_export(file_path, shape_count, triangle_count, edge_count):
+    x3dfile_str = "<X3D><Scene>"
+    for i in range(shape_count):
+        x3dfile_str += f"<Shape DEF='shape{i}'><Appearance><Material diffuseColor='0.65 0.65 0.7'/></Appearance>"
+        x3dfile_str += synthetic_triangle_set(triangle_count, i)
+        x3dfile_str += "</Shape>\n"
+    for ils_id, points in enumerate(edge_point_sets(edge_count)):
+        x3dfile_str += f"<Shape DEF='edg{ils_id}'><LineSet vertexCount='{len(points)}'><Coordinate point='"
+        for p in points:
+            x3dfile_str += f"{p[0]} {p[1]} {p[2]} "
+        x3dfile_str += "'/></LineSet></Shape>\n"
+    x3dfile_str += "</Scene></X3D>\n"
+    xml_et = ElementTree.fromstring(x3dfile_str)
+    with open(file_path, "w") as f:
+        f.write(ElementTree.tostring(xml_et, encoding="utf8").decode("utf8"))
+
+
+def streamed_export(file_path, shape_count, triangle_count, edge_count):
+    with X3DWriter(file_path) as writer:
+        writer.header("bench")
+        for i in range(shape_count):
+            writer.start("Shape", {"DEF": f"shape{i}"})
+            writer.raw("<Appearance><Material diffuseColor='0.65 0.65 0.7'/></Appearance>")
+            writer.raw(synthetic_triangle_set(triangle_count, i))
+            writer.end("Shape")
+        for ils_id, points in enumerate(edge_point_sets(edge_count)):
+            writer.start("Shape", {"DEF": f"edg{ils_id}"})
+            writer.raw(f"<LineSet vertexCount='{len(points)}'><Coordinate point='{format_points(points)}'/></LineSet>")
+            writer.end("Shape")
+        writer.footer()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shapes", type=int, default=20)
+    parser.add_argument("--triangles", type=int, default=50000)
+    parser.add_argument("--edges", type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        for name, export in (("legacy += and ElementTree", legacy_export), ("X3DWriter", streamed_export)):
+            file_path = os.path.join(folder, "shape.x3d")
+            tracemalloc.start()
+            start = time.perf_counter()
+            export(file_path, args.shapes, args.triangles, args.edges)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{name:>26}: {elapsed:6.2f} s, peak {peak / 1024 / 1024:7.1f} MiB "
+                f"for a {os.path.getsize(file_path) / 1024 / 1024:.1f} MiB file"
+            )
@@ -1,3 +1,6 @@
+import time
+from dataclasses import dataclass, field, fields
+
 from OCC.Core.GProp import GProp_GProps
 from OCC.Core.BRepGProp import brepgprop
 from OCC.Core.TopoDS import topods, TopoDS_Shape, TopoDS_Face
@@ -9,7 +12,8 @@ from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.TopExp import TopExp_Explorer
 from OCC.Core.TopExp import topexp
 
-from utils import load_step_file
+from topology_index import get_topology_index
+from utils import load_step_file, shape_cache_key
 
 # Conversion functions
 def mm_to_cm(mm):
@@ -73,13 +77,18 @@ def compute_edge_length_mm(edge):
     return props.Mass()  # Mass here refers to the length of the edge
 
 # Function to compute the perimeter along the breadth and height for one face
-def compute_perimeter_of_face_mm(face: TopoDS_Face, tolerance=1e-3):
+def compute_perimeter_of_face_mm(face: TopoDS_Face, tolerance=1e-3, edges=None):
+    """edges: the unique edges of the face, e.g. from its TopologyIndex, explored if None"""
     total_perimeter = 0.0
-    explorer = TopExp_Explorer(face, TopAbs_EDGE)
+    if edges is None:
+        edges = []
+        explorer = TopExp_Explorer(face, TopAbs_EDGE)
+        while explorer.More():
+            edges.append(topods.Edge(explorer.Current()))
+            explorer.Next()
     
     # Iterate through all edges of the face
-    while explorer.More():
-        edge = topods.Edge(explorer.Current())
+    for edge in edges:
         edge_length = compute_edge_length_mm(edge)
         
         # Get the points of the edge
@@ -91,8 +100,6 @@ def compute_perimeter_of_face_mm(face: TopoDS_Face, tolerance=1e-3):
         # Check if the edge lies along the Y-axis (breadth) or Z-axis (height)
         if abs(p1.X() - p2.X()) < tolerance:  # The edge runs along the YZ plane (perpendicular to X)
             total_perimeter += edge_length
-        
-        explorer.Next()
 
     return total_perimeter
 
@@ -132,48 +139,145 @@ def compute_bounding_box_volume_mm3(shape: TopoDS_Shape):
     length, breadth, height = compute_bounding_box_mm(shape)
     return length * breadth * height
 
+# Result of a single pass analysis of a shape, all lengths in mm
+@dataclass
+class StepAnalysis:
+    length: float
+    breadth: float
+    height: float
+    surface_area_mm2: float
+    volume_mm3: float
+    edge_count: int
+    face_count: int
+    bounding_box_volume_mm3: float
+    largest_face_index: int  # index in face_areas_mm2, -1 if the shape has no face
+    largest_face_area_mm2: float
+    largest_face_perimeter_mm: float
+    face_areas_mm2: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)  # seconds spent per metric
+    largest_face: TopoDS_Face = field(default=None, repr=False, compare=False)
+
+    def to_dict(self):
+        # not asdict, which would deep copy the TopoDS_Face only to drop it
+        result = {}
+        for f in fields(self):
+            if f.name != "largest_face":
+                value = getattr(self, f.name)
+                # the lists and dicts only hold numbers, a shallow copy detaches them
+                result[f.name] = value.copy() if isinstance(value, (list, dict)) else value
+        return result
+
+# Function to analyze a shape visiting each unique face and edge exactly once
+def analyze_shape(shape: TopoDS_Shape, tolerance=1e-3, shape_key=None):
+    timings = {}
+
+    start = time.perf_counter()
+    bbox = Bnd_Box()
+    brepbndlib.Add(shape, bbox)
+    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
+    length, breadth, height = xmax - xmin, ymax - ymin, zmax - zmin
+    timings["bounding_box"] = time.perf_counter() - start
+
+    # unique faces and edges, shared with the other recognizers through the cache
+    start = time.perf_counter()
+    index = get_topology_index(shape, shape_key)
+    timings["topology"] = time.perf_counter() - start
+
+    # Faces shared by several solids/shells are only measured once
+    start = time.perf_counter()
+    face_areas = []
+    largest_face = None
+    largest_face_index = -1
+    largest_area = 0.0
+    for i, face in enumerate(index.faces()):
+        area = compute_surface_area_mm2(face)
+        face_areas.append(area)
+        if area > largest_area:
+            largest_area = area
+            largest_face = face
+            largest_face_index = i
+    surface_area = sum(face_areas)
+    timings["faces"] = time.perf_counter() - start
+    edge_count = index.edge_count
+
+    start = time.perf_counter()
+    volume = compute_volume_mm3(shape)
+    timings["volume"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    perimeter = 0.0
+    if largest_face is not None:
+        edges = [index.edge(edge_id) for edge_id in index.edges_of_face(largest_face_index)]
+        perimeter = compute_perimeter_of_face_mm(largest_face, tolerance, edges)
+    timings["largest_face_perimeter"] = time.perf_counter() - start
+
+    return StepAnalysis(
+        length=length,
+        breadth=breadth,
+        height=height,
+        surface_area_mm2=surface_area,
+        volume_mm3=volume,
+        edge_count=edge_count,
+        face_count=len(face_areas),
+        bounding_box_volume_mm3=length * breadth * height,
+        largest_face_index=largest_face_index,
+        largest_face_area_mm2=largest_area,
+        largest_face_perimeter_mm=perimeter,
+        face_areas_mm2=face_areas,
+        timings=timings,
+        largest_face=largest_face,
+    )
+
 # Main function to analyze the STEP file
-def analyze_step_file(file_path: str):
-    # Load STEP file
+def analyze_step_file(file_path: str, tolerance=1e-3):
+    start = time.perf_counter()
     shape = load_step_file(file_path)
-    
-    # Calculate length, breadth, and height
-    length, breadth, height = compute_bounding_box_mm(shape)
+    load_time = time.perf_counter() - start
+
+    analysis = analyze_shape(shape, tolerance, shape_cache_key(file_path))
+    analysis.timings = {"load": load_time, **analysis.timings}
+    return analysis
+
+# Function to print an analysis in mm, cm and inches
+def print_analysis(analysis: StepAnalysis):
+    length, breadth, height = analysis.length, analysis.breadth, analysis.height
     print(f"Length: {length:.2f} mm ({mm_to_cm(length):.2f} cm, {mm_to_inches(length):.2f} inches)")
     print(f"Breadth: {breadth:.2f} mm ({mm_to_cm(breadth):.2f} cm, {mm_to_inches(breadth):.2f} inches)")
     print(f"Height: {height:.2f} mm ({mm_to_cm(height):.2f} cm, {mm_to_inches(height):.2f} inches)")
 
     print("--------------------------------")
-    
-    # Calculate surface area
-    surface_area_mm2 = compute_surface_area_mm2(shape)
+
+    surface_area_mm2 = analysis.surface_area_mm2
     surface_area_in2 = mm2_to_in2(surface_area_mm2)
     print(f"Surface Area: {surface_area_mm2:.2f} mm² ({mm_to_cm(surface_area_mm2):.2f} cm², {surface_area_in2:.2f} in²)")
 
     print("--------------------------------")
-    
-    # Calculate volume
-    volume_mm3 = compute_volume_mm3(shape)
+
+    volume_mm3 = analysis.volume_mm3
     volume_in3 = mm3_to_in3(volume_mm3)
     print(f"Volume: {volume_mm3:.2f} mm³ ({mm_to_cm(volume_mm3):.2f} cm³, {volume_in3:.2f} in³)")
 
     print("--------------------------------")
-    
-    # Count edges and faces
-    edge_count, face_count = count_edges_faces(shape)
-    print(f"Number of Edges: {edge_count}, Number of Faces: {face_count}")
+
+    print(f"Number of Edges: {analysis.edge_count}, Number of Faces: {analysis.face_count}")
 
     print("--------------------------------")
-    
-    # Bounding box volume
-    boundingbox_volume_mm3 = compute_bounding_box_volume_mm3(shape)
+
+    boundingbox_volume_mm3 = analysis.bounding_box_volume_mm3
     boundingbox_volume_in3 = mm3_to_in3(boundingbox_volume_mm3)
     print(f"Bounding Box Volume: {boundingbox_volume_mm3:.2f} mm³, {mm_to_cm(boundingbox_volume_mm3):.2f} cm³, {boundingbox_volume_in3:.2f} inches³")
     print("--------------------------------")
 
+    print(f"Largest face area: {analysis.largest_face_area_mm2:.2f} mm²")
+    perimeter_mm = analysis.largest_face_perimeter_mm
+    print(f"Perimeter (Breadth and Height) for the largest face: {perimeter_mm:.2f} mm ({mm_to_inches(perimeter_mm):.2f} inches)")
+    print("--------------------------------")
+
+    for metric, seconds in analysis.timings.items():
+        print(f"{metric}: {seconds * 1000:.1f} ms")
+
 
 if __name__ == "__main__":
     # Example usage
     file_path = 'models/Plate_2.step'  # Update with your file path
-    analyze_step_file(file_path)
-    compute_perimeter_of_largest_face_mm(load_step_file(file_path))
+    print_analysis(analyze_step_file(file_path))
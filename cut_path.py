@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+
+# Cutting process written in the quote when none is given
+DEFAULT_CUT_TYPE = "Laser"
+
+
+# Cut path of a flat part, lengths in mm
+@dataclass
+class CutPath:
+    total_length: float
+    pierce_count: int  # one pierce per closed loop
+    outer_length: float
+    inner_lengths: list = field(default_factory=list)  # one per cutout
+    face_id: int = -1  # the main face in the TopologyIndex of the part
+
+    @property
+    def loop_lengths(self):
+        return [self.outer_length] + self.inner_lengths
+
+    def to_cutting(self, cut_type=DEFAULT_CUT_TYPE):
+        """The cutting section of request_schema.jsonc"""
+        return {"type": cut_type, "perimeter_length": self.total_length}
+
+    def to_dict(self):
+        return {
+            "total_length": self.total_length,
+            "pierce_count": self.pierce_count,
+            "outer_length": self.outer_length,
+            "inner_lengths": self.inner_lengths,
+        }
+
+
+# Function to find the main face of a sheet, the planar face with the largest extent
+def find_main_face(index):
+    """
+    Faces are compared by the area of their parameter box, which does not
+    subtract the cutouts, so the two sides of the sheet tie and either is
+    returned; both have the same outline.
+    Returns:
+        the face id, -1 if the part has no planar face
+    """
+    from OCC.Core.BRepTools import breptools
+    from OCC.Core.GeomAbs import GeomAbs_Plane
+
+    best_id, best_area = -1, 0.0
+    for face_id in index.faces_of_type(GeomAbs_Plane):
+        umin, umax, vmin, vmax = breptools.UVBounds(index.face(face_id))
+        area = (umax - umin) * (vmax - vmin)
+        if area > best_area:
+            best_id, best_area = int(face_id), area
+    return best_id
+
+
+def _wire_edge_ids(index, wire):
+    from OCC.Core.TopAbs import TopAbs_EDGE
+    from OCC.Core.TopExp import TopExp_Explorer
+
+    edge_ids = []
+    explorer = TopExp_Explorer(wire, TopAbs_EDGE)
+    while explorer.More():
+        edge_ids.append(index.edge_id(explorer.Current()))
+        explorer.Next()
+    return edge_ids
+
+
+# Function to compute the laser cut path of a sheet: its outline and every cutout
+def compute_cut_path(shape, face_id=None, index=None):
+    """
+    The cut path is the outer wire of the main face of the sheet plus all its
+    inner wires, each a closed loop cut after one pierce. Edge lengths come
+    from the topology index, so each edge is measured once per part.
+    For a bent part only the main face is followed, not its flanges.
+    face_id: the face to cut along, the main face of the sheet if None
+    index: the TopologyIndex of shape, taken from the topology index cache if None
+    """
+    from OCC.Core.BRepTools import breptools
+    from OCC.Core.TopAbs import TopAbs_WIRE
+    from OCC.Core.TopExp import TopExp_Explorer
+
+    from topology_index import get_topology_index
+
+    if index is None:
+        index = get_topology_index(shape)
+    if face_id is None:
+        face_id = find_main_face(index)
+    if face_id < 0:
+        raise ValueError("No planar face to cut along in the shape.")
+    face = index.face(face_id)
+    outer_wire = breptools.OuterWire(face)
+
+    outer_length = 0.0
+    inner_lengths = []
+    explorer = TopExp_Explorer(face, TopAbs_WIRE)
+    while explorer.More():
+        wire = explorer.Current()
+        length = float(index.edge_lengths(_wire_edge_ids(index, wire)).sum())
+        if wire.IsSame(outer_wire):
+            outer_length = length
+        else:
+            inner_lengths.append(length)
+        explorer.Next()
+    return CutPath(
+        total_length=outer_length + sum(inner_lengths),
+        pierce_count=1 + len(inner_lengths),
+        outer_length=outer_length,
+        inner_lengths=inner_lengths,
+        face_id=face_id,
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from utils import load_step_file
+
+    for file_path in sys.argv[1:] or ["models/Plate_1.step"]:
+        shape = load_step_file(file_path)
+        start = time.perf_counter()
+        cut_path = compute_cut_path(shape)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{file_path}: {cut_path.total_length:.2f} mm cut, {cut_path.pierce_count} pierces, "
+            f"outline {cut_path.outer_length:.2f} mm ({elapsed * 1000:.1f} ms)"
+        )
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+
+# Function to hash a file's bytes without loading it all in memory
+def hash_file(file_path: str, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """A directory of files keyed by hash, evicted least recently used first
+    once the total size goes over max_bytes.
+
+    Recency is tracked with the file modification time, which is bumped on
+    every hit, so the store survives process restarts and can be shared by
+    several processes.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, suffix=".bin"):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def path_for(self, key):
+        return os.path.join(self._directory, f"{key}{self._suffix}")
+
+    def get_path(self, key):
+        """Returns the path of the cached file for key, or None on a miss"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def get(self, key):
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:  # evicted by another process meanwhile
+            return None
+
+    def put(self, key, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self.put_file(key, tmp_path)
+
+    def put_file(self, key, src_path):
+        """Moves src_path into the store (same filesystem) and returns the new path"""
+        path = self.path_for(key)
+        os.replace(src_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Removes the least recently used files until the store fits in max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self._directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(self._suffix):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+            if total <= self._max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self._max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+    def size_bytes(self):
+        total = 0
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                if entry.name.endswith(self._suffix):
+                    total += entry.stat().st_size
+        return total
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self._max_bytes,
+        }
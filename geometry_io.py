@@ -0,0 +1,162 @@
+import base64
+import os
+
+import numpy as np
+
+# Everything is written little endian, as the browsers typed arrays expect it
+FLOAT32 = np.dtype("<f4")
+UINT16 = np.dtype("<u2")
+UINT32 = np.dtype("<u4")
+INT8 = np.dtype("i1")
+INT16 = np.dtype("<i2")
+
+TYPED_ARRAY_NAMES = {FLOAT32: "Float32Array", UINT16: "Uint16Array", UINT32: "Uint32Array"}
+
+
+# Function to turn a point set (list of (x, y, z) tuples or an array) into a (n, 3) array
+def as_points(point_set):
+    return np.asarray(point_set, dtype=np.float64).reshape(-1, 3)
+
+
+# Function to round coordinates to a number of decimals, None keeps the full float32 precision
+def round_points(points, precision=None):
+    return points if precision is None else np.round(points, precision)
+
+
+# Function to merge polylines in one vertex array and a line segment index buffer
+def merge_point_sets(point_sets):
+    """
+    Returns:
+        positions as a (n, 3) array, segment indices as a flat uint32 array (2 per segment),
+        and for each polyline the [first index, index count] of its segments in the index buffer
+    """
+    arrays = [as_points(point_set) for point_set in point_sets]
+    if not arrays:
+        return np.empty((0, 3)), np.empty(0, dtype=UINT32), np.empty((0, 2), dtype=np.int64)
+    positions = np.concatenate(arrays)
+    counts = np.array([len(points) for points in arrays], dtype=np.int64)
+    # every point but the last one of its polyline starts a segment
+    ends = np.cumsum(counts)
+    is_last = np.zeros(len(positions), dtype=bool)
+    is_last[ends[counts > 0] - 1] = True
+    starts = np.flatnonzero(~is_last).astype(UINT32)
+    indices = np.column_stack((starts, starts + 1)).ravel()
+    index_counts = 2 * np.maximum(counts - 1, 0)
+    edge_offsets = np.column_stack((np.cumsum(index_counts) - index_counts, index_counts))
+    return positions, indices, edge_offsets
+
+
+# Function to pick the smallest index type able to address vertex_count vertices
+def index_dtype(vertex_count):
+    return UINT16 if vertex_count <= 0xFFFF else UINT32
+
+
+# Functions to pack arrays as little endian bytes
+def pack_float32(points, precision=None):
+    return np.ascontiguousarray(round_points(points, precision), dtype=FLOAT32).tobytes()
+
+
+def pack_indices(indices, vertex_count):
+    return np.ascontiguousarray(indices, dtype=index_dtype(vertex_count)).tobytes()
+
+
+def unpack(data, dtype=FLOAT32):
+    return np.frombuffer(base64.b64decode(data) if isinstance(data, str) else data, dtype=dtype)
+
+
+# Largest int16 coordinate, the precision X3DOM BinaryGeometry decodes Int16 coordinates with
+INT16_MAX = 32767
+
+
+# Function to quantize coordinates to int16 in their bounding box
+def quantize_positions(points):
+    """
+    Returns:
+        the int16 coordinates, and the center and half extent of the bounding
+        box, the coordinates being decoded as center + size * q / 32767 (as X3DOM
+        BinaryGeometry does), so the box spans the whole [-32767, 32767] range
+    """
+    points = as_points(points)
+    if not len(points):
+        return np.empty((0, 3), dtype=INT16), np.zeros(3), np.ones(3)
+    low, high = points.min(axis=0), points.max(axis=0)
+    center = (low + high) / 2.0
+    size = np.maximum((high - low) / 2.0, 1e-9)
+    return np.round((points - center) / size * INT16_MAX).astype(INT16), center, size
+
+
+# Function to decode quantized coordinates the way X3DOM does
+def dequantize_positions(coords, center, size):
+    return np.asarray(center) + np.asarray(size) * (np.asarray(coords, dtype=np.float64) / INT16_MAX)
+
+
+# Function to quantize unit normals to int8, decoded as q / 127
+def quantize_normals(normals):
+    return np.round(np.clip(as_points(normals), -1.0, 1.0) * 127.0).astype(INT8)
+
+
+# Function to write packed buffers to one binary sidecar file, each aligned on 4 bytes
+def write_sidecar(file_path, buffers):
+    """
+    Returns:
+        the byte offset of each buffer in the file
+    """
+    offsets = []
+    with open(file_path, "wb") as f:
+        for data in buffers:
+            offsets.append(f.tell())
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 4))
+    return offsets
+
+
+# Function to format coordinates as X3D/XML text, "x y z x y z ..."
+def format_points(points, precision=6):
+    flat = np.asarray(points, dtype=np.float64).ravel()
+    if not len(flat):
+        return ""
+    return ((f"%.{precision}g " * len(flat)) % tuple(flat.tolist()))[:-1]
+
+
+# Function to build a three.js BufferGeometry JSON document with packed arrays
+def buffer_geometry_json(geometry_uuid, positions, indices=None, user_data=None, precision=None, sidecar_path=None):
+    """Arrays are base64 strings inside the document, or byte ranges of a binary
+    sidecar file when sidecar_path is given. The load_geometry function of the
+    threejs renderer turns both back into typed arrays before handing the
+    document over to THREE.BufferGeometryLoader.
+    """
+    positions = as_points(positions)
+    arrays = [("position", FLOAT32, 3, pack_float32(positions, precision))]
+    if indices is not None:
+        dtype = index_dtype(len(positions))
+        arrays.append(("index", dtype, 1, pack_indices(indices, len(positions))))
+    if sidecar_path is not None:
+        offsets = write_sidecar(sidecar_path, [data for _, _, _, data in arrays])
+    entries = {}
+    for i, (name, dtype, item_size, data) in enumerate(arrays):
+        entry = {"type": TYPED_ARRAY_NAMES[dtype]}
+        if name != "index":
+            entry["itemSize"] = item_size
+        if sidecar_path is None:
+            entry["array"] = base64.b64encode(data).decode("ascii")
+        else:
+            entry["uri"] = os.path.basename(sidecar_path)
+            entry["byteOffset"] = offsets[i]
+            entry["count"] = len(data) // dtype.itemsize
+        entries[name] = entry
+    data = {"attributes": {"position": entries["position"]}}
+    if "index" in entries:
+        data["index"] = entries["index"]
+    document = {
+        "metadata": {
+            "version": 4.4,
+            "type": "BufferGeometry",
+            "generator": "pythonocc",
+        },
+        "uuid": geometry_uuid,
+        "type": "BufferGeometry",
+        "data": data,
+    }
+    if user_data is not None:
+        document["userData"] = user_data
+    return document
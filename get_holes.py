@@ -1,156 +1,203 @@
-import matplotlib.pyplot as plt
-from OCC.Core.STEPControl import STEPControl_Reader
-from OCC.Core.TopExp import TopExp_Explorer
-from OCC.Core.TopAbs import TopAbs_FACE, TopAbs_EDGE
-from OCC.Core.BRep import BRep_Tool
-from OCC.Core.BRepAdaptor import BRepAdaptor_Curve
-from OCC.Core.GeomAbs import GeomAbs_Circle
-from OCC.Core.gp import gp_Circ
-
-# Load the STEP file
-def load_step_file(file_path: str):
-    step_reader = STEPControl_Reader()
-    step_reader.ReadFile(file_path)
-    step_reader.TransferRoot()
-    shape = step_reader.Shape()
-    return shape
-
-def find_holes_in_step(shape):
-    # Step 1: Explore all faces in the STEP file
-    explorer_faces = TopExp_Explorer(shape, TopAbs_FACE)
-    
-    holes = []  # List to store hole data
-    
-    while explorer_faces.More():
-        face = explorer_faces.Current()
-        
-        # Step 2: Explore edges within the face
-        explorer_edges = TopExp_Explorer(face, TopAbs_EDGE)
-        
-        while explorer_edges.More():
-            edge = explorer_edges.Current()
-            
-            # Use BRepAdaptor_Curve to adapt the edge into a curve
-            curve_adaptor = BRepAdaptor_Curve(edge)
-            
-            # Check if the curve type is a circle
-            if curve_adaptor.GetType() == GeomAbs_Circle:
-                # Ensure the curve is a complete circle
-                first_param = curve_adaptor.FirstParameter()
-                last_param = curve_adaptor.LastParameter()
-                full_circle_param_range = 2 * 3.141592653589793  # 2 * pi
-                
-                if abs(last_param - first_param - full_circle_param_range) < 1e-6:
-                    # Extract the circle parameters
-                    circle = curve_adaptor.Circle()
-                    radius = circle.Radius()
-                    center = circle.Location()
-                    
-                    # Store hole information (position and diameter)
-                    hole_data = (
-                        (center.X(), center.Y(), center.Z()),
-                        2 * radius
-                    )
-                    holes.append(hole_data)
-            
-            explorer_edges.Next()
-        
-        explorer_faces.Next()
-    
-    if len(holes) == 0:
+"""Hole detection library.
+
+Importing this module has no side effect and does not import OCC, which is
+only loaded the first time a shape is inspected. The command line lives in
+get_holes_cli.py.
+"""
+import math
+import os
+
+FULL_CIRCLE = 2 * 3.141592653589793  # 2 * pi
+
+# Neighbouring cells of the spatial hash, so that circles on both sides of a cell border still meet
+# (the cell itself comes first, it is where the match nearly always is)
+NEIGHBOUR_CELLS = sorted(
+    ((i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)),
+    key=lambda offset: offset != (0, 0, 0),
+)
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+# Two hole axes less than this angle apart (radians) are parallel
+ANGLE_TOLERANCE = math.radians(0.1)
+
+
+# Function to split the circles of one axis line into holes, the circles bounding a same wall being one hole
+def _split_by_wall(ends):
+    """
+    ends: (position along the axis, center, closed, walls) sorted by position,
+    walls being the ids of the cylindrical faces the circle bounds, (None,) if unknown.
+    Coaxial holes with air between them, like the holes of both flanges of a
+    U bracket, share no wall and are kept apart.
+    """
+    parent = list(range(len(ends)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_end = {}
+    for i, end in enumerate(ends):
+        for wall in end[3]:
+            parent[root(i)] = root(first_end.setdefault(wall, i))
+    holes = {}
+    for i, end in enumerate(ends):
+        holes.setdefault(root(i), []).append(end)
+    return sorted(holes.values(), key=lambda hole_ends: hole_ends[0][0])
+
+
+# Function to group circles into physical holes with a tolerance bucketed spatial hash
+def cluster_holes(circles, tolerance=1e-3, axis_extent=None, angle_tolerance=ANGLE_TOLERANCE):
+    """
+    circles: iterable of (center, direction, radius, closed[, walls]), direction being a
+    unit vector, closed telling whether the circle is the bottom of a blind hole (None if
+    unknown) and walls the ids of the cylindrical faces the circle bounds.
+    Two circles belong to the same hole when they share the same axis line, within
+    tolerance (mm) and angle_tolerance (radians), the same radius within tolerance and,
+    when walls are given, are linked by hole walls. The axis line is hashed by its foot
+    point, the point of the axis closest to the origin, which does not depend on where
+    the circle sits on the axis nor on the orientation of its direction, so the whole
+    grouping is O(n).
+    axis_extent: optional function giving the thickness of the part along a direction,
+    used to tell through holes from blind ones when closed is unknown.
+    Returns:
+        holes, a list with one dict per physical hole, and the list of merged circles
+    """
+    min_cos = math.cos(angle_tolerance)
+    grid = {}
+    clusters = []
+    for center, direction, radius, closed, *walls in circles:
+        walls = tuple(walls[0]) if walls and walls[0] else (None,)
+        along = _dot(center, direction)
+        foot = tuple(c - along * d for c, d in zip(center, direction))
+        # floor, not round: feet within tolerance always land in the same or an adjacent cell
+        cell = tuple(math.floor(f / tolerance) for f in foot)
+        match = None
+        for offset in NEIGHBOUR_CELLS:
+            for cluster in grid.get((cell[0] + offset[0], cell[1] + offset[1], cell[2] + offset[2]), ()):
+                if (
+                    abs(cluster["radius"] - radius) <= tolerance
+                    and abs(_dot(cluster["direction"], direction)) >= min_cos
+                    and max(abs(a - b) for a, b in zip(cluster["foot"], foot)) <= tolerance
+                ):
+                    match = cluster
+                    break
+            if match is not None:
+                break
+        if match is None:
+            match = {"foot": foot, "direction": direction, "radius": radius, "circles": []}
+            grid.setdefault(cell, []).append(match)
+            clusters.append(match)
+        # position along the axis of the cluster, whichever way this circle is oriented
+        match["circles"].append((_dot(center, match["direction"]), center, closed, walls))
+
+    holes = []
+    merged = []
+    for cluster in clusters:
+        direction = cluster["direction"]
+        diameter = 2 * cluster["radius"]
+        # the plane dropped from the 2D center is the one the axis points through
+        axis_index = max(range(3), key=lambda i: abs(direction[i]))
+        for ends in _split_by_wall(sorted(cluster["circles"], key=lambda end: end[0])):
+            depth = ends[-1][0] - ends[0][0]
+            center = list(ends[0][1])
+            removed_value = center.pop(axis_index)
+            closed_flags = [end[2] for end in ends]
+            if None not in closed_flags:
+                through = len(ends) > 1 and not any(closed_flags)
+            elif axis_extent is not None:
+                through = len(ends) > 1 and depth >= axis_extent(direction) - tolerance
+            else:
+                through = None
+            holes.append({
+                "center": tuple(center),
+                "diameter": diameter,
+                "removed_value": removed_value,
+                "axis": {"origin": ends[0][1], "direction": direction},
+                "depth": depth,
+                "through": through,
+                "ends": [
+                    {"center": ends[0][1], "diameter": diameter},
+                    {"center": ends[-1][1], "diameter": diameter},
+                ],
+            })
+            for end in ends[1:]:
+                center = list(end[1])
+                removed_value = center.pop(axis_index)
+                merged.append({"center": tuple(center), "diameter": diameter, "removed_value": removed_value})
+    return holes, merged
+
+# Function to list the full circles of a shape, visiting each unique edge once
+def find_hole_circles(shape, index=None):
+    """
+    index: the TopologyIndex of shape, taken from the topology index cache if None
+    Returns:
+        a list of (center, direction, radius, closed, walls), closed being True when the
+        circle is the bottom of a blind hole and walls the ids of the cylindrical faces it bounds
+    """
+    from OCC.Core.BRepAdaptor import BRepAdaptor_Curve, BRepAdaptor_Surface
+    from OCC.Core.GeomAbs import GeomAbs_Circle, GeomAbs_Cylinder
+
+    from topology_index import get_topology_index
+
+    if index is None:
+        index = get_topology_index(shape)
+
+    circles = []
+    for edge_id in index.edges_of_type(GeomAbs_Circle):
+        curve_adaptor = BRepAdaptor_Curve(index.edge(edge_id))
+        # Ensure the curve is a complete circle
+        if abs(curve_adaptor.LastParameter() - curve_adaptor.FirstParameter() - FULL_CIRCLE) >= 1e-6:
+            continue
+        circle = curve_adaptor.Circle()
+        center = circle.Location()
+        axis = circle.Axis().Direction()
+        closed = False
+        walls = []
+        # the faces on both sides of the circle: the hole wall and the face it opens on
+        for face_id in index.faces_of_edge(edge_id):
+            if index.face_types[face_id] == int(GeomAbs_Cylinder):
+                # the true hole axis
+                axis = BRepAdaptor_Surface(index.face(face_id), True).Cylinder().Axis().Direction()
+                walls.append(int(face_id))
+            elif len(index.boundary_edges(face_id)) == 1:
+                # only the hole circle bounds it, like the flat or drill point bottom of a blind hole
+                closed = True
+        circles.append((
+            (center.X(), center.Y(), center.Z()),
+            (axis.X(), axis.Y(), axis.Z()),
+            circle.Radius(),
+            closed,
+            tuple(walls),
+        ))
+    return circles
+
+def find_holes_in_step(shape, tolerance=1e-3):
+    circles = find_hole_circles(shape)
+    if len(circles) == 0:
         raise ValueError("No holes found in the shape.")
-    
-    # Calculate the average absolute value for each coordinate
-    sum_abs_values = [0, 0, 0]
-    for center, _ in holes:
-        for i, coord in enumerate(center):
-            sum_abs_values[i] += abs(coord)
-    
-    avg_abs_values = [sum_val / len(holes) for sum_val in sum_abs_values]
-    
-    # Find the index of the coordinate with the smallest average absolute value
-    min_index = avg_abs_values.index(min(avg_abs_values))
-    
-    # Remove the smallest average coordinate from each hole's center
-    unique_holes_set = set()
-    unique_holes = []
-    removed_holes = []
-    for center, diameter in holes:
-        center_coords = list(center)
-        removed_value = center_coords.pop(min_index)  # Remove the smallest average value
-        hole_tuple = (tuple(center_coords), diameter)
-        
-        if hole_tuple not in unique_holes_set:
-            unique_holes_set.add(hole_tuple)
-            unique_holes.append({"center": tuple(center_coords), "diameter": diameter, "removed_value": removed_value})
-        else:
-            removed_holes.append({"center": tuple(center_coords), "diameter": diameter, "removed_value": removed_value})
-    
-    return unique_holes, removed_holes
+    return cluster_holes(circles, tolerance)
+
+# Function to detect the holes of a shape or of a STEP file, one record per physical hole
+def detect_holes(shape_or_path, tolerance=1e-3):
+    """
+    shape_or_path: a TopoDS_Shape, or the path of a STEP file loaded through the shape cache
+    Returns:
+        the list of holes, empty when the part has none
+    """
+    if isinstance(shape_or_path, (str, os.PathLike)):
+        from utils import load_step_file
+
+        shape_or_path = load_step_file(os.fspath(shape_or_path))
+    holes, _ = cluster_holes(find_hole_circles(shape_or_path), tolerance)
+    return holes
 
 def get_removed_holes(file_path: str):
+    from utils import load_step_file
+
     shape = load_step_file(file_path)
     _, removed_holes = find_holes_in_step(shape)
     return removed_holes
-
-# Example Usage
-file_path = "models/WP-15.step"    
-shape = load_step_file(file_path)
-unique_holes, removed_holes = find_holes_in_step(shape)
-
-# Return the selected and rejected holes
-print("Selected Holes:", len(unique_holes))
-print("Rejected Holes:", len(removed_holes))
-# Output all holes
-print("Unique Holes:")
-for hole in unique_holes:
-    print(f"Hole at {hole['center']} with diameter {hole['diameter']:.2f} mm (removed value: {hole['removed_value']:.2f})")
-
-# Plotting the unique holes
-x_coords_unique = [hole['center'][0] for hole in unique_holes]
-y_coords_unique = [hole['center'][1] for hole in unique_holes]
-diameters_unique = [hole['diameter'] for hole in unique_holes]
-
-# plt.figure(figsize=(10, 8))
-# plt.scatter(x_coords_unique, y_coords_unique, s=diameters_unique, alpha=0.5)
-# plt.xlabel('X Coordinate')
-# plt.ylabel('Y Coordinate')
-# plt.title('Unique Holes in Sheet Metal')
-# plt.grid(True)
-# plt.show()
-
-# Plotting the removed holes
-x_coords_removed = [hole['center'][0] for hole in removed_holes]
-y_coords_removed = [hole['center'][1] for hole in removed_holes]
-diameters_removed = [hole['diameter'] for hole in removed_holes]
-
-# plt.figure(figsize=(10, 8))
-# plt.scatter(x_coords_removed, y_coords_removed, s=diameters_removed, alpha=0.5, color='red')
-# plt.xlabel('X Coordinate')
-# plt.ylabel('Y Coordinate')
-# plt.title('Removed Holes in Sheet Metal')
-# plt.grid(True)
-# plt.show()
-
-# Plotting all detected holes
-# print("All holes:", len(all_holes))
-# for hole in all_holes:
-#     print(hole)
-# x_coords_all = [hole[0][0] for hole in all_holes]
-# y_coords_all = [hole[0][1] for hole in all_holes]
-# z_coords_all = [hole[0][2] for hole in all_holes]
-# diameters_all = [hole[1] for hole in all_holes]
-
-# plt.figure(figsize=(10, 8))
-# plt.scatter(y_coords_all, z_coords_all, s=diameters_all, alpha=0.5, color='blue')
-# plt.xlabel('Y Coordinate')
-# plt.ylabel('Z Coordinate')
-# plt.title('All Detected Holes in Sheet Metal')
-# plt.grid(True)
-# plt.show()
-
-# Get and print removed holes using the new function
-# removed_holes_only = get_removed_holes(file_path)
-# print("\nRemoved Holes (using get_removed_holes function):")
-# for hole in removed_holes_only:
-#     print(f"Hole at {hole['center']} with diameter {hole['diameter']:.2f} mm (removed value: {hole['removed_value']:.2f})")
\ No newline at end of file
@@ -0,0 +1,81 @@
+import argparse
+import json
+import sys
+
+from batch_analyze import collect_step_files
+from get_holes import cluster_holes, find_hole_circles
+
+
+# Function to plot the holes of one part, matplotlib is only imported when asked for
+def plot_holes(file_path, holes, removed_holes):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 8))
+    plt.scatter(
+        [hole['center'][0] for hole in holes],
+        [hole['center'][1] for hole in holes],
+        s=[hole['diameter'] for hole in holes],
+        alpha=0.5,
+        label='Unique holes',
+    )
+    plt.scatter(
+        [hole['center'][0] for hole in removed_holes],
+        [hole['center'][1] for hole in removed_holes],
+        s=[hole['diameter'] for hole in removed_holes],
+        alpha=0.5,
+        color='red',
+        label='Merged end circles',
+    )
+    plt.xlabel('X Coordinate')
+    plt.ylabel('Y Coordinate')
+    plt.title(f'Holes in {file_path}')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect the holes of STEP files")
+    parser.add_argument("inputs", nargs="*", default=["models/WP-15.step"], help="STEP files, directories or glob patterns")
+    parser.add_argument("--json", action="store_true", help="print one JSON line per file")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="distance under which two circles are the same hole (mm)")
+    parser.add_argument("--plot", action="store_true", help="plot the hole centers with matplotlib")
+    args = parser.parse_args(argv)
+
+    from utils import load_step_file
+
+    file_paths = []
+    for pattern in args.inputs:
+        file_paths.extend(collect_step_files(pattern))
+    if not file_paths:
+        parser.error("no STEP file found")
+
+    failures = 0
+    for file_path in file_paths:
+        try:
+            shape = load_step_file(file_path)
+            unique_holes, removed_holes = cluster_holes(find_hole_circles(shape), args.tolerance)
+        except Exception as e:
+            failures += 1
+            if args.json:
+                print(json.dumps({"file": file_path, "ok": False, "error": f"{type(e).__name__}: {e}"}))
+            else:
+                print(f"{file_path}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+
+        if args.json:
+            print(json.dumps({"file": file_path, "ok": True, "holes": unique_holes, "merged_circles": len(removed_holes)}))
+        else:
+            print(f"{file_path}")
+            print("Selected Holes:", len(unique_holes))
+            print("Rejected Holes:", len(removed_holes))
+            for hole in unique_holes:
+                kind = "through" if hole['through'] else "blind"
+                print(f"Hole at {hole['center']} with diameter {hole['diameter']:.2f} mm, {kind}, depth {hole['depth']:.2f} mm (removed value: {hole['removed_value']:.2f})")
+        if args.plot:
+            plot_holes(file_path, unique_holes, removed_holes)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
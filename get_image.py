@@ -1,47 +1,323 @@
+import argparse
+import hashlib
+import os
+import queue
 import sys
-from OCC.Extend.DataExchange import read_step_file
-from OCC.Display.OCCViewer import OffscreenRenderer
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from disk_cache import hash_file
+from png_io import hstack_rgb, read_ppm, write_png
+from software_render import mesh_from_shape, render_mesh
+from utils import load_step_file
+
+# Standard views, name -> Viewer3d method setting the camera
+VIEWS = {
+    "iso": "View_Iso",
+    "top": "View_Top",
+    "front": "View_Front",
+}
+
+# OffscreenRenderer (OpenGL), the NumPy rasterizer of software_render, or the
+# first one falling back to the second where no GL context can be created
+BACKENDS = ("auto", "opengl", "software")
+
+# Bump when the way thumbnails are drawn changes, so that they are rendered again
+THUMBNAIL_FORMAT = "2"
+
 
 def initialize_renderer(step_file_path, bg_color1, bg_color2):
-    try:
-        # Read the shape from the STEP file
-        my_shape = read_step_file(step_file_path)
-        
-        # Initialize the offscreen renderer
-        renderer = OffscreenRenderer()
-        
-        # Ensure OffscreenRenderer is properly initialized
-        if renderer is None:
-            raise RuntimeError("OffscreenRenderer is not initialized.")
-        
-        # Set background color
-        renderer.set_bg_gradient_color(bg_color1, bg_color2)
-        
-        # Remove the axis mark
-        renderer.hide_triedron()
-        
-        return renderer, my_shape
-    except Exception as e:
-        print(f"Error during renderer initialization: {e}")
-        sys.exit(1)
+    """Kept for the former callers, raises instead of exiting the process"""
+    from OCC.Display.OCCViewer import OffscreenRenderer
+
+    # Read the shape from the STEP file
+    my_shape = load_step_file(step_file_path)
+    # Initialize the offscreen renderer
+    renderer = OffscreenRenderer()
+    # Set background color
+    renderer.set_bg_gradient_color(bg_color1, bg_color2)
+    # Remove the axis mark
+    renderer.hide_triedron()
+    return renderer, my_shape
+
 
 def export_to_PNG(renderer, shape, step_file_path, output_path="./test"):
     filename = f"{step_file_path.split('/')[-1].split('.')[0]}.png"
-    try:
-        renderer.DisplayShape(shape, dump_image_path=output_path, dump_image_filename=filename)
-    except Exception as e:
-        print(f"Error exporting to PNG: {e}")
-        sys.exit(1)
+    renderer.DisplayShape(shape, dump_image_path=output_path, dump_image_filename=filename)
+
 
 def exit_gracefully(renderer):
     renderer._inited = False
-    sys.exit()
+
+
+@dataclass
+class ThumbnailResult:
+    file_path: str
+    outputs: list = field(default_factory=list)
+    skipped: bool = False  # already rendered for this content
+    error: str = None
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {
+            "file": self.file_path,
+            "ok": self.ok,
+            "outputs": self.outputs,
+            "skipped": self.skipped,
+            "error": self.error,
+            "elapsed_s": self.elapsed_s,
+        }
+
+
+class ThumbnailRenderer:
+    """Renders the standard views of parts with one long lived OffscreenRenderer.
+
+    Outputs are named after the content hash of the STEP file and the render
+    settings, so an unchanged part is skipped. A failing part is reported in
+    its result and never stops the process; the GL context is created again
+    only if the failure came from the viewer itself. With the "auto" backend,
+    a node where the OffscreenRenderer cannot start (no GPU, no working
+    OpenGL) renders with the CPU rasterizer instead.
+    """
+
+    def __init__(
+        self,
+        output_dir="./test",
+        views=("iso", "top", "front"),
+        size=(640, 480),
+        bg_color1=(0, 0, 0),
+        bg_color2=(0, 0, 0),
+        sprite=False,
+        backend="auto",
+        mesh_quality=1.0,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+        unknown = [view for view in views if view not in VIEWS]
+        if unknown:
+            raise ValueError(f"unknown views {unknown}, expected some of {list(VIEWS)}")
+        self.output_dir = output_dir
+        self.views = tuple(views)
+        self.size = tuple(size)
+        self.bg_color1 = list(bg_color1)
+        self.bg_color2 = list(bg_color2)
+        self.sprite = sprite
+        self.backend = backend
+        self.mesh_quality = mesh_quality
+        self._software = backend == "software"
+        self._viewer = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _get_viewer(self):
+        if self._viewer is None:
+            from OCC.Display.OCCViewer import OffscreenRenderer
+
+            self._viewer = OffscreenRenderer(screen_size=self.size)
+            self._viewer.set_bg_gradient_color(self.bg_color1, self.bg_color2)
+            self._viewer.hide_triedron()
+        return self._viewer
+
+    def resolved_backend(self):
+        """The backend that actually draws, "opengl" or "software", starting the viewer if needed"""
+        if not self._software:
+            try:
+                self._get_viewer()
+            except Exception as e:
+                if self.backend != "auto":
+                    raise
+                print(f"OffscreenRenderer unavailable ({type(e).__name__}: {e}), rendering in software", file=sys.stderr)
+                self._software = True
+        return "software" if self._software else "opengl"
+
+    def output_paths(self, file_path):
+        # named after what draws the images, so that "auto" never mixes both backends under one name
+        digest = hashlib.sha256(hash_file(file_path).encode())
+        digest.update(
+            f"{THUMBNAIL_FORMAT}|{self.resolved_backend()}|{self.mesh_quality!r}|"
+            f"{self.size}|{self.bg_color1}|{self.bg_color2}".encode()
+        )
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        name = f"{stem}-{digest.hexdigest()[:16]}"
+        if self.sprite:
+            return {"-".join(self.views): os.path.join(self.output_dir, f"{name}-{'-'.join(self.views)}.png")}
+        return {view: os.path.join(self.output_dir, f"{name}-{view}.png") for view in self.views}
+
+    def render(self, file_path):
+        """Renders the views of one part, never raises"""
+        start = time.perf_counter()
+        result = ThumbnailResult(file_path)
+        try:
+            outputs = self.output_paths(file_path)
+            result.outputs = list(outputs.values())
+            if all(os.path.exists(path) for path in result.outputs):
+                result.skipped = True
+                return result
+            shape = load_step_file(file_path)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            return result
+        finally:
+            result.elapsed_s = time.perf_counter() - start
+        try:
+            self._draw(shape, outputs)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            # the viewer may be in a bad state, start with a new one next time
+            self.close()
+        result.elapsed_s = time.perf_counter() - start
+        return result
+
+    def _draw(self, shape, outputs):
+        if self.resolved_backend() == "software":
+            self._draw_software(shape, outputs)
+            return
+        viewer = self._get_viewer()
+        viewer.EraseAll()
+        viewer.DisplayShape(shape, update=True, dump_image=False)
+        if self.sprite:
+            with tempfile.TemporaryDirectory() as folder:
+                images = []
+                for view in self.views:
+                    ppm_path = os.path.join(folder, f"{view}.ppm")
+                    self._dump_view(viewer, view, ppm_path)
+                    images.append(read_ppm(ppm_path))
+                width, height, rgb = hstack_rgb(images)
+                [sprite_path] = outputs.values()
+                self._replace(sprite_path, lambda tmp_path: write_png(tmp_path, width, height, rgb))
+        else:
+            for view, png_path in outputs.items():
+                self._replace(png_path, lambda tmp_path: self._dump_view(viewer, view, tmp_path))
+        viewer.EraseAll()
+
+    def _draw_software(self, shape, outputs):
+        vertices, triangles = mesh_from_shape(shape, self.mesh_quality)
+        width, height = self.size
+        # vertical gradient from the first background color at the top to the second
+        background = np.linspace(self.bg_color1, self.bg_color2, height)[:, None, :] / 255.0
+        images = [render_mesh(vertices, triangles, view, width, height, background=background) for view in self.views]
+        if self.sprite:
+            width, height, rgb = hstack_rgb(images)
+            [sprite_path] = outputs.values()
+            self._replace(sprite_path, lambda tmp_path: write_png(tmp_path, width, height, rgb))
+        else:
+            for (width, height, rgb), png_path in zip(images, outputs.values()):
+                self._replace(png_path, lambda tmp_path: write_png(tmp_path, width, height, rgb))
+
+    @staticmethod
+    def _dump_view(viewer, view, image_path):
+        getattr(viewer, VIEWS[view])()
+        viewer.FitAll()
+        viewer.ExportToImage(image_path)
+
+    @staticmethod
+    def _replace(file_path, write):
+        # a thumbnail is either complete or missing, never half written
+        root, extension = os.path.splitext(file_path)
+        tmp_path = f"{root}.tmp{threading.get_ident()}{extension}"
+        write(tmp_path)
+        os.replace(tmp_path, file_path)
+
+    def render_many(self, file_paths):
+        for file_path in file_paths:
+            yield self.render(file_path)
+
+    def close(self):
+        if self._viewer is not None:
+            self._viewer._inited = False
+            self._viewer = None
+
+
+class ThumbnailWorker(threading.Thread):
+    """Thread owning a ThumbnailRenderer and rendering the parts put in its queue.
+
+    The GL context belongs to the thread that created it, so the renderer is
+    created and used in this thread only. Results go to the results queue.
+    """
+
+    _STOP = object()
+
+    def __init__(self, results=None, **renderer_options):
+        super().__init__(daemon=True)
+        self.parts = queue.Queue()
+        self.results = results if results is not None else queue.Queue()
+        self._renderer_options = renderer_options
+
+    def submit(self, file_path):
+        self.parts.put(file_path)
+
+    def stop(self):
+        self.parts.put(self._STOP)
+
+    def run(self):
+        renderer = ThumbnailRenderer(**self._renderer_options)
+        try:
+            while True:
+                file_path = self.parts.get()
+                if file_path is self._STOP:
+                    break
+                self.results.put(renderer.render(file_path))
+        finally:
+            renderer.close()
+
+
+def main(argv=None):
+    import json
+
+    from batch_analyze import collect_step_files
+
+    parser = argparse.ArgumentParser(description="Render thumbnails of STEP files")
+    parser.add_argument("inputs", nargs="*", default=["models"], help="STEP files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="./test", help="output folder")
+    parser.add_argument("--views", nargs="+", default=["iso", "top", "front"], choices=list(VIEWS))
+    parser.add_argument("--size", default="640x480", help="WIDTHxHEIGHT of a view")
+    parser.add_argument("--sprite", action="store_true", help="one PNG per part with the views side by side")
+    parser.add_argument("--backend", default="auto", choices=BACKENDS, help="OpenGL, software rasterizer, or OpenGL falling back to software")
+    parser.add_argument("--json", action="store_true", help="print one JSON line per part")
+    args = parser.parse_args(argv)
+
+    file_paths = []
+    for pattern in args.inputs:
+        file_paths.extend(collect_step_files(pattern))
+    if not file_paths:
+        parser.error("no STEP file found")
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    renderer = ThumbnailRenderer(args.output, args.views, (width, height), sprite=args.sprite, backend=args.backend)
+    start = time.perf_counter()
+    rendered = skipped = failures = 0
+    try:
+        for result in renderer.render_many(file_paths):
+            if args.json:
+                print(json.dumps(result.to_dict()))
+            elif result.ok:
+                status = "unchanged" if result.skipped else f"{result.elapsed_s:.2f} s"
+                print(f"{result.file_path}: {status}, {', '.join(result.outputs)}")
+            if not result.ok:
+                failures += 1
+                print(f"{result.file_path}: {result.error}", file=sys.stderr)
+            elif result.skipped:
+                skipped += 1
+            else:
+                rendered += 1
+    finally:
+        renderer.close()
+    elapsed = time.perf_counter() - start
+    thumbnails = rendered * len(args.views)
+    print(
+        f"{rendered} parts rendered, {skipped} unchanged, {failures} failed in {elapsed:.2f} s, "
+        f"{thumbnails / elapsed if elapsed else 0.0:.1f} thumbnails/s",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
 
 if __name__ == "__main__":
-    step_file_path = "models/Plate_1.step"
-    bg_color1 = [0, 0, 0]
-    bg_color2 = [0, 0, 0]
-    
-    renderer, my_shape = initialize_renderer(step_file_path, bg_color1, bg_color2)
-    export_to_PNG(renderer, my_shape, step_file_path)
-    exit_gracefully(renderer)
+    sys.exit(main())
@@ -6,7 +6,16 @@
 from OCC.Extend.DataExchange import read_step_file_with_names_colors
 from OCC.Core.TopoDS import TopoDS_Solid
 
+from step_scan import scan_step_file
+
+# If the number of shapes at root is greater than 1, then it is not a sheet,
+# but a part of a larger assembly. Answered from the file text, no geometry is built.
+def is_assembly(file_path):
+    return scan_step_file(file_path).is_assembly
+
 def get_shapes_in_step(file_path):
+    if is_assembly(file_path):
+        print(f"{file_path} has several root shapes, it is an assembly and not a single sheet")
     shapes_labels_colors = read_step_file_with_names_colors(file_path)
     print("================================================")
 
@@ -22,6 +31,3 @@ def get_shapes_in_step(file_path):
 if __name__ == "__main__":
     file_path = "models/suspension.stp"
     get_shapes_in_step(file_path)
-
-
-# TODO: add logic in which if number of shapes at root is greater than 1, then it is not a sheet, but a part of a larger assembly.
\ No newline at end of file
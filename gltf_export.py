@@ -0,0 +1,207 @@
+import json
+import struct
+import sys
+from array import array
+
+GLB_MAGIC = 0x46546C67  # "glTF"
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+# glTF constants
+FLOAT = 5126
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+MODE_LINES = 1
+MODE_TRIANGLES = 4
+
+_MESH_HEADER = struct.Struct("<III")
+
+
+# Function to read the indexed mesh of a computed ShapeTesselator
+def mesh_arrays_from_tesselator(tess):
+    """
+    Returns:
+        positions and normals as flat float32 arrays, triangle indices as a uint32 array
+    """
+    positions = array("f")
+    normals = array("f")
+    indices = array("I")
+    for i_vert in range(tess.ObjGetVertexCount()):
+        positions.extend(tess.GetVertex(i_vert))
+    for i_norm in range(tess.ObjGetNormalCount()):
+        normals.extend(tess.GetNormal(i_norm))
+    for i_tri in range(tess.ObjGetTriangleCount()):
+        indices.extend(tess.GetTriangleIndex(i_tri))
+    return positions, normals, indices
+
+
+# Function to build line segment buffers out of polylines, e.g. the tesselator edges
+def line_arrays_from_point_sets(point_sets):
+    positions = array("f")
+    indices = array("I")
+    for point_set in point_sets:
+        first = len(positions) // 3
+        for point in point_set:
+            positions.extend(point)
+        for i in range(first, first + len(point_set) - 1):
+            indices.extend((i, i + 1))
+    return positions, indices
+
+
+def _little_endian(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+# Functions to pack mesh arrays in a single blob, e.g. to keep them in the tessellation cache
+def pack_mesh(positions, normals, indices):
+    return (
+        _MESH_HEADER.pack(len(positions), len(normals), len(indices))
+        + _little_endian(positions)
+        + _little_endian(normals)
+        + _little_endian(indices)
+    )
+
+
+def unpack_mesh(data):
+    n_positions, n_normals, n_indices = _MESH_HEADER.unpack_from(data)
+    offset = _MESH_HEADER.size
+    arrays = []
+    for typecode, count in (("f", n_positions), ("f", n_normals), ("I", n_indices)):
+        values = array(typecode)
+        values.frombytes(data[offset:offset + count * values.itemsize])
+        if sys.byteorder != "little":
+            values.byteswap()
+        arrays.append(values)
+        offset += count * values.itemsize
+    return tuple(arrays)
+
+
+def _pad4(data: bytes, pad=b"\0"):
+    return data + pad * (-len(data) % 4)
+
+
+class GLBWriter:
+    """Collects meshes and writes them as one binary glTF 2.0 (.glb) file.
+
+    Every shape becomes a node with its own material, all the geometry lives
+    in a single binary buffer. Triangle indices are stored as uint16 whenever
+    the mesh is small enough.
+    """
+
+    def __init__(self):
+        self._json = {
+            "asset": {"version": "2.0", "generator": "xlogic threejs renderer"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self._extensions_used = set()
+        self._chunks = []
+        self._buffer_length = 0
+
+    def _add_buffer_view(self, data: bytes, target):
+        data = _pad4(data)
+        self._json["bufferViews"].append(
+            {"buffer": 0, "byteOffset": self._buffer_length, "byteLength": len(data), "target": target}
+        )
+        self._chunks.append(data)
+        self._buffer_length += len(data)
+        return len(self._json["bufferViews"]) - 1
+
+    def _add_accessor(self, values, component_type, accessor_type, target, with_bounds=False):
+        count = len(values) // 3 if accessor_type == "VEC3" else len(values)
+        if component_type == UNSIGNED_SHORT:
+            values = array("H", values)
+        accessor = {
+            "bufferView": self._add_buffer_view(_little_endian(values), target),
+            "componentType": component_type,
+            "count": count,
+            "type": accessor_type,
+        }
+        if with_bounds and count:
+            accessor["min"] = [min(values[i::3]) for i in range(3)]
+            accessor["max"] = [max(values[i::3]) for i in range(3)]
+        self._json["accessors"].append(accessor)
+        return len(self._json["accessors"]) - 1
+
+    def _add_indices(self, indices, vertex_count):
+        component_type = UNSIGNED_SHORT if vertex_count <= 0xFFFF else UNSIGNED_INT
+        return self._add_accessor(indices, component_type, "SCALAR", ELEMENT_ARRAY_BUFFER)
+
+    def add_material(self, name, color, specular_color=(0.2, 0.2, 0.2), shininess=0.9, transparency=0.0, unlit=False):
+        material = {
+            "name": name,
+            "pbrMetallicRoughness": {
+                "baseColorFactor": [color[0], color[1], color[2], 1.0 - transparency],
+                "metallicFactor": 0.0,
+                "roughnessFactor": max(0.05, 1.0 - shininess),
+            },
+            "doubleSided": True,
+            "extensions": {
+                "KHR_materials_specular": {"specularColorFactor": list(specular_color)}
+            },
+        }
+        self._extensions_used.add("KHR_materials_specular")
+        if unlit:
+            material["extensions"]["KHR_materials_unlit"] = {}
+            self._extensions_used.add("KHR_materials_unlit")
+        if transparency > 0.0:
+            material["alphaMode"] = "BLEND"
+        self._json["materials"].append(material)
+        return len(self._json["materials"]) - 1
+
+    def _add_node(self, name, primitive):
+        self._json["meshes"].append({"name": name, "primitives": [primitive]})
+        self._json["nodes"].append({"name": name, "mesh": len(self._json["meshes"]) - 1})
+        self._json["scenes"][0]["nodes"].append(len(self._json["nodes"]) - 1)
+
+    def add_mesh(self, name, positions, normals, indices, material):
+        attributes = {"POSITION": self._add_accessor(positions, FLOAT, "VEC3", ARRAY_BUFFER, with_bounds=True)}
+        if len(normals) == len(positions):
+            attributes["NORMAL"] = self._add_accessor(normals, FLOAT, "VEC3", ARRAY_BUFFER)
+        self._add_node(name, {
+            "attributes": attributes,
+            "indices": self._add_indices(indices, len(positions) // 3),
+            "material": material,
+            "mode": MODE_TRIANGLES,
+        })
+
+    def add_lines(self, name, positions, indices, material):
+        self._add_node(name, {
+            "attributes": {"POSITION": self._add_accessor(positions, FLOAT, "VEC3", ARRAY_BUFFER, with_bounds=True)},
+            "indices": self._add_indices(indices, len(positions) // 3),
+            "material": material,
+            "mode": MODE_LINES,
+        })
+
+    def write(self, filename):
+        # glTF does not allow empty top level arrays
+        gltf = {key: value for key, value in self._json.items() if value != []}
+        if self._buffer_length:  # an empty buffer is not valid glTF
+            gltf["buffers"] = [{"byteLength": self._buffer_length}]
+        if self._extensions_used:
+            gltf["extensionsUsed"] = sorted(self._extensions_used)
+        json_chunk = _pad4(json.dumps(gltf, separators=(",", ":")).encode(), b" ")
+        total_length = 12 + 8 + len(json_chunk)
+        if self._buffer_length:
+            total_length += 8 + self._buffer_length
+        with open(filename, "wb") as f:
+            f.write(struct.pack("<III", GLB_MAGIC, GLB_VERSION, total_length))
+            f.write(struct.pack("<II", len(json_chunk), CHUNK_JSON))
+            f.write(json_chunk)
+            if self._buffer_length:
+                f.write(struct.pack("<II", self._buffer_length, CHUNK_BIN))
+                for chunk in self._chunks:
+                    f.write(chunk)
+        return total_length
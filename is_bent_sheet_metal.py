@@ -0,0 +1,168 @@
+import math
+import os
+
+# Tolerance of the axis alignment tests, as the cosine of the angle between two directions
+ANGLE_TOLERANCE = 1e-6
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _xyz(point):
+    return (point.X(), point.Y(), point.Z())
+
+
+def _point(xyz):
+    return {"x": xyz[0], "y": xyz[1], "z": xyz[2]}
+
+
+# Function to read the axis, radius and parameter bounds of a cylindrical face
+def _cylinder(face):
+    from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
+    from OCC.Core.BRepTools import breptools
+
+    surface = BRepAdaptor_Surface(face, True)
+    cylinder = surface.Cylinder()
+    axis = cylinder.Axis()
+    origin, direction = _xyz(axis.Location()), _xyz(axis.Direction())
+    along = _dot(origin, direction)
+    return {
+        "surface": surface,
+        "direction": direction,
+        # the point of the axis closest to the origin, the same for all coaxial cylinders
+        "foot": tuple(o - along * d for o, d in zip(origin, direction)),
+        "radius": cylinder.Radius(),
+        "bounds": breptools.UVBounds(face),  # umin, umax, vmin, vmax
+    }
+
+
+def _coaxial(a, b, tolerance):
+    return (
+        abs(abs(_dot(a["direction"], b["direction"])) - 1.0) <= ANGLE_TOLERANCE
+        and max(abs(p - q) for p, q in zip(a["foot"], b["foot"])) <= tolerance
+    )
+
+
+# Function to find the bends of a sheet metal part
+def find_bends(shape, thickness=None, tolerance=1e-3, index=None):
+    """
+    A bend is a pair of coaxial cylindrical faces, the inner and outer sides of
+    the sheet, whose radii differ by the thickness (any thickness if None) and
+    which join planar flanges, i.e. planes containing the direction of their
+    axis. Both sides of a bend touch the same faces, the sheet edges across the
+    bend, so candidates are only looked for among the neighbours of the
+    neighbours of each cylinder, in one pass over the face adjacency.
+    index: the TopologyIndex of shape, taken from the topology index cache if None
+    Returns:
+        a list of {angle (degrees), inner_radius, bend_length, start_point, end_point},
+        the bend line running along the middle of the inner face
+    """
+    from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
+    from OCC.Core.GeomAbs import GeomAbs_Cylinder, GeomAbs_Plane
+
+    from topology_index import get_topology_index
+
+    if index is None:
+        index = get_topology_index(shape)
+    cylinder_type, plane_type = int(GeomAbs_Cylinder), int(GeomAbs_Plane)
+    cylinders = {}  # face id -> _cylinder, read once
+    plane_normals = {}  # face id -> normal, read once
+
+    def cylinder(face_id):
+        if face_id not in cylinders:
+            cylinders[face_id] = _cylinder(index.face(face_id))
+        return cylinders[face_id]
+
+    def has_flange(face_id):
+        direction = cylinder(face_id)["direction"]
+        for neighbour in index.neighbours(face_id):
+            if index.face_types[neighbour] != plane_type:
+                continue
+            if neighbour not in plane_normals:
+                plane = BRepAdaptor_Surface(index.face(neighbour), True).Plane()
+                plane_normals[neighbour] = _xyz(plane.Axis().Direction())
+            if abs(_dot(plane_normals[neighbour], direction)) <= ANGLE_TOLERANCE:
+                return True
+        return False
+
+    bends = []
+    used = set()
+    for face_id in index.faces_of_type(cylinder_type):
+        face_id = int(face_id)
+        if face_id in used:
+            continue
+        inner = cylinder(face_id)
+        umin, umax = inner["bounds"][:2]
+        # full cylinders are holes and bosses, not bends
+        if umax - umin >= 2 * math.pi - ANGLE_TOLERANCE:
+            continue
+        match = None
+        for neighbour in index.neighbours(face_id):
+            for other_id in index.neighbours(neighbour):
+                other_id = int(other_id)
+                if other_id == face_id or other_id in used or index.face_types[other_id] != cylinder_type:
+                    continue
+                other = cylinder(other_id)
+                difference = abs(other["radius"] - inner["radius"])
+                if difference <= tolerance or (thickness is not None and abs(difference - thickness) > tolerance):
+                    continue
+                if _coaxial(inner, other, tolerance):
+                    match = other_id
+                    break
+            if match is not None:
+                break
+        if match is None or not (has_flange(face_id) or has_flange(match)):
+            continue
+        used.update((face_id, match))
+        if cylinders[match]["radius"] < inner["radius"]:
+            face_id, match = match, face_id
+        inner = cylinders[face_id]
+        umin, umax, vmin, vmax = inner["bounds"]
+        middle = (umin + umax) / 2
+        bends.append({
+            "angle": math.degrees(umax - umin),
+            "inner_radius": inner["radius"],
+            "bend_length": vmax - vmin,
+            "start_point": _point(_xyz(inner["surface"].Value(middle, vmin))),
+            "end_point": _point(_xyz(inner["surface"].Value(middle, vmax))),
+        })
+    return bends
+
+
+# Function to describe the bends of a part as the bending service of request_schema.jsonc
+def bending_service(bends):
+    return {
+        "enabled": bool(bends),
+        "bend_angles": [
+            {key: bend[key] for key in ("angle", "bend_length", "start_point", "end_point")}
+            for bend in bends
+        ],
+    }
+
+
+# Function to tell whether a part, a shape or the path of a STEP file, has bends
+def is_bent_sheet_metal(shape_or_path, thickness=None, tolerance=1e-3):
+    if isinstance(shape_or_path, (str, os.PathLike)):
+        from utils import load_step_file
+
+        shape_or_path = load_step_file(os.fspath(shape_or_path))
+    return bool(find_bends(shape_or_path, thickness, tolerance))
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import time
+
+    from utils import load_step_file
+
+    for file_path in sys.argv[1:] or ["models/Plate_1.step"]:
+        shape = load_step_file(file_path)
+        start = time.perf_counter()
+        bends = find_bends(shape)
+        elapsed = time.perf_counter() - start
+        print(f"{file_path}: {len(bends)} bends ({elapsed * 1000:.1f} ms)")
+        for bend in bends:
+            print(f"  {bend['angle']:.1f} deg, inner radius {bend['inner_radius']:.2f} mm, length {bend['bend_length']:.2f} mm")
+        print(json.dumps(bending_service(bends), indent=2))
@@ -1,40 +1,209 @@
-from utils import load_step_file
-from compute_step_properties import compute_bounding_box_mm
+import os
+from dataclasses import dataclass
 
-def is_sheet_metal(file_path: str):
-    length, breadth, thickness = get_revised_length_breadth_height(file_path)     
+import numpy as np
 
-    # Step 2: Set the thickness threshold for sheet metal
-    min_thickness = 0.3  # in mm # TODO: comes from the database #0.015 inch
-    max_thickness = 12.7  # in mm # TODO: comes from the database #0.50 inch
+from materials import thickness_limits_mm
 
-    # Step 3: Check if the smallest dimension (thickness) is within the threshold
-    if min_thickness <= thickness <= max_thickness:
-        # Step 4: Ensure other dimensions are much larger than the thickness
-        if length >= 10 * thickness and breadth >= 10 * thickness:
-            return True  # The object is likely sheet metal
+# Measuring modes, see measure_sheet
+MODES = ("fast", "precise")
+
+# Relative slack around the stock thicknesses of the material table
+THICKNESS_TOLERANCE = 0.05
+
+# Faces whose normal lines are less than this angle apart (radians) are parallel
+NORMAL_TOLERANCE = 1e-3
+
+# Parallel planes closer than this (mm) are the same plane
+MIN_GAP = 1e-3
+
+# Largest planar faces of each side considered when pairing a direction
+MAX_PAIRED_FACES = 8
+
+
+# Dimensions of a part seen as a sheet, all lengths in mm
+@dataclass
+class SheetDimensions:
+    length: float
+    breadth: float
+    thickness: float
+    method: str  # "planar faces" or "oriented box", where the thickness comes from
+    mode: str
+
+
+# Function to find the thickness between the dominant pair of opposite parallel planar faces
+def dominant_plane_pair(normals, offsets, areas):
+    """
+    normals: (n, 3) outward unit normals of the planar faces, offsets: normal . point
+    of each plane, areas: the weight of each face.
+    Faces are grouped by the line of their normal, each face joining the first
+    group, largest faces first, whose direction is parallel to its normal within
+    NORMAL_TOLERANCE; in each group, a face looking one way and a face looking
+    the other way, behind it, bound a slab of material.
+    The pair with the largest smaller area wins, i.e. the two sides of the sheet
+    rather than a pocket floor or a chamfer.
+    Returns:
+        the thickness, or None when no planar faces oppose each other
+    """
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    offsets = np.asarray(offsets, dtype=np.float64)
+    areas = np.asarray(areas, dtype=np.float64)
+    if not len(normals):
+        return None
+    # compared with the group directions rather than bucketed, so that nearly
+    # equal normals never end up on both sides of a bucket border
+    min_cos = np.cos(NORMAL_TOLERANCE)
+    directions = np.empty_like(normals)  # of the groups, the normal of their largest face
+    group_count = 0
+    groups = np.empty(len(normals), dtype=np.int64)
+    signs = np.ones(len(normals))  # +1 when a face looks along the direction of its group
+    for face in np.argsort(-areas, kind="stable"):
+        cosines = directions[:group_count] @ normals[face]
+        group = int(np.argmax(np.abs(cosines))) if group_count else 0
+        if not group_count or abs(cosines[group]) < min_cos:
+            group = group_count
+            directions[group] = normals[face]
+            group_count += 1
+        elif cosines[group] < 0.0:
+            signs[face] = -1.0
+        groups[face] = group
+    positions = offsets * signs  # along the direction of the group
+    best_area, best_thickness = 0.0, None
+    for group in range(group_count):
+        members = np.flatnonzero(groups == group)
+        ahead = members[signs[members] > 0.0]
+        behind = members[signs[members] < 0.0]
+        if not len(ahead) or not len(behind):
+            continue
+        ahead = ahead[np.argsort(-areas[ahead])][:MAX_PAIRED_FACES]
+        behind = behind[np.argsort(-areas[behind])][:MAX_PAIRED_FACES]
+        # the face looking ahead must be in front of the one looking behind
+        gaps = positions[ahead][:, None] - positions[behind][None, :]
+        weights = np.minimum(areas[ahead][:, None], areas[behind][None, :])
+        weights[gaps <= MIN_GAP] = 0.0
+        i, j = np.unravel_index(np.argmax(weights), weights.shape)
+        if weights[i, j] > best_area:
+            best_area, best_thickness = weights[i, j], float(gaps[i, j])
+    return best_thickness
+
+
+# Function to read the outward normal, offset and area of the planar faces of a shape
+def _planar_faces(index, mode):
+    from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
+    from OCC.Core.BRepTools import breptools
+    from OCC.Core.GeomAbs import GeomAbs_Plane
+    from OCC.Core.TopAbs import TopAbs_REVERSED
+
+    from compute_step_properties import compute_surface_area_mm2
+
+    face_ids = index.faces_of_type(GeomAbs_Plane)
+    normals = np.empty((len(face_ids), 3))
+    offsets = np.empty(len(face_ids))
+    areas = np.empty(len(face_ids))
+    for row, face_id in enumerate(face_ids):
+        face = index.face(face_id)
+        plane = BRepAdaptor_Surface(face, True).Plane()
+        direction, location = plane.Axis().Direction(), plane.Location()
+        normal = np.array((direction.X(), direction.Y(), direction.Z()))
+        if face.Orientation() == TopAbs_REVERSED:
+            normal = -normal
+        normals[row] = normal
+        offsets[row] = normal @ (location.X(), location.Y(), location.Z())
+        if mode == "precise":
+            areas[row] = compute_surface_area_mm2(face)
         else:
-            return False  # The object is too thick relative to its other dimensions
-    else:
-        return False  # The object is not within the sheet metal thickness range
+            # area of the parameter box, exact for rectangles, an upper bound otherwise
+            umin, umax, vmin, vmax = breptools.UVBounds(face)
+            areas[row] = (umax - umin) * (vmax - vmin)
+    return normals, offsets, areas
+
+
+# Function to compute the sides of the oriented bounding box of a shape, ascending
+def oriented_box_sizes(shape, mode="fast"):
+    from OCC.Core.Bnd import Bnd_OBB
+    from OCC.Core.BRepBndLib import brepbndlib
+
+    obb = Bnd_OBB()
+    # fast: principal axes of the points; precise: the tightest box, much slower
+    brepbndlib.AddOBB(shape, obb, True, mode == "precise", True)
+    return sorted(2.0 * size for size in (obb.XHSize(), obb.YHSize(), obb.ZHSize()))
+
 
-def get_revised_length_breadth_height(file_path: str):
+# Function to measure a part as a sheet, whatever its orientation in the model
+def measure_sheet(shape, mode="fast", index=None):
     """
-    Gives the smallest dimension as the thickness, and the other two as length and breadth.
+    The thickness is the distance between the dominant pair of opposite planar
+    faces, or the smallest side of the oriented bounding box when the part has
+    none. Length and breadth are the two other sides of that box.
+    mode: "fast" weighs the planar faces by their parameter box and takes the
+    principal axes box, both linear in the size of the part; "precise" measures
+    the face areas and searches the tightest box, several times slower.
+    index: the TopologyIndex of shape, taken from the topology index cache if None
+    """
+    from topology_index import get_topology_index
+
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}, expected one of {MODES}")
+    if index is None:
+        index = get_topology_index(shape)
+    sizes = oriented_box_sizes(shape, mode)
+    thickness = dominant_plane_pair(*_planar_faces(index, mode))
+    method = "planar faces"
+    if thickness is None:
+        thickness, method = sizes[0], "oriented box"
+    return SheetDimensions(length=sizes[1], breadth=sizes[2], thickness=thickness, method=method, mode=mode)
+
+
+def _load(shape_or_path):
+    if isinstance(shape_or_path, (str, os.PathLike)):
+        from utils import load_step_file
+
+        return load_step_file(os.fspath(shape_or_path))
+    return shape_or_path
+
+
+# Function to tell whether a part, a shape or the path of a STEP file, can be made from sheet stock
+def is_sheet_metal(shape_or_path, material=None, mode="fast"):
+    """
+    material: a material of the material table, any material if None
+    """
+    return is_sheet(measure_sheet(_load(shape_or_path), mode), material)
+
+
+# Function to check measured dimensions against the stock of the material table
+def is_sheet(dimensions, material=None):
+    thickness = dimensions.thickness
+
+    # the thinnest and thickest stock of the material table
+    min_thickness, max_thickness = thickness_limits_mm(material)
+
+    if min_thickness * (1 - THICKNESS_TOLERANCE) <= thickness <= max_thickness * (1 + THICKNESS_TOLERANCE):
+        # Ensure other dimensions are much larger than the thickness
+        return dimensions.length >= 10 * thickness and dimensions.breadth >= 10 * thickness
+    return False  # The object is not within the sheet metal thickness range
+
+
+def get_revised_length_breadth_height(shape_or_path, mode="fast"):
+    """
+    Gives the thickness of the sheet, and the other two sides as length and breadth.
     Returns:
         length, breadth, thickness
     """
-    shape = load_step_file(file_path)
-    length, breadth, height = compute_bounding_box_mm(shape)
-
-    # Step 1: Identify the smallest dimension, assumed to be the thickness
-    dimensions = sorted([length, breadth, height])
-    thickness = dimensions[0]  # Smallest dimension is treated as the thickness
-    length = dimensions[1]
-    breadth = dimensions[2]
+    dimensions = measure_sheet(_load(shape_or_path), mode)
+    return dimensions.length, dimensions.breadth, dimensions.thickness
 
-    return length, breadth, thickness
 
 if __name__ == "__main__":
-    file_path = "models/Plate_1.step"
-    print(is_sheet_metal(file_path))
+    import sys
+    import time
+
+    from utils import load_step_file
+
+    for file_path in sys.argv[1:] or ["models/Plate_1.step"]:
+        shape = load_step_file(file_path)
+        for mode in MODES:
+            start = time.perf_counter()
+            dimensions = measure_sheet(shape, mode)
+            elapsed = time.perf_counter() - start
+            print(f"{file_path} ({mode}, {elapsed * 1000:.1f} ms): {dimensions}")
+        print("sheet metal:", is_sheet_metal(shape))
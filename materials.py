@@ -0,0 +1,104 @@
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Material/gauge table of the shop, one row per material
+MATERIALS_CSV = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "sheetmetal-ops", "xlogic-sheet-ops", "materials.csv"
+)
+
+MM_PER_INCH = 25.4
+
+_INCHES_RE = re.compile(r'([0-9]*\.?[0-9]+)\s*"')
+
+# A service cell: Yes or No, optionally followed by the thicknesses it applies to, e.g. Yes (0.125" & 0.250")
+_SERVICE_RE = re.compile(r"(yes|no)\b\s*(?:\((.*)\))?", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Material:
+    name: str
+    thicknesses_mm: tuple  # available stock thicknesses, ascending
+    services: frozenset  # column names of the table answered "Yes", e.g. "Bending"
+    description: str = ""
+    # service -> the only stock thicknesses it is offered for, listed in parentheses after the "Yes"
+    service_thicknesses_mm: dict = field(default_factory=dict, compare=False)
+
+    def offers(self, service, thickness_mm=None, tolerance=0.05):
+        """
+        thickness_mm: the thickness of the part, also checked against the
+        thicknesses listed for the service, within a relative tolerance
+        """
+        if service not in self.services:
+            return False
+        listed = self.service_thicknesses_mm.get(service)
+        if thickness_mm is None or not listed:
+            return True
+        return any(abs(thickness_mm - t) <= tolerance * t for t in listed)
+
+
+# Function to read the "Available Thicknesses" cell, inch values like 0.040", 0.063"
+def parse_thicknesses_mm(text):
+    return tuple(sorted(float(value) * MM_PER_INCH for value in _INCHES_RE.findall(text)))
+
+
+# Function to read a service cell like Yes, No or Yes (0.125" & 0.250")
+def parse_service(text):
+    """
+    Returns:
+        (offered, the listed thicknesses in mm, ascending, empty if none), or None
+        when the cell is not a service answer
+    """
+    match = _SERVICE_RE.fullmatch((text or "").strip())
+    if match is None:
+        return None
+    return match.group(1).lower() == "yes", parse_thicknesses_mm(match.group(2) or "")
+
+
+# Function to load the material table, read once per path
+@lru_cache(maxsize=None)
+def load_materials(csv_path=MATERIALS_CSV):
+    """
+    Returns:
+        a dict of Material by name, in the order of the table
+    """
+    materials = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = row["Material"].strip()
+            services = {}
+            for column, value in row.items():
+                answer = parse_service(value)
+                if answer is not None and answer[0]:
+                    services[column] = answer[1]
+            materials[name] = Material(
+                name=name,
+                thicknesses_mm=parse_thicknesses_mm(row["Available Thicknesses"]),
+                services=frozenset(services),
+                description=row.get("Description", "").strip(),
+                service_thicknesses_mm={column: listed for column, listed in services.items() if listed},
+            )
+    return materials
+
+
+# Function to look up a material by name, ignoring case
+def find_material(name, csv_path=MATERIALS_CSV):
+    materials = load_materials(csv_path)
+    for material_name, material in materials.items():
+        if material_name.lower() == name.strip().lower():
+            return material
+    raise KeyError(f"unknown material {name!r}, expected one of {list(materials)}")
+
+
+# Function to get the thinnest and thickest stock, of one material or of all of them
+def thickness_limits_mm(material=None, csv_path=MATERIALS_CSV):
+    if material is not None:
+        thicknesses = find_material(material, csv_path).thicknesses_mm
+    else:
+        thicknesses = [t for m in load_materials(csv_path).values() for t in m.thicknesses_mm]
+    if not thicknesses:
+        raise ValueError(f"no thickness available for {material or 'any material'}")
+    return min(thicknesses), max(thicknesses)
+
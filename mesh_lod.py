@@ -0,0 +1,22 @@
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Copy
+
+# Levels of detail are opt-in: each level meshes the shape once more, which only
+# pays off for large parts whose full mesh takes long to download
+DEFAULT_LOD_FACTORS = ()
+
+# mesh_quality multipliers of coarse levels of detail worth writing for large parts,
+# coarsest first. The pages show the coarsest level as soon as it is downloaded and
+# swap in the finer ones as they arrive.
+COARSE_LOD_FACTORS = (16.0, 4.0)
+
+
+# Function to copy a shape without its triangulation, BRepMesh would otherwise keep the
+# finer existing one instead of computing the coarse levels. The shape of the caller,
+# often the instance held by the shape cache, is left untouched.
+def unmeshed_copy(shape):
+    return BRepBuilderAPI_Copy(shape, True, False).Shape()
+
+
+# Function to name the file of a coarse level of detail after the full mesh file
+def lod_name(name, level):
+    return f"{name}_lod{level}"
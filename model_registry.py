@@ -0,0 +1,132 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from shape_cache import get_shape_cache
+from topology_index import forget_topology_index
+from utils import load_step_file, shape_cache_key
+
+# Folders searched when a model is requested by id rather than by path
+MODEL_SEARCH_PATHS = ("models", "uploads")
+STEP_EXTENSIONS = ("", ".step", ".stp", ".STEP", ".STP")
+
+# A model id is a file name without folders, e.g. "Plate_1" or an upload hash
+MODEL_ID_RE = re.compile(r"[\w][\w.\- ]*")
+
+
+class ModelRegistry:
+    """Parts loaded on first request by id or path, with a bounded number kept resident.
+
+    Least recently used models are dropped once there are more than max_models
+    of them, or once their accounted size goes over max_bytes. A dropped model
+    is also dropped from the in-memory shape cache and topology index cache, so
+    that nothing else keeps it alive (its BRep dump stays on disk). The size of
+    a model is only an estimate: the size of its STEP file, a cheap proxy of the
+    memory held by the parsed B-rep, which may be several times larger.
+    """
+
+    def __init__(self, max_models=8, max_bytes=256 * 1024 * 1024, search_paths=MODEL_SEARCH_PATHS):
+        self._max_models = max_models
+        self._max_bytes = max_bytes
+        self._search_paths = search_paths
+        self._models = OrderedDict()  # path -> (shape, estimated bytes, shape cache key)
+        self._lock = threading.Lock()
+        self._loading = {}  # path -> lock, so that one model is never parsed twice at once
+        self.resident_bytes = 0
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def resolve(self, model_id: str):
+        """Returns the STEP file path of a model id, only looked up in the search paths.
+
+        Model ids come from clients, so paths are refused: an id has no folder
+        separator, no ".." and is not absolute.
+        """
+        if not isinstance(model_id, str) or not MODEL_ID_RE.fullmatch(model_id) or ".." in model_id:
+            raise ValueError(f"invalid model id {model_id!r}, expected a file name without folders")
+        for folder in self._search_paths:
+            for extension in STEP_EXTENSIONS:
+                path = os.path.join(folder, f"{model_id}{extension}")
+                if os.path.isfile(path):
+                    return os.path.abspath(path)
+        raise KeyError(f"unknown model {model_id!r}")
+
+    def get(self, model_id: str):
+        path = self.resolve(model_id)
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is not None:
+                self._models.move_to_end(path)
+                self.hits += 1
+                return entry[0]
+            loading_lock = self._loading.setdefault(path, threading.Lock())
+        with loading_lock:
+            with self._lock:
+                entry = self._models.get(path)
+                if entry is not None:  # loaded by another thread while we waited
+                    self.hits += 1
+                    return entry[0]
+            try:
+                shape = load_step_file(path)
+                entry = (shape, os.path.getsize(path), shape_cache_key(path))
+            finally:
+                # a failed load must not leave its lock behind
+                with self._lock:
+                    self._loading.pop(path, None)
+            with self._lock:
+                self._models[path] = entry
+                self.resident_bytes += entry[1]
+                self.loads += 1
+                evicted = self._evict()
+        for evicted_entry in evicted:
+            self._release(evicted_entry)
+        return shape
+
+    def shape_key(self, model_id: str):
+        """The shape cache key of a resident model, None if it is not loaded"""
+        path = self.resolve(model_id)
+        with self._lock:
+            entry = self._models.get(path)
+            return entry[2] if entry is not None else None
+
+    def _evict(self):
+        # the model that was just added is never evicted
+        evicted = []
+        while len(self._models) > 1 and (
+            len(self._models) > self._max_models or self.resident_bytes > self._max_bytes
+        ):
+            _, entry = self._models.popitem(last=False)
+            self.resident_bytes -= entry[1]
+            self.evictions += 1
+            evicted.append(entry)
+        return evicted
+
+    @staticmethod
+    def _release(entry):
+        # the caches would otherwise keep the dropped shape in memory
+        shape, _, key = entry
+        get_shape_cache().forget(key)
+        forget_topology_index(shape)
+
+    def unload(self, model_id: str):
+        path = self.resolve(model_id)
+        with self._lock:
+            entry = self._models.pop(path, None)
+            if entry is not None:
+                self.resident_bytes -= entry[1]
+        if entry is not None:
+            self._release(entry)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "resident_models": [os.path.relpath(path) for path in self._models],
+                "resident_bytes": self.resident_bytes,
+                "max_models": self._max_models,
+                "max_bytes": self._max_bytes,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
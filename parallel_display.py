@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+DEFAULT_COLOR = (0.65, 0.65, 0.7)
+
+
+# Function to normalize display items, either shapes or (shape, color, name) tuples
+def display_items(items, default_color=DEFAULT_COLOR):
+    normalized = []
+    for item in items:
+        if not isinstance(item, (tuple, list)):
+            item = (item,)
+        shape, color, name = (tuple(item) + (None, None))[:3]
+        normalized.append((shape, color if color is not None else default_color, name))
+    return normalized
+
+
+# Function to pick the number of worker processes, None means one per core
+def worker_count(workers=None, job_count=None):
+    workers = workers or os.cpu_count() or 1
+    return max(1, min(workers, job_count)) if job_count is not None else workers
+
+
+# Function to run the tessellation jobs of a renderer over a process pool
+def run_display_jobs(worker, jobs, workers=None, initializer=None, initargs=()):
+    """Every job is the argument tuple of worker, its first argument being the
+    BRep bytes of the shape: shapes cannot be pickled, so they are shipped
+    serialized and rebuilt with shape_cache.shape_from_bytes in the worker.
+
+    Yields:
+        (job index, worker result) as the jobs complete
+    """
+    # biggest shapes first so that a large part does not end up alone at the tail
+    order = sorted(range(len(jobs)), key=lambda i: len(jobs[i][0]), reverse=True)
+    with ProcessPoolExecutor(
+        max_workers=worker_count(workers, len(jobs)), initializer=initializer, initargs=initargs
+    ) as executor:
+        futures = {executor.submit(worker, *jobs[i]): i for i in order}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,70 @@
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(kind: bytes, data: bytes):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+# Function to encode 8 bit RGB pixels (row major, top row first) as a PNG file
+def encode_png(width, height, rgb: bytes, compression=6):
+    if len(rgb) != width * height * 3:
+        raise ValueError(f"expected {width * height * 3} bytes of RGB pixels, got {len(rgb)}")
+    stride = width * 3
+    # filter type 0 (none) in front of every row
+    raw = b"".join(b"\0" + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    return (
+        PNG_SIGNATURE
+        + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + _chunk(b"IDAT", zlib.compress(raw, compression))
+        + _chunk(b"IEND", b"")
+    )
+
+
+def write_png(file_path, width, height, rgb: bytes, compression=6):
+    with open(file_path, "wb") as f:
+        f.write(encode_png(width, height, rgb, compression))
+
+
+# Function to read a binary PPM (P6) image, the format OCC can dump a view to
+def read_ppm(file_path):
+    """
+    Returns:
+        width, height and the 8 bit RGB pixels
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    fields = []
+    position = 0
+    # magic, width, height and maxval, separated by whitespace, with # comments
+    while len(fields) < 4:
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b"#":
+            position = data.index(b"\n", position) + 1
+            continue
+        end = position
+        while not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[position:end])
+        position = end
+    if fields[0] != b"P6" or int(fields[3]) != 255:
+        raise ValueError(f"{file_path} is not an 8 bit binary PPM file")
+    width, height = int(fields[1]), int(fields[2])
+    pixels = data[position + 1:position + 1 + width * height * 3]
+    return width, height, pixels
+
+
+# Function to place same height RGB images side by side
+def hstack_rgb(images):
+    """images are (width, height, rgb) tuples, returns the (width, height, rgb) of the strip"""
+    height = images[0][1]
+    if any(image[1] != height for image in images):
+        raise ValueError("images of a strip must have the same height")
+    rows = []
+    for y in range(height):
+        for width, _, rgb in images:
+            rows.append(rgb[y * width * 3:(y + 1) * width * 3])
+    return sum(image[0] for image in images), height, b"".join(rows)
@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from batch_analyze import collect_step_files
+
+# Metric tap drill diameter (mm) -> thread size, holes of these diameters can be quoted as tapped
+TAP_DRILL_SIZES = {
+    2.5: "M3",
+    3.3: "M4",
+    4.2: "M5",
+    5.0: "M6",
+    6.8: "M8",
+    8.5: "M10",
+    10.2: "M12",
+}
+TAP_DRILL_TOLERANCE = 0.05  # mm
+
+# Cutting process of the quote -> its service column in the material table
+CUT_SERVICES = {
+    "Laser": "Laser Cutting",
+    "Waterjet": "Waterjet Cutting",
+    "CNC": "CNC Routing",
+}
+
+
+class StageReport:
+    """Wall time and Python memory of each stage of a pipeline run.
+
+    Memory is measured with tracemalloc, so only allocations made by Python
+    objects (numpy arrays included) are seen, not those made inside OCC.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"stage": name, "seconds": time.perf_counter() - start}
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record["memory_delta_bytes"] = current - before
+                record["memory_peak_bytes"] = peak - before
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(record)
+
+    @property
+    def total_seconds(self):
+        return sum(record["seconds"] for record in self.stages)
+
+    def format(self):
+        lines = []
+        for record in self.stages:
+            line = f"{record['stage']:>12}: {record['seconds'] * 1000:8.1f} ms"
+            if "memory_peak_bytes" in record:
+                line += f", peak {record['memory_peak_bytes'] / 1024 / 1024:7.2f} MiB, kept {record['memory_delta_bytes'] / 1024 / 1024:7.2f} MiB"
+            lines.append(line)
+        lines.append(f"{'total':>12}: {self.total_seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+def _point(xyz):
+    return {"x": xyz[0], "y": xyz[1], "z": xyz[2]}
+
+
+# Function to find the thread size of a hole drilled for tapping, None if it is not a tap drill size
+def thread_size(diameter):
+    for drill, size in TAP_DRILL_SIZES.items():
+        if abs(diameter - drill) <= TAP_DRILL_TOLERANCE:
+            return size
+    return None
+
+
+# Function to describe the tapped holes as the tapping service of request_schema.jsonc
+def tapping_service(holes, tapped_sizes=()):
+    """
+    tapped_sizes: the thread sizes to tap, e.g. ("M6",); the holes drilled for
+    one of them are quoted as tapped. Nothing is tapped by default, a hole of a
+    tap drill diameter is just as likely a plain clearance hole.
+    """
+    unknown = set(tapped_sizes) - set(TAP_DRILL_SIZES.values())
+    if unknown:
+        raise ValueError(f"unknown thread sizes {sorted(unknown)}, expected some of {list(TAP_DRILL_SIZES.values())}")
+    tapped = [(thread_size(hole["diameter"]), hole) for hole in holes]
+    tapped = [(size, hole) for size, hole in tapped if size is not None and size in tapped_sizes]
+    sizes = Counter(size for size, _ in tapped)
+    return {
+        "enabled": bool(tapped),
+        "quantity": len(tapped),
+        # the schema has one thread size per order, the most common one
+        "thread_size": sizes.most_common(1)[0][0] if sizes else "",
+        "coordinates": [_point(hole["axis"]["origin"]) for _, hole in tapped],
+    }
+
+
+# Function to list the services of a quote the material table does not offer for the part
+def unavailable_services(material, thickness, services):
+    """
+    services: the column names of the material table the quote needs
+    Returns:
+        the services the material does not offer at that thickness, none if material is None
+    """
+    from materials import find_material
+
+    if material is None:
+        return []
+    found = find_material(material)
+    return [service for service in services if not found.offers(service, thickness)]
+
+
+# Function to build the quote document of request_schema.jsonc for one part, loading it once
+def build_quote(file_path, material=None, mode="fast", cut_type="Laser", quantity=1, trace_memory=True, tapped_sizes=()):
+    """
+    tapped_sizes: thread sizes to quote the matching holes as tapped, see tapping_service
+    Returns:
+        the quote document, and a dict with the StageReport, the measured
+        dimensions, whether the part fits the stock and all the holes found
+    """
+    from cut_path import compute_cut_path
+    from get_holes import cluster_holes, find_hole_circles
+    from is_bent_sheet_metal import bending_service, find_bends
+    from is_sheet_metal import is_sheet, measure_sheet
+    from topology_index import get_topology_index
+    from utils import load_step_file, shape_cache_key
+
+    report = StageReport(trace_memory)
+    with report.stage("load"):
+        shape = load_step_file(file_path)
+    with report.stage("topology"):
+        index = get_topology_index(shape, shape_cache_key(file_path))
+    with report.stage("dimensions"):
+        dimensions = measure_sheet(shape, mode, index)
+        sheet = is_sheet(dimensions, material)
+    with report.stage("cutting"):
+        cut_path = compute_cut_path(shape, index=index)
+    with report.stage("holes"):
+        holes, _ = cluster_holes(find_hole_circles(shape, index))
+    with report.stage("bending"):
+        thickness = dimensions.thickness
+        bends = find_bends(shape, thickness, max(1e-3, 0.01 * thickness), index)
+
+    document = {
+        "material": {"type": material or "", "grade": "", "thickness": thickness},
+        # the schema calls the longer in-plane side the length, SheetDimensions calls it the breadth
+        "dimensions": {
+            "length": max(dimensions.length, dimensions.breadth),
+            "width": min(dimensions.length, dimensions.breadth),
+        },
+        "cutting": cut_path.to_cutting(cut_type),
+        "hardware_insertions": [],
+        "finish": {"type": "", "color": ""},
+        "services": {
+            "tapping": tapping_service(holes, tapped_sizes),
+            "bending": bending_service(bends),
+            "countersinking": {"enabled": False, "details": []},
+            "dimple_forming": {"enabled": False, "details": []},
+        },
+        "quantity": quantity,
+        "custom_instructions": "",
+        "delivery": {
+            "priority": "",
+            "location": {"address": "", "zip_code": "", "country": "", "plus_code": ""},
+        },
+    }
+    services = document["services"]
+    needed = [CUT_SERVICES.get(cut_type, cut_type)]
+    needed += [column for column, name in (("Bending", "bending"), ("Tapping", "tapping")) if services[name]["enabled"]]
+    details = {
+        "report": report,
+        "unavailable_services": unavailable_services(material, thickness, needed),
+        "dimensions": dimensions,
+        "is_sheet_metal": sheet,
+        "cut_path": cut_path,
+        "holes": holes,
+    }
+    return document, details
+
+
+# Function to quote one part, never raises so that one bad file does not stop the batch
+def quote_part(file_path, **options):
+    start = time.perf_counter()
+    try:
+        document, details = build_quote(file_path, **options)
+        return {
+            "file": file_path,
+            "ok": True,
+            "quote": document,
+            "is_sheet_metal": details["is_sheet_metal"],
+            "pierce_count": details["cut_path"].pierce_count,
+            "hole_count": len(details["holes"]),
+            "unavailable_services": details["unavailable_services"],
+            "stages": details["report"].stages,
+            "elapsed_s": time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {
+            "file": file_path,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+            "elapsed_s": time.perf_counter() - start,
+        }
+
+
+# Function to quote many parts, over a process pool when workers > 1, yields results as they complete
+def quote_batch(file_paths, workers=1, **options):
+    if workers <= 1:
+        for file_path in file_paths:
+            yield quote_part(file_path, **options)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # biggest files first so that a large part does not end up alone at the tail
+        ordered = sorted(file_paths, key=os.path.getsize, reverse=True)
+        futures = [executor.submit(quote_part, path, **options) for path in ordered]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    from is_sheet_metal import MODES
+
+    parser = argparse.ArgumentParser(description="Build request_schema.jsonc quote documents from STEP files, one JSON line per part")
+    parser.add_argument("inputs", nargs="+", help="directories, glob patterns or STEP files")
+    parser.add_argument("--material", default=None, help="material of the material table, any if omitted")
+    parser.add_argument("--mode", default="fast", choices=MODES, help="sheet measuring mode")
+    parser.add_argument("--cut-type", default="Laser", help="cutting process written in the quote")
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument(
+        "--tap", action="append", default=[], choices=list(TAP_DRILL_SIZES.values()),
+        help="quote the holes drilled for this thread size as tapped, may be repeated",
+    )
+    parser.add_argument("-j", "--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("-o", "--output", default=None, help="write JSON lines to this file instead of stdout")
+    parser.add_argument("--no-memory", action="store_true", help="do not trace memory, it slows the stages down")
+    args = parser.parse_args(argv)
+
+    file_paths = []
+    for pattern in args.inputs:
+        file_paths.extend(collect_step_files(pattern))
+    if not file_paths:
+        parser.error("no STEP file found")
+
+    options = {
+        "material": args.material,
+        "mode": args.mode,
+        "cut_type": args.cut_type,
+        "quantity": args.quantity,
+        "trace_memory": not args.no_memory,
+        "tapped_sizes": tuple(args.tap),
+    }
+    out = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    failures = 0
+    stage_seconds = Counter()
+    try:
+        for result in quote_batch(file_paths, args.workers, **options):
+            if result["ok"]:
+                for record in result["stages"]:
+                    stage_seconds[record["stage"]] += record["seconds"]
+                if result["unavailable_services"]:
+                    print(f"{result['file']}: not offered for this material and thickness: "
+                          f"{', '.join(result['unavailable_services'])}", file=sys.stderr)
+            else:
+                failures += 1
+                print(f"{result['file']}: {result['error']}", file=sys.stderr)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    # where the quoting time goes, summed over the parts
+    for stage, seconds in stage_seconds.items():
+        print(f"{stage:>12}: {seconds:8.2f} s", file=sys.stderr)
+    print(
+        f"{len(file_paths)} parts, {failures} failed, {elapsed:.2f} s "
+        f"({len(file_paths) / elapsed:.2f} parts/s)",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
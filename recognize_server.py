@@ -1,7 +1,16 @@
-from http.server import SimpleHTTPRequestHandler, HTTPServer
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlparse, parse_qs
+import hashlib
 import json
 import os
+import re
 import sys
+import threading
+import time
+import uuid
 
 # Import the recognize_batch function from xViewer
 from xLogic_web_viewer import recognize_batch
@@ -9,29 +18,262 @@ from xLogic_web_viewer import recognize_batch
 # Import the get_all_properties function from xViewer
 from xLogic_web_viewer import get_all_properties
 
+# Parts resident in memory, shared with xViewer
+from xLogic_web_viewer import registry, DEFAULT_MODEL
+
+from model_registry import MODEL_SEARCH_PATHS
+
+# Uploaded STEP files are stored by content hash, so a client can reuse one;
+# the hash is the model id of the upload, the folder is one of MODEL_SEARCH_PATHS
+UPLOAD_FOLDER = "uploads"
+
+# Longest time a client may wait on GET /jobs/<id>?wait=...
+MAX_WAIT_S = 60.0
+
+# Uploads are named after the sha256 of their bytes, nothing else is a valid hash
+FILE_HASH_RE = re.compile(r"[0-9a-f]{64}")
+
+JOB_KINDS = {
+    "properties": get_all_properties,
+    "recognize": recognize_batch,
+}
+
+
+# Function run in a worker process, returns when the job started and its result
+def _run_job(kind, file_hash):
+    started_at = time.time()
+    # the registry of the worker keeps the part resident for its next jobs on the same upload
+    return started_at, JOB_KINDS[kind](model_id=file_hash)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    file_hash: str
+    status: str = "queued"  # queued, running, done or failed
+    result: object = None
+    error: str = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: object = field(default=None, repr=False)
+
+    def to_dict(self):
+        status = self.status
+        if status == "queued" and self.future is not None and self.future.running():
+            status = "running"
+        result = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "hash": self.file_hash,
+            "status": status,
+        }
+        if self.finished_at is not None:
+            result["queue_s"] = self.started_at - self.submitted_at
+            result["latency_s"] = self.finished_at - self.submitted_at
+        if self.status == "done":
+            result["result"] = self.result
+        elif self.status == "failed":
+            result["error"] = self.error
+        return result
+
+
+class JobQueue:
+    """Runs the OCC work of the jobs on a bounded pool of worker processes.
+
+    OCC recognition holds the GIL and the shapes it works on are not safe to
+    share between threads, so every worker process loads its own copy of a
+    part (through its own model registry and the on-disk shape cache).
+    """
+
+    def __init__(self, workers=None, upload_folder=UPLOAD_FOLDER, max_finished_jobs=10000):
+        if os.path.normpath(upload_folder) not in MODEL_SEARCH_PATHS:
+            # the workers find the uploads by hash through the model registry
+            raise ValueError(f"upload folder must be one of the model search paths {MODEL_SEARCH_PATHS}")
+        self._workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        self._upload_folder = upload_folder
+        self._jobs = {}
+        self._finished = deque()
+        self._max_finished_jobs = max_finished_jobs
+        self._latencies = deque(maxlen=1000)
+        self._lock = threading.Lock()
+        self._pending = 0  # submitted and not finished yet
+        self.completed = 0
+        self.failed = 0
+        os.makedirs(self._upload_folder, exist_ok=True)
+
+    def step_path(self, file_hash):
+        if not isinstance(file_hash, str) or not FILE_HASH_RE.fullmatch(file_hash):
+            raise ValueError(f"invalid file hash {file_hash!r}, expected 64 lowercase hex digits")
+        return os.path.join(self._upload_folder, f"{file_hash}.step")
+
+    def store_upload(self, data: bytes):
+        """Stores an uploaded STEP file under its content hash and returns the hash"""
+        file_hash = hashlib.sha256(data).hexdigest()
+        path = self.step_path(file_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return file_hash
+
+    def submit(self, kind, file_hash):
+        if not isinstance(kind, str) or kind not in JOB_KINDS:
+            raise ValueError(f"unknown job kind {kind!r}, expected one of {sorted(JOB_KINDS)}")
+        if not os.path.exists(self.step_path(file_hash)):
+            raise KeyError(f"no uploaded file with hash {file_hash}")
+        job = Job(id=uuid.uuid4().hex, kind=kind, file_hash=file_hash)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._pending += 1
+        job.future = self._executor.submit(_run_job, kind, file_hash)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _finish(self, job, future):
+        job.finished_at = time.time()
+        try:
+            job.started_at, job.result = future.result()
+            job.status = "done"
+        except Exception as e:
+            job.started_at = job.started_at or job.finished_at
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        with self._lock:
+            self._pending -= 1
+            if job.status == "done":
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._latencies.append(job.finished_at - job.submitted_at)
+            # forget the oldest results so that a long running server does not grow forever
+            self._finished.append(job.id)
+            while len(self._finished) > self._max_finished_jobs:
+                self._jobs.pop(self._finished.popleft(), None)
+        job.done.set()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            running = min(self._pending, self._workers)
+            stats = {
+                # the parts resident for the legacy endpoints, workers have their own
+                "models": registry.stats(),
+                "queue_depth": self._pending - running,
+                "running": running,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        if latencies:
+            stats["latency_s"] = {
+                "mean": sum(latencies) / len(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "max": latencies[-1],
+            }
+        return stats
+
+
 class CustomHandler(SimpleHTTPRequestHandler):
+    job_queue = None  # set by start_recognize_server
+    legacy_lock = threading.Lock()  # serializes the synchronous endpoints
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/jobs':
+            self.send_json({"error": "not found"}, 404)
+            return
+        query = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        kind = query.get('kind', ['properties'])[0]
+        # either the STEP file itself, or {"hash": ..., "kind": ...} for an already uploaded one
+        if self.headers.get('Content-type', '').startswith('application/json'):
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                self.send_json({"error": "invalid JSON body"}, 400)
+                return
+            if not isinstance(request, dict):
+                self.send_json({"error": "expected a JSON object"}, 400)
+                return
+            file_hash = request.get('hash')
+            kind = request.get('kind', kind)
+        else:
+            file_hash = self.job_queue.store_upload(body) if body else None
+        if not file_hash:
+            self.send_json({"error": "expected a STEP file or a JSON body with a hash"}, 400)
+            return
+        try:
+            job = self.job_queue.submit(kind, file_hash)
+        except ValueError as e:
+            self.send_json({"error": str(e)}, 400)
+            return
+        except KeyError as e:
+            self.send_json({"error": str(e.args[0])}, 404)
+            return
+        self.send_json(job.to_dict(), 202)
+
     def do_GET(self):
-        if self.path == '/recognize_batch':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            # Call the recognize_batch function here
-            results = recognize_batch()
-            self.wfile.write(json.dumps(results).encode())
-        elif self.path == '/get_properties':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            # Call the get_all_properties function here
-            properties = get_all_properties()
-            self.wfile.write(json.dumps(properties).encode())
+        url = urlparse(self.path)
+        if url.path.startswith('/jobs/'):
+            job = self.job_queue.get(url.path[len('/jobs/'):])
+            if job is None:
+                self.send_json({"error": "unknown job"}, 404)
+                return
+            # long-poll: wait for the job to finish, at most `wait` seconds
+            wait = parse_qs(url.query).get('wait', ['0'])[0]
+            try:
+                wait = min(float(wait), MAX_WAIT_S)
+            except ValueError:
+                wait = 0.0
+            if wait > 0:
+                job.done.wait(wait)
+            self.send_json(job.to_dict())
+        elif url.path == '/stats':
+            self.send_json(self.job_queue.stats())
+        elif url.path in ('/recognize_batch', '/get_properties'):
+            model_id = parse_qs(url.query).get('model', [DEFAULT_MODEL])[0]
+            try:
+                # the shapes of the shared registry are not safe to use from several threads
+                with self.legacy_lock:
+                    if url.path == '/recognize_batch':
+                        # Call the recognize_batch function here
+                        results = recognize_batch(model_id)
+                    else:
+                        # Call the get_all_properties function here
+                        results = get_all_properties(model_id)
+            except ValueError as e:  # not a model id, or not a readable STEP file
+                self.send_json({"error": str(e)}, 400)
+                return
+            except KeyError as e:
+                self.send_json({"error": str(e.args[0])}, 404)
+                return
+            self.send_json(results)
         else:
             super().do_GET()
 
-def start_recognize_server(addr="localhost", port=8081):
-    httpd = HTTPServer((addr, port), CustomHandler)
+def start_recognize_server(addr="localhost", port=8081, workers=None):
+    CustomHandler.job_queue = JobQueue(workers)
+    httpd = ThreadingHTTPServer((addr, port), CustomHandler)
     print(f"Serving HTTP on {addr} port {port} (http://{addr}:{port}/) ...")
     httpd.serve_forever()
 
 if __name__ == "__main__":
-    start_recognize_server()
\ No newline at end of file
+    start_recognize_server()
@@ -0,0 +1,231 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import threading
+import webbrowser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always there
+    brotli = None
+
+# Files worth compressing, the geometry text and binary buffers included
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".json", ".x3d", ".glb", ".bin", ".css", ".svg")
+# Smaller files are sent as they are
+MIN_COMPRESS_BYTES = 1024
+
+# Geometry files named after the shape content (threejs renderer cache keys)
+# never change, the others are revalidated with their ETag
+IMMUTABLE_NAME = re.compile(r"^(shp|edg)[0-9a-f]{32}")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+CONTENT_TYPES = {
+    ".js": "text/javascript",
+    ".json": "application/json",
+    ".x3d": "model/x3d+xml",
+    ".glb": "model/gltf-binary",
+    ".bin": "application/octet-stream",
+}
+
+# Content-Encoding -> precompressed sibling suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"} if brotli is not None else {"gzip": ".gz"}
+
+
+# Function to write the .gz (and .br when brotli is installed) sibling of a file if missing or stale
+def precompress_file(file_path):
+    if not file_path.endswith(COMPRESSIBLE_EXTENSIONS) or os.path.getsize(file_path) < MIN_COMPRESS_BYTES:
+        return
+    mtime = os.path.getmtime(file_path)
+    for encoding, suffix in ENCODINGS.items():
+        compressed_path = file_path + suffix
+        if os.path.exists(compressed_path) and os.path.getmtime(compressed_path) >= mtime:
+            continue
+        with open(file_path, "rb") as f:
+            data = f.read()
+        data = brotli.compress(data) if encoding == "br" else gzip.compress(data, compresslevel=9, mtime=0)
+        tmp_path = f"{compressed_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, compressed_path)
+
+
+# Function to precompress every servable file of a scene folder
+def precompress_directory(directory):
+    for root, _, names in os.walk(directory):
+        for name in names:
+            precompress_file(os.path.join(root, name))
+
+
+class SceneRequestHandler(BaseHTTPRequestHandler):
+    """Serves a rendered scene folder.
+
+    Files are sent precompressed (brotli or gzip, as the client accepts), with
+    a strong ETag computed from their content, long lived Cache-Control for
+    the content named geometry files and single byte ranges for the others.
+    """
+
+    protocol_version = "HTTP/1.1"
+    directory = "."
+    # file path -> (mtime_ns, size, content hash), shared by the handler threads
+    _etags = {}
+    _etags_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _content_hash(self, file_path, stat):
+        with self._etags_lock:
+            cached = self._etags.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()[:32]
+        with self._etags_lock:
+            self._etags[file_path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        return content_hash
+
+    def _resolve(self, url_path):
+        relative = os.path.normpath(unquote(url_path)).lstrip("/\\")
+        if relative.startswith("..") or os.path.isabs(relative):
+            return None
+        file_path = os.path.join(self.directory, relative)
+        if os.path.isdir(file_path):
+            file_path = os.path.join(file_path, "index.html")
+        return file_path if os.path.isfile(file_path) else None
+
+    def _accepted_encoding(self, file_path):
+        if "Range" in self.headers:  # ranges are served from the plain file
+            return None, ""
+        accepted = {
+            token.split(";")[0].strip()
+            for token in self.headers.get("Accept-Encoding", "").split(",")
+        }
+        mtime = os.path.getmtime(file_path)
+        for encoding, suffix in ENCODINGS.items():
+            # a sibling older than the file was compressed from a former content
+            compressed_path = file_path + suffix
+            if encoding in accepted and os.path.isfile(compressed_path) and os.path.getmtime(compressed_path) >= mtime:
+                return encoding, suffix
+        return None, ""
+
+    def _byte_range(self, size, etag):
+        # a single "bytes=start-end" range, None for the whole file
+        header = self.headers.get("Range")
+        if not header or not header.startswith("bytes=") or "," in header:
+            return None
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range != etag:
+            return None
+        start, _, end = header[len("bytes="):].partition("-")
+        try:
+            if start:
+                first, last = int(start), int(end) if end else size - 1
+            else:  # suffix range, the last bytes
+                first, last = max(size - int(end), 0), size - 1
+        except ValueError:
+            return None
+        if first > last or first >= size:
+            return (size, size)  # unsatisfiable
+        return first, min(last, size - 1)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        file_path = self._resolve(urlparse(self.path).path)
+        if file_path is None:
+            self.send_error(404, "File not found")
+            return
+        encoding, suffix = self._accepted_encoding(file_path)
+        body_path = file_path + suffix
+        stat = os.stat(body_path)
+        # strong ETags differ between the encodings of a same content
+        content_hash = self._content_hash(file_path, os.stat(file_path))
+        etag = f'"{content_hash}-{encoding}"' if encoding else f'"{content_hash}"'
+        name = os.path.basename(file_path)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if IMMUTABLE_NAME.match(name) else REVALIDATE_CACHE_CONTROL,
+            "Content-Type": CONTENT_TYPES.get(os.path.splitext(name)[1])
+            or mimetypes.guess_type(name)[0]
+            or "application/octet-stream",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if etag in if_none_match or "*" in if_none_match:
+            self.send_response(304)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            return
+        first, last = 0, stat.st_size - 1
+        status = 200
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        else:
+            headers["Accept-Ranges"] = "bytes"
+            byte_range = self._byte_range(stat.st_size, etag)
+            if byte_range == (stat.st_size, stat.st_size):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{stat.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range is not None:
+                first, last = byte_range
+                status = 206
+                headers["Content-Range"] = f"bytes {first}-{last}/{stat.st_size}"
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(last - first + 1))
+        self.end_headers()
+        if send_body:
+            with open(body_path, "rb") as f:
+                f.seek(first)
+                remaining = last - first + 1
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+
+# Function to create the scene server of a renderer output folder, without serving yet
+def make_scene_server(directory, addr="localhost", port=8080, precompress=True):
+    if precompress:
+        precompress_directory(directory)
+    handler = type("BoundSceneRequestHandler", (SceneRequestHandler,), {"directory": os.path.abspath(directory)})
+    return ThreadingHTTPServer((addr, port), handler)
+
+
+# Function to serve a rendered scene folder, drop-in for OCC's simple_server.start_server
+def start_scene_server(addr="localhost", port=8080, directory=".", open_webbrowser=False):
+    httpd = make_scene_server(directory, addr, port)
+    url = f"http://{addr}:{port}/"
+    print(f"## Serving {directory} on {url} ({', '.join(ENCODINGS)} compression), press Ctrl+C to stop")
+    if open_webbrowser:
+        webbrowser.open(url)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n## scene server stopped")
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    start_scene_server(directory=sys.argv[1] if len(sys.argv) > 1 else ".")
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from OCC import VERSION
+from OCC.Core.BinTools import bintools, BinTools_FormatVersion_CURRENT
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from disk_cache import DiskCache, hash_file
+
+# Root folder of the on-disk caches, can be overridden from the environment
+CACHE_DIR = os.environ.get(
+    "XLOGIC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "xlogic")
+)
+
+
+# Function to dump a shape as a native BRep binary file
+def write_brep(shape: TopoDS_Shape, file_path: str, with_triangles=True):
+    if not bintools.Write(shape, file_path, with_triangles, False, BinTools_FormatVersion_CURRENT):
+        raise IOError(f"Could not write BRep file {file_path}")
+
+
+# Function to read back a native BRep binary file
+def read_brep(file_path: str):
+    shape = TopoDS_Shape()
+    if not bintools.Read(shape, file_path):
+        raise IOError(f"Could not read BRep file {file_path}")
+    return shape
+
+
+# Function to serialize a shape to BRep binary bytes (e.g. to ship it to another process)
+def shape_to_bytes(shape: TopoDS_Shape, with_triangles=True):
+    fd, tmp_path = tempfile.mkstemp(suffix=".bbrep")
+    os.close(fd)
+    try:
+        write_brep(shape, tmp_path, with_triangles)
+        with open(tmp_path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(tmp_path)
+
+
+# Function to rebuild a shape from BRep binary bytes
+def shape_from_bytes(data: bytes):
+    fd, tmp_path = tempfile.mkstemp(suffix=".bbrep")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return read_brep(tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+# Function to hash the geometry of a shape, stable across processes and meshing
+def shape_content_hash(shape: TopoDS_Shape):
+    # triangulations are left out, they change whenever the shape is meshed
+    return hashlib.sha256(shape_to_bytes(shape, with_triangles=False)).hexdigest()
+
+
+class ShapeCache:
+    """Parsed shapes keyed by the hash of the STEP file bytes and the reader options.
+
+    The most recently used shapes are kept in memory, and every parsed shape is
+    also spilled to disk as a BRep binary dump so that another process, or the
+    same one after a restart, skips the STEP parsing as well.
+    """
+
+    def __init__(self, max_entries=32, directory=None, max_disk_bytes=512 * 1024 * 1024):
+        self._max_entries = max_entries
+        self._shapes = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskCache(
+            directory or os.path.join(CACHE_DIR, "shapes"),
+            max_bytes=max_disk_bytes,
+            suffix=".bbrep",
+        )
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, file_path: str, **reader_options):
+        digest = hashlib.sha256(hash_file(file_path).encode())
+        digest.update(VERSION.encode())
+        for name in sorted(reader_options):
+            digest.update(f"{name}={reader_options[name]!r}".encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns the cached shape for key, or None if it has to be parsed again"""
+        with self._lock:
+            shape = self._shapes.get(key)
+            if shape is not None:
+                self._shapes.move_to_end(key)
+                self.hits += 1
+                return shape
+        brep_path = self._disk.get_path(key)
+        if brep_path is not None:
+            try:
+                shape = read_brep(brep_path)
+            except IOError:
+                shape = None
+            if shape is not None:
+                self.disk_hits += 1
+                self._remember(key, shape)
+                return shape
+        self.misses += 1
+        return None
+
+    def put(self, key, shape: TopoDS_Shape):
+        self._remember(key, shape)
+        fd, tmp_path = tempfile.mkstemp(dir=self._disk.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_brep(shape, tmp_path)
+            self._disk.put_file(key, tmp_path)
+        except IOError:
+            os.remove(tmp_path)
+
+    def _remember(self, key, shape):
+        with self._lock:
+            self._shapes[key] = shape
+            self._shapes.move_to_end(key)
+            while len(self._shapes) > self._max_entries:
+                self._shapes.popitem(last=False)
+                self.evictions += 1
+
+    def forget(self, key):
+        """Drops a shape from memory, its BRep dump stays on disk"""
+        with self._lock:
+            self._shapes.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": self.evictions,
+            "memory_entries": len(self._shapes),
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk": self._disk.stats(),
+        }
+
+
+_default_cache = None
+
+
+def get_shape_cache():
+    """Returns the process wide shape cache used by utils.load_step_file"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ShapeCache()
+    return _default_cache
@@ -1,7 +1,12 @@
 from flask import Flask, request, jsonify, send_from_directory, render_template
 import os
+import sys
 from flask_cors import CORS
 
+# The STEP tools live at the root of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from step_scan import scan_step_file
+
 app = Flask(__name__)
 CORS(app)
 
@@ -20,7 +25,11 @@ def upload_file():
         # Save the file to the upload directory
         file_path = os.path.join(UPLOAD_FOLDER, file.filename)
         file.save(file_path)
-        return jsonify({'message': 'File uploaded successfully!', 'path': file_path})
+        response = {'message': 'File uploaded successfully!', 'path': file_path}
+        # Triage STEP uploads from their text before any geometry is built
+        if file_path.lower().endswith(('.step', '.stp')):
+            response['step'] = scan_step_file(file_path).to_dict()
+        return jsonify(response)
     return jsonify({'message': 'No file received'}), 400
 
 @app.route('/uploads/<filename>')
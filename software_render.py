@@ -0,0 +1,155 @@
+import numpy as np
+
+# Direction from the part to the eye and up vector of each standard view,
+# the same cameras as the Viewer3d View_Iso/View_Top/View_Front
+VIEW_CAMERAS = {
+    "iso": ((1.0, -1.0, 1.0), (0.0, 0.0, 1.0)),
+    "top": ((0.0, 0.0, 1.0), (0.0, 1.0, 0.0)),
+    "front": ((0.0, -1.0, 0.0), (0.0, 0.0, 1.0)),
+}
+
+# Candidate pixels tested at once, bounds the memory of a rasterization pass
+CHUNK_PIXELS = 4_000_000
+
+
+# Function to tessellate a shape into numpy arrays
+def mesh_from_shape(shape, mesh_quality=1.0):
+    """
+    Returns:
+        vertices as a (n, 3) float array and triangles as a (m, 3) int array
+    """
+    from OCC.Core.Tesselator import ShapeTesselator
+
+    from gltf_export import mesh_arrays_from_tesselator
+
+    tess = ShapeTesselator(shape)
+    tess.Compute(compute_edges=False, mesh_quality=mesh_quality, parallel=True)
+    positions, _, indices = mesh_arrays_from_tesselator(tess)
+    vertices = np.frombuffer(positions, dtype=np.float32).reshape(-1, 3).astype(np.float64)
+    triangles = np.frombuffer(indices, dtype=np.uint32).reshape(-1, 3).astype(np.int64)
+    return vertices, triangles
+
+
+def _camera_basis(view):
+    eye, up = (np.asarray(v, dtype=np.float64) for v in VIEW_CAMERAS[view])
+    eye /= np.linalg.norm(eye)
+    right = np.cross(up, eye)
+    right /= np.linalg.norm(right)
+    return right, np.cross(eye, right), eye
+
+
+# Function to rasterize a triangle mesh with a z-buffer
+def rasterize(vertices, triangles, width=512, height=512, view="iso", margin=0.05):
+    """Orthographic projection fitted to the image.
+
+    Returns:
+        the triangle index seen at each pixel ((height, width) int array, -1 for
+        the background) and the unit normal of every triangle in camera space
+    """
+    right, up, eye = _camera_basis(view)
+    camera = np.column_stack((right, up, eye))
+    points = vertices @ camera  # x right, y up, z towards the eye
+    triangle_points = points[triangles]
+    normals = np.cross(
+        triangle_points[:, 1] - triangle_points[:, 0], triangle_points[:, 2] - triangle_points[:, 0]
+    )
+    lengths = np.linalg.norm(normals, axis=1)
+    normals /= np.where(lengths > 0.0, lengths, 1.0)[:, None]
+    face_ids = np.full(height * width, -1, dtype=np.int64)
+    if not len(triangles):
+        return face_ids.reshape(height, width), normals
+
+    # fit the projected part in the image, keeping its aspect ratio
+    low, high = points[:, :2].min(axis=0), points[:, :2].max(axis=0)
+    extent = np.maximum(high - low, 1e-12)
+    scale = min(width, height) * (1.0 - 2.0 * margin) / max(extent)
+    offset = np.array([width, height]) / 2.0 - (low + high) / 2.0 * scale
+    xy = triangle_points[:, :, :2] * scale + offset
+    xy[:, :, 1] = height - xy[:, :, 1]  # image rows go down
+    depth = triangle_points[:, :, 2]
+
+    # edge functions of every triangle, normalized by its signed area
+    x0, y0 = xy[:, 0, 0], xy[:, 0, 1]
+    x1, y1 = xy[:, 1, 0], xy[:, 1, 1]
+    x2, y2 = xy[:, 2, 0], xy[:, 2, 1]
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    visible = np.abs(area) > 1e-12
+    # pixel bounding box of every triangle, centers at +0.5
+    x_min = np.clip(np.ceil(xy[:, :, 0].min(axis=1) - 0.5), 0, width).astype(np.int64)
+    x_max = np.clip(np.floor(xy[:, :, 0].max(axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    y_min = np.clip(np.ceil(xy[:, :, 1].min(axis=1) - 0.5), 0, height).astype(np.int64)
+    y_max = np.clip(np.floor(xy[:, :, 1].max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+    box_width = np.maximum(x_max - x_min + 1, 0)
+    counts = box_width * np.maximum(y_max - y_min + 1, 0) * visible
+
+    z_buffer = np.full(height * width, -np.inf)
+    candidates = np.flatnonzero(counts)
+    # cut the triangles in chunks of about CHUNK_PIXELS candidate pixels
+    cumulative = np.cumsum(counts[candidates])
+    start = 0
+    while start < len(candidates):
+        done = cumulative[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cumulative, done + CHUNK_PIXELS, side="right")), start + 1)
+        chunk = candidates[start:stop]
+        start = stop
+        chunk_counts = counts[chunk]
+        tri = np.repeat(chunk, chunk_counts)
+        local = np.arange(len(tri)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        px = x_min[tri] + local % box_width[tri]
+        py = y_min[tri] + local // box_width[tri]
+        cx, cy = px + 0.5, py + 0.5
+        w0 = ((x1[tri] - cx) * (y2[tri] - cy) - (x2[tri] - cx) * (y1[tri] - cy)) / area[tri]
+        w1 = ((x2[tri] - cx) * (y0[tri] - cy) - (x0[tri] - cx) * (y2[tri] - cy)) / area[tri]
+        w2 = 1.0 - w0 - w1
+        inside = (w0 >= -1e-9) & (w1 >= -1e-9) & (w2 >= -1e-9)
+        tri, px, py = tri[inside], px[inside], py[inside]
+        z = w0[inside] * depth[tri, 0] + w1[inside] * depth[tri, 1] + w2[inside] * depth[tri, 2]
+        pixel = py * width + px
+        # keep the fragment nearest to the eye, ties go to any of them
+        np.maximum.at(z_buffer, pixel, z)
+        nearest = z == z_buffer[pixel]
+        face_ids[pixel[nearest]] = tri[nearest]
+    return face_ids.reshape(height, width), normals
+
+
+# Function to shade a rasterized mesh, Lambert lighting from the eye plus outlines
+def shade(face_ids, normals, color=(0.65, 0.65, 0.7), background=(1.0, 1.0, 1.0), edge_color=(0.1, 0.1, 0.1), crease_angle=30.0):
+    """
+    Returns:
+        (height, width, 3) uint8 RGB pixels
+    """
+    covered = face_ids >= 0
+    pixel_normals = np.zeros(face_ids.shape + (3,))
+    pixel_normals[covered] = normals[face_ids[covered]]
+    # head light slightly above the eye, both sides of the faces lit
+    light = np.array([0.3, 0.5, 1.0])
+    light /= np.linalg.norm(light)
+    intensity = 0.25 + 0.75 * np.abs(pixel_normals @ light)
+    image = np.empty(face_ids.shape + (3,))
+    image[...] = background
+    image[covered] = intensity[covered, None] * np.asarray(color)
+    # silhouettes (coverage changes) and creases (normal changes) between neighbours
+    cos_crease = np.cos(np.radians(crease_angle))
+    edges = np.zeros(face_ids.shape, dtype=bool)
+    for axis in (0, 1):
+        a = [slice(None), slice(None)]
+        b = [slice(None), slice(None)]
+        a[axis], b[axis] = slice(None, -1), slice(1, None)
+        a, b = tuple(a), tuple(b)
+        silhouette = covered[a] != covered[b]
+        crease = covered[a] & covered[b] & (np.abs(np.sum(pixel_normals[a] * pixel_normals[b], axis=-1)) < cos_crease)
+        line = silhouette | crease
+        edges[a] |= line & covered[a]
+        edges[b] |= line & covered[b]
+    image[edges] = edge_color
+    return np.round(np.clip(image, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+# Function to render one view of a mesh to RGB pixels
+def render_mesh(vertices, triangles, view="iso", width=512, height=512, **shading):
+    """
+    Returns:
+        width, height and the RGB bytes, as png_io.write_png takes them
+    """
+    face_ids, normals = rasterize(vertices, triangles, width, height, view)
+    return width, height, shade(face_ids, normals, **shading).tobytes()
@@ -0,0 +1,148 @@
+import mmap
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+
+# Entities we report on explicitly, every other simple entity is still counted
+TRACKED_ENTITIES = ("ADVANCED_FACE", "CYLINDRICAL_SURFACE", "MANIFOLD_SOLID_BREP")
+
+SCHEMA_NAMES = {
+    "CONFIG_CONTROL_DESIGN": "AP203",
+    "CONFIG_CONTROL_3D_DESIGN": "AP203",
+    "AP203_CONFIGURATION_CONTROLLED_3D_DESIGN_OF_MECHANICAL_PARTS_AND_ASSEMBLIES_MIM_LF": "AP203",
+    "AUTOMOTIVE_DESIGN": "AP214",
+    "AUTOMOTIVE_DESIGN_CC2": "AP214",
+    "AP214_AUTOMOTIVE_DESIGN": "AP214",
+    "AP242_MANAGED_MODEL_BASED_3D_ENGINEERING_MIM_LF": "AP242",
+}
+
+SI_PREFIXES = {
+    b"$": "m",
+    b".MILLI.": "mm",
+    b".CENTI.": "cm",
+    b".DECI.": "dm",
+    b".KILO.": "km",
+    b".MICRO.": "um",
+}
+
+_FILE_SCHEMA_RE = re.compile(rb"FILE_SCHEMA\s*\(\s*\(\s*'([^']*)'")
+_DATA_RE = re.compile(rb"^\s*DATA\s*;", re.MULTILINE)
+_SIMPLE_ENTITY_RE = re.compile(rb"#\d+\s*=\s*([A-Z_][A-Z0-9_]*)\s*\(")
+_LENGTH_UNIT_RE = re.compile(rb"=\s*\(([^;]*?LENGTH_UNIT\s*\(\s*\)[^;]*)\)\s*;")
+_SI_UNIT_RE = re.compile(rb"SI_UNIT\s*\(\s*(\$|\.[A-Z]+\.)\s*,\s*\.METRE\.\s*\)")
+_CONVERSION_UNIT_RE = re.compile(rb"CONVERSION_BASED_UNIT\s*\(\s*'([^']*)'")
+_STRING = rb"'((?:[^']|'')*)'"
+_PRODUCT_RE = re.compile(rb"#\d+\s*=\s*PRODUCT\s*\(\s*" + _STRING + rb"\s*,\s*" + _STRING)
+_PRODUCT_DEFINITION_RE = re.compile(rb"#(\d+)\s*=\s*PRODUCT_DEFINITION\s*\(")
+_NAUO_RE = re.compile(
+    rb"NEXT_ASSEMBLY_USAGE_OCCURRENCE\s*\(\s*"
+    + _STRING + rb"\s*,\s*" + _STRING + rb"\s*,\s*(?:" + _STRING + rb"|\$)\s*,"
+    rb"\s*#(\d+)\s*,\s*#(\d+)"
+)
+
+
+# Summary of a STEP file obtained from its text only, no geometry is built
+@dataclass
+class StepScan:
+    file_path: str
+    schema: str  # AP203, AP214, AP242 or the raw schema name when unknown
+    schema_name: str
+    length_unit: str  # e.g. "mm", "inch", "" if not declared
+    product_names: list = field(default_factory=list)
+    root_count: int = 0
+    entity_counts: dict = field(default_factory=dict)
+    scan_time_s: float = 0.0
+
+    @property
+    def product_count(self):
+        return len(self.product_names)
+
+    @property
+    def is_assembly(self):
+        # more than one root shape, or products nested under others
+        return self.root_count > 1 or self.product_count > 1
+
+    def count(self, entity_name):
+        return self.entity_counts.get(entity_name, 0)
+
+    def to_dict(self):
+        result = asdict(self)
+        result["product_count"] = self.product_count
+        result["is_assembly"] = self.is_assembly
+        result["entity_counts"] = {name: self.count(name) for name in TRACKED_ENTITIES}
+        return result
+
+
+def _decode(value: bytes):
+    return value.replace(b"''", b"'").decode("latin-1")
+
+
+# Function to scan a STEP file header and entities without an OCC transfer
+def scan_step_file(file_path: str):
+    start = time.perf_counter()
+    with open(file_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file, mmap refuses zero length mappings
+            data = b""
+        try:
+            data_match = _DATA_RE.search(data)
+            data_start = data_match.end() if data_match else 0
+
+            schema_match = _FILE_SCHEMA_RE.search(data, 0, data_start or len(data))
+            schema_name = _decode(schema_match.group(1)).strip() if schema_match else ""
+            # drop the optional object identifier, e.g. "{ 1 0 10303 442 1 1 4 }"
+            schema_key = schema_name.split("{")[0].strip().upper()
+            schema = SCHEMA_NAMES.get(schema_key, schema_name)
+
+            entity_counts = Counter(
+                m.group(1).decode("ascii")
+                for m in _SIMPLE_ENTITY_RE.finditer(data, data_start)
+            )
+
+            length_units = []
+            for m in _LENGTH_UNIT_RE.finditer(data, data_start):
+                body = m.group(1)
+                si_match = _SI_UNIT_RE.search(body)
+                if si_match:
+                    length_units.append(SI_PREFIXES.get(si_match.group(1), si_match.group(1).decode().strip(".").lower() + "m"))
+                    continue
+                conversion_match = _CONVERSION_UNIT_RE.search(body)
+                if conversion_match:
+                    length_units.append(_decode(conversion_match.group(1)).lower())
+
+            product_names = [
+                _decode(m.group(2) or m.group(1))
+                for m in _PRODUCT_RE.finditer(data, data_start)
+            ]
+
+            definitions = {m.group(1) for m in _PRODUCT_DEFINITION_RE.finditer(data, data_start)}
+            children = {m.group(5) for m in _NAUO_RE.finditer(data, data_start)}
+            root_count = len(definitions - children)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    return StepScan(
+        file_path=file_path,
+        schema=schema,
+        schema_name=schema_name,
+        length_unit=length_units[0] if length_units else "",
+        product_names=product_names,
+        root_count=root_count,
+        entity_counts=dict(entity_counts),
+        scan_time_s=time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    for file_path in sys.argv[1:] or ["models/Plate_1.step"]:
+        scan = scan_step_file(file_path)
+        print(
+            f"{file_path}: {scan.schema}, unit {scan.length_unit or '?'}, "
+            f"{scan.root_count} root(s), products {scan.product_names}, "
+            + ", ".join(f"{name}={scan.count(name)}" for name in TRACKED_ENTITIES)
+            + f" ({scan.scan_time_s * 1000:.1f} ms)"
+        )
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from disk_cache import DiskCache
+from shape_cache import CACHE_DIR, shape_content_hash
+
+# Bump when the format of the exported geometry files changes
+TESSELLATION_FORMAT = "threejs-json-3"
+
+
+# Function to write a file of the output folder, which may be a hard link to a cache entry
+def write_output(file_path, data):
+    """Writes data (str or bytes) to a new file moved over file_path.
+
+    Opening a fetched file for writing would truncate the cache entry it is
+    linked to, so the old file is replaced, never written through.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp files are private, the output folder is served
+        with os.fdopen(fd, "w" if isinstance(data, str) else "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class TessellationCache:
+    """Exported geometry files keyed by shape content and meshing parameters.
+
+    Entries are plain files in a size capped, least recently used DiskCache and
+    are hard linked (or copied) into the renderer output folder on a hit, so
+    that a part rendered again with the same settings skips meshing entirely.
+    Files of the output folder must then be written with write_output.
+    """
+
+    def __init__(self, directory=None, max_bytes=1024 * 1024 * 1024):
+        self._disk = DiskCache(
+            directory or os.path.join(CACHE_DIR, "tessellation"),
+            max_bytes=max_bytes,
+            suffix=".geom",
+        )
+        self.hits = 0
+        self.misses = 0
+        self.bytes_reused = 0
+
+    def make_key(self, shape, **parameters):
+        digest = hashlib.sha256(shape_content_hash(shape).encode())
+        digest.update(TESSELLATION_FORMAT.encode())
+        for name in sorted(parameters):
+            digest.update(f"{name}={parameters[name]!r}".encode())
+        return digest.hexdigest()
+
+    def fetch(self, key, dest_path):
+        """Places the cached file for key at dest_path, returns False on a miss"""
+        cached_path = self._disk.get_path(key)
+        if cached_path is None:
+            self.misses += 1
+            return False
+        try:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            try:
+                os.link(cached_path, dest_path)
+            except OSError:  # other filesystem, or no hard links
+                shutil.copyfile(cached_path, dest_path)
+        except FileNotFoundError:  # evicted by another process meanwhile
+            self.misses += 1
+            return False
+        self.hits += 1
+        self.bytes_reused += os.path.getsize(dest_path)
+        return True
+
+    def store(self, key, src_path):
+        """Copies a freshly exported file into the cache"""
+        with open(src_path, "rb") as f:
+            self._disk.put(key, f.read())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_reused": self.bytes_reused,
+            "disk": self._disk.stats(),
+        }
+
+
+_default_cache = None
+
+
+def get_tessellation_cache():
+    """Returns the process wide tessellation cache shared by the renderers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TessellationCache()
+    return _default_cache
@@ -0,0 +1,73 @@
+import math
+
+from get_holes import cluster_holes
+
+UP = (0.0, 0.0, 1.0)
+DOWN = (0.0, 0.0, -1.0)
+
+
+def test_both_ends_of_a_hole_merge():
+    circles = [
+        ((10.0, 5.0, 0.0), UP, 2.0, False),
+        ((10.0, 5.0, 3.0), DOWN, 2.0, False),  # the other end, oriented the other way
+    ]
+    holes, merged = cluster_holes(circles)
+    assert len(holes) == 1
+    hole = holes[0]
+    assert hole["diameter"] == 4.0
+    assert hole["center"] == (10.0, 5.0)
+    assert hole["depth"] == 3.0
+    assert hole["through"] is True
+    assert len(merged) == 1
+
+
+def test_different_radius_or_axis_stay_apart():
+    circles = [
+        ((0.0, 0.0, 0.0), UP, 2.0, None),
+        ((0.0, 0.0, 3.0), UP, 2.5, None),
+        ((7.0, 0.0, 0.0), UP, 2.0, None),
+    ]
+    holes, _ = cluster_holes(circles)
+    assert len(holes) == 3
+
+
+def test_feet_one_tolerance_apart_across_a_cell_border():
+    # round() sends 0.5 and 1.5 to cells 0 and 2, which are not neighbours
+    circles = [
+        ((0.5, 0.0, 0.0), UP, 2.0, None),
+        ((1.5, 0.0, 4.0), UP, 2.0, None),
+    ]
+    holes, _ = cluster_holes(circles, tolerance=1.0)
+    assert len(holes) == 1
+
+
+def test_blind_hole_and_axis_extent():
+    blind = [((0.0, 0.0, 0.0), UP, 1.0, False), ((0.0, 0.0, 2.0), UP, 1.0, True)]
+    assert cluster_holes(blind)[0][0]["through"] is False
+
+    unknown = [((0.0, 0.0, 0.0), UP, 1.0, None), ((0.0, 0.0, 5.0), UP, 1.0, None)]
+    assert cluster_holes(unknown)[0][0]["through"] is None
+    assert cluster_holes(unknown, axis_extent=lambda direction: 5.0)[0][0]["through"] is True
+    assert cluster_holes(unknown, axis_extent=lambda direction: 8.0)[0][0]["through"] is False
+
+
+def test_coaxial_holes_of_two_flanges_stay_apart():
+    # a U bracket: 2 mm flanges at z = 0 and z = 50, one wall (face id) per flange hole
+    circles = [
+        ((0.0, 0.0, 0.0), UP, 2.0, False, (7,)),
+        ((0.0, 0.0, 2.0), UP, 2.0, False, (7,)),
+        ((0.0, 0.0, 50.0), UP, 2.0, False, (9,)),
+        ((0.0, 0.0, 52.0), UP, 2.0, False, (9,)),
+    ]
+    holes, merged = cluster_holes(circles)
+    assert [hole["depth"] for hole in holes] == [2.0, 2.0]
+    assert [hole["axis"]["origin"][2] for hole in holes] == [0.0, 50.0]
+    assert all(hole["through"] for hole in holes)
+    assert len(merged) == 2
+
+
+def test_misaligned_axes_are_not_merged():
+    tilted = (math.sin(math.radians(2.0)), 0.0, math.cos(math.radians(2.0)))
+    circles = [((0.0, 0.0, 0.0), UP, 2.0, None), ((0.0, 0.0, 0.0), tilted, 2.0, None)]
+    assert len(cluster_holes(circles)[0]) == 2
+    assert len(cluster_holes(circles, angle_tolerance=math.radians(3.0))[0]) == 1
@@ -0,0 +1,86 @@
+import json
+import struct
+from array import array
+
+from gltf_export import (
+    CHUNK_BIN,
+    CHUNK_JSON,
+    GLB_MAGIC,
+    GLBWriter,
+    MODE_LINES,
+    MODE_TRIANGLES,
+    UNSIGNED_SHORT,
+    line_arrays_from_point_sets,
+    pack_mesh,
+    unpack_mesh,
+)
+
+POSITIONS = array("f", [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 2.0, 0.0])
+NORMALS = array("f", [0.0, 0.0, 1.0] * 3)
+INDICES = array("I", [0, 1, 2])
+
+
+def read_glb(path):
+    data = path.read_bytes()
+    magic, version, length = struct.unpack_from("<III", data)
+    assert (magic, version, length) == (GLB_MAGIC, 2, len(data))
+    json_length, json_type = struct.unpack_from("<II", data, 12)
+    assert json_type == CHUNK_JSON and json_length % 4 == 0
+    gltf = json.loads(data[20:20 + json_length])
+    binary = b""
+    if 20 + json_length < len(data):
+        bin_length, bin_type = struct.unpack_from("<II", data, 20 + json_length)
+        assert bin_type == CHUNK_BIN and bin_length % 4 == 0
+        binary = data[28 + json_length:28 + json_length + bin_length]
+    return gltf, binary
+
+
+def test_pack_unpack_round_trip():
+    positions, normals, indices = unpack_mesh(pack_mesh(POSITIONS, NORMALS, INDICES))
+    assert positions == POSITIONS
+    assert normals == NORMALS
+    assert indices == INDICES
+
+
+def test_pack_unpack_empty_mesh():
+    assert unpack_mesh(pack_mesh(array("f"), array("f"), array("I"))) == (array("f"), array("f"), array("I"))
+
+
+def test_line_arrays_join_consecutive_points():
+    positions, indices = line_arrays_from_point_sets([[(0, 0, 0), (1, 0, 0), (1, 1, 0)], [(5, 5, 5), (6, 5, 5)]])
+    assert len(positions) == 15
+    assert list(indices) == [0, 1, 1, 2, 3, 4]
+
+
+def test_glb_layout(tmp_path):
+    writer = GLBWriter()
+    material = writer.add_material("red", (1.0, 0.0, 0.0), transparency=0.5)
+    writer.add_mesh("triangle", POSITIONS, NORMALS, INDICES, material)
+    writer.add_lines("edges", *line_arrays_from_point_sets([[(0, 0, 0), (1, 0, 0)]]), material)
+    path = tmp_path / "scene.glb"
+    assert writer.write(str(path)) == path.stat().st_size
+
+    gltf, binary = read_glb(path)
+    assert gltf["buffers"] == [{"byteLength": len(binary)}]
+    assert gltf["materials"][0]["alphaMode"] == "BLEND"
+    triangle, edges = (mesh["primitives"][0] for mesh in gltf["meshes"])
+    assert triangle["mode"] == MODE_TRIANGLES
+    assert edges["mode"] == MODE_LINES
+    position = gltf["accessors"][triangle["attributes"]["POSITION"]]
+    assert position["count"] == 3
+    assert position["min"] == [0.0, 0.0, 0.0] and position["max"] == [1.0, 2.0, 0.0]
+    # a small mesh gets uint16 indices
+    index_accessor = gltf["accessors"][triangle["indices"]]
+    assert index_accessor["componentType"] == UNSIGNED_SHORT
+    view = gltf["bufferViews"][index_accessor["bufferView"]]
+    assert view["byteOffset"] % 4 == 0
+    assert struct.unpack_from("<3H", binary, view["byteOffset"]) == (0, 1, 2)
+
+
+def test_empty_glb_has_no_buffer(tmp_path):
+    path = tmp_path / "empty.glb"
+    GLBWriter().write(str(path))
+    gltf, binary = read_glb(path)
+    assert "buffers" not in gltf
+    assert "meshes" not in gltf
+    assert binary == b""
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from is_sheet_metal import SheetDimensions, dominant_plane_pair, is_sheet
+
+
+def unit(*v):
+    v = np.array(v, dtype=np.float64)
+    return v / np.linalg.norm(v)
+
+
+def test_plate_with_a_pocket():
+    up = unit(0.3, 0.2, 1.0)
+    side = unit(1.0, 0.0, -0.3)
+    # top at 2, bottom at 0, a small pocket floor at 1.5 and two side walls
+    normals = [up, -up, up, side, -side]
+    offsets = [2.0, 0.0, 1.5, 50.0, 0.0]
+    areas = [100.0, 100.0, 10.0, 4.0, 4.0]
+    assert dominant_plane_pair(normals, offsets, areas) == pytest.approx(2.0)
+
+
+def test_nearly_parallel_normals_across_a_rounding_border():
+    # 0.00151 and 0.00149 used to round to different buckets of 1e-3
+    top = unit(0.00151, 0.0, 1.0)
+    bottom = unit(-0.00149, 0.0, -1.0)
+    assert dominant_plane_pair([top, bottom], [2.0, 0.0], [10.0, 10.0]) == pytest.approx(2.0)
+
+
+def test_no_opposite_faces():
+    assert dominant_plane_pair([], [], []) is None
+    assert dominant_plane_pair([unit(0, 0, 1), unit(1, 0, 0)], [1.0, 1.0], [1.0, 1.0]) is None
+
+
+def test_is_sheet():
+    thin = SheetDimensions(length=100.0, breadth=200.0, thickness=1.5, method="planar faces", mode="fast")
+    assert is_sheet(thin)
+    block = SheetDimensions(length=10.0, breadth=200.0, thickness=1.5, method="planar faces", mode="fast")
+    assert not is_sheet(block)
+    too_thick = SheetDimensions(length=500.0, breadth=500.0, thickness=40.0, method="oriented box", mode="fast")
+    assert not is_sheet(too_thick)
@@ -0,0 +1,73 @@
+import pytest
+
+from materials import (
+    MM_PER_INCH,
+    find_material,
+    load_materials,
+    parse_service,
+    parse_thicknesses_mm,
+    thickness_limits_mm,
+)
+
+TABLE = '''S. No.,Material,Link,Available Thicknesses,Laser Cutting,Bending,Tapping,Description
+1,Mild Steel,Link,"0.048"", 0.030"", 0.125""",Yes,"Yes (0.125"" & 0.048"")",no,"Weldable, general use."
+2,Brass,Link,"0.063""",Yes,No,YES,
+3,Cork,Link,,No,No,No,Gaskets
+'''
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / "materials.csv"
+    path.write_text(TABLE, encoding="utf-8")
+    return str(path)
+
+
+def test_parse_thicknesses_mm():
+    assert parse_thicknesses_mm('0.125", 0.040"') == (0.040 * MM_PER_INCH, 0.125 * MM_PER_INCH)
+    assert parse_thicknesses_mm("") == ()
+
+
+def test_parse_service():
+    assert parse_service(" no ") == (False, ())
+    assert parse_service("Yes") == (True, ())
+    assert parse_service('Yes (0.125")') == (True, (0.125 * MM_PER_INCH,))
+    assert parse_service('Yes (0.250" & 0.125")') == (True, (0.125 * MM_PER_INCH, 0.250 * MM_PER_INCH))
+    assert parse_service("Link") is None
+    assert parse_service("Yesterday") is None
+    assert parse_service(None) is None
+
+
+def test_load_materials(table):
+    materials = load_materials(table)
+    assert list(materials) == ["Mild Steel", "Brass", "Cork"]
+    steel = materials["Mild Steel"]
+    assert steel.services == {"Laser Cutting", "Bending"}
+    assert steel.service_thicknesses_mm == {"Bending": (0.048 * MM_PER_INCH, 0.125 * MM_PER_INCH)}
+    # bending is only offered for the listed thicknesses
+    assert steel.offers("Bending")
+    assert steel.offers("Bending", 0.125 * MM_PER_INCH)
+    assert steel.offers("Bending", 1.22)
+    assert not steel.offers("Bending", 0.030 * MM_PER_INCH)
+    assert steel.offers("Laser Cutting", 0.030 * MM_PER_INCH)
+    assert not steel.offers("Tapping")
+    assert steel.description == "Weldable, general use."
+    assert materials["Brass"].offers("Tapping")
+    assert not materials["Cork"].services
+    assert materials["Cork"].thicknesses_mm == ()
+
+
+def test_lookups(table):
+    assert find_material(" mild steel", table).name == "Mild Steel"
+    with pytest.raises(KeyError):
+        find_material("Unobtainium", table)
+    assert thickness_limits_mm("Brass", table) == (0.063 * MM_PER_INCH, 0.063 * MM_PER_INCH)
+    assert thickness_limits_mm(None, table) == (0.030 * MM_PER_INCH, 0.125 * MM_PER_INCH)
+    with pytest.raises(ValueError):
+        thickness_limits_mm("Cork", table)
+
+
+def test_shop_table_loads():
+    materials = load_materials()
+    assert materials
+    assert all(material.thicknesses_mm for material in materials.values())
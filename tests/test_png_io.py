@@ -0,0 +1,67 @@
+import struct
+import zlib
+
+import pytest
+
+from png_io import PNG_SIGNATURE, encode_png, hstack_rgb, read_ppm, write_png
+
+
+def read_chunks(data):
+    assert data[:8] == PNG_SIGNATURE
+    chunks = []
+    position = 8
+    while position < len(data):
+        (length,) = struct.unpack_from(">I", data, position)
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        (crc,) = struct.unpack_from(">I", data, position + 8 + length)
+        assert crc == zlib.crc32(kind + body) & 0xFFFFFFFF
+        chunks.append((kind, body))
+        position += 12 + length
+    return chunks
+
+
+def test_encode_png_decodes_to_the_pixels():
+    width, height = 3, 2
+    rgb = bytes(range(width * height * 3))
+    chunks = read_chunks(encode_png(width, height, rgb))
+    assert [kind for kind, _ in chunks] == [b"IHDR", b"IDAT", b"IEND"]
+    assert struct.unpack(">IIBBBBB", chunks[0][1]) == (width, height, 8, 2, 0, 0, 0)
+    raw = zlib.decompress(chunks[1][1])
+    stride = width * 3 + 1
+    rows = [raw[y * stride:(y + 1) * stride] for y in range(height)]
+    assert all(row[0] == 0 for row in rows)  # no filter
+    assert b"".join(row[1:] for row in rows) == rgb
+
+
+def test_encode_png_checks_the_pixel_count():
+    with pytest.raises(ValueError):
+        encode_png(2, 2, b"\0" * 11)
+
+
+def test_write_png(tmp_path):
+    path = tmp_path / "image.png"
+    write_png(str(path), 1, 1, b"\xff\x00\x00")
+    assert path.read_bytes() == encode_png(1, 1, b"\xff\x00\x00")
+
+
+def test_read_ppm_with_comments(tmp_path):
+    pixels = bytes(range(2 * 2 * 3))
+    path = tmp_path / "view.ppm"
+    path.write_bytes(b"P6\n# dumped by OCC\n2 2\n255\n" + pixels)
+    assert read_ppm(str(path)) == (2, 2, pixels)
+
+
+def test_read_ppm_rejects_other_formats(tmp_path):
+    path = tmp_path / "view.ppm"
+    path.write_bytes(b"P3\n1 1\n255\n0 0 0\n")
+    with pytest.raises(ValueError):
+        read_ppm(str(path))
+
+
+def test_hstack_rgb():
+    left = (1, 2, b"AAA" + b"BBB")
+    right = (2, 2, b"cccddd" + b"eeefff")
+    assert hstack_rgb([left, right]) == (3, 2, b"AAAcccddd" + b"BBBeeefff")
+    with pytest.raises(ValueError):
+        hstack_rgb([left, (1, 1, b"xyz")])
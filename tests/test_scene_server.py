@@ -0,0 +1,101 @@
+import gzip
+import http.client
+import os
+import threading
+
+import pytest
+
+from scene_server import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, make_scene_server
+
+BODY = bytes(range(256)) * 16  # 4 KiB, above MIN_COMPRESS_BYTES
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "scene.bin").write_bytes(BODY)
+    (tmp_path / "shp0123456789abcdef0123456789abcdef.json").write_text("{}")
+    httpd = make_scene_server(str(tmp_path), port=0)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(port, path, headers=None, method="GET"):
+    connection = http.client.HTTPConnection("localhost", port, timeout=5)
+    connection.request(method, path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_plain_and_gzip_bodies(server):
+    response, body = get(server, "/scene.bin")
+    assert response.status == 200 and body == BODY
+    assert response.getheader("Accept-Ranges") == "bytes"
+    assert response.getheader("Cache-Control") == REVALIDATE_CACHE_CONTROL
+
+    response, body = get(server, "/scene.bin", {"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(body) == BODY
+    assert response.getheader("Vary") == "Accept-Encoding"
+
+
+def test_etag_differs_per_encoding_and_revalidates(server):
+    plain_etag = get(server, "/scene.bin")[0].getheader("ETag")
+    gzip_etag = get(server, "/scene.bin", {"Accept-Encoding": "gzip"})[0].getheader("ETag")
+    assert plain_etag != gzip_etag
+    response, body = get(server, "/scene.bin", {"If-None-Match": plain_etag})
+    assert response.status == 304 and body == b""
+    assert get(server, "/scene.bin", {"If-None-Match": '"stale"'})[0].status == 200
+
+
+def test_byte_ranges(server):
+    size = len(BODY)
+    response, body = get(server, "/scene.bin", {"Range": "bytes=10-19"})
+    assert response.status == 206 and body == BODY[10:20]
+    assert response.getheader("Content-Range") == f"bytes 10-19/{size}"
+
+    response, body = get(server, "/scene.bin", {"Range": "bytes=-16"})
+    assert response.status == 206 and body == BODY[-16:]
+
+    response, body = get(server, "/scene.bin", {"Range": "bytes=4000-"})
+    assert body == BODY[4000:]
+
+    response, _ = get(server, "/scene.bin", {"Range": f"bytes={size}-"})
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{size}"
+
+    # several ranges are not supported, the whole file is sent
+    response, body = get(server, "/scene.bin", {"Range": "bytes=0-1,5-6"})
+    assert response.status == 200 and body == BODY
+
+
+def test_if_range(server):
+    etag = get(server, "/scene.bin")[0].getheader("ETag")
+    response, body = get(server, "/scene.bin", {"Range": "bytes=0-3", "If-Range": etag})
+    assert response.status == 206 and body == BODY[:4]
+    response, body = get(server, "/scene.bin", {"Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert response.status == 200 and body == BODY
+
+
+def test_head_cache_control_and_missing_files(server):
+    response, body = get(server, "/shp0123456789abcdef0123456789abcdef.json", method="HEAD")
+    assert response.status == 200 and body == b""
+    assert response.getheader("Cache-Control") == IMMUTABLE_CACHE_CONTROL
+    assert response.getheader("Content-Type") == "application/json"
+    assert get(server, "/missing.bin")[0].status == 404
+    assert get(server, "/../secret")[0].status == 404
+
+
+def test_stale_compressed_sibling_is_not_served(server, tmp_path):
+    path = tmp_path / "scene.bin"
+    changed = BODY[::-1]
+    path.write_bytes(changed)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, os.stat(f"{path}.gz").st_mtime_ns + 10**9))
+    response, body = get(server, "/scene.bin", {"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") is None
+    assert body == changed
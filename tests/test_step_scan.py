@@ -0,0 +1,63 @@
+from step_scan import scan_step_file
+
+ASSEMBLY = b"""ISO-10303-21;
+HEADER;
+FILE_DESCRIPTION(('test'),'2;1');
+FILE_SCHEMA(('AUTOMOTIVE_DESIGN { 1 0 10303 214 1 1 1 1 }'));
+ENDSEC;
+DATA;
+#1=PRODUCT('asm','Bracket ''A''','',(#9));
+#2=PRODUCT('p1','Plate','',(#9));
+#3=PRODUCT_DEFINITION('d1','',#1,#8);
+#4=PRODUCT_DEFINITION('d2','',#2,#8);
+#5=NEXT_ASSEMBLY_USAGE_OCCURRENCE('n1','','',#3,#4,$);
+#6=ADVANCED_FACE('',(#7),#7,.T.);
+#7=ADVANCED_FACE('',(#7),#7,.T.);
+#10=CYLINDRICAL_SURFACE('',#11,2.5);
+#20=(LENGTH_UNIT()NAMED_UNIT(*)SI_UNIT(.MILLI.,.METRE.));
+ENDSEC;
+END-ISO-10303-21;
+"""
+
+
+def write(tmp_path, data, name="part.step"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_scan_reads_header_units_and_products(tmp_path):
+    scan = scan_step_file(write(tmp_path, ASSEMBLY))
+    assert scan.schema == "AP214"
+    assert scan.length_unit == "mm"
+    assert scan.product_names == ["Bracket 'A'", "Plate"]
+    assert scan.root_count == 1  # the plate is used by the bracket
+    assert scan.is_assembly
+
+
+def test_scan_counts_entities(tmp_path):
+    scan = scan_step_file(write(tmp_path, ASSEMBLY))
+    assert scan.count("ADVANCED_FACE") == 2
+    assert scan.count("CYLINDRICAL_SURFACE") == 1
+    assert scan.count("MANIFOLD_SOLID_BREP") == 0
+    assert scan.to_dict()["entity_counts"] == {
+        "ADVANCED_FACE": 2,
+        "CYLINDRICAL_SURFACE": 1,
+        "MANIFOLD_SOLID_BREP": 0,
+    }
+
+
+def test_scan_conversion_based_unit(tmp_path):
+    data = ASSEMBLY.replace(
+        b"SI_UNIT(.MILLI.,.METRE.)",
+        b"CONVERSION_BASED_UNIT('INCH',#21)",
+    )
+    assert scan_step_file(write(tmp_path, data)).length_unit == "inch"
+
+
+def test_scan_empty_file(tmp_path):
+    scan = scan_step_file(write(tmp_path, b""))
+    assert scan.schema == ""
+    assert scan.length_unit == ""
+    assert scan.product_count == 0
+    assert not scan.is_assembly
@@ -0,0 +1,63 @@
+import gzip
+import io
+from xml.etree import ElementTree
+
+import pytest
+
+from x3d_writer import X3DWriter, attribute_value
+
+
+def test_attribute_value_escapes_and_joins():
+    assert attribute_value((1, 0.5, 0)) == "1 0.5 0"
+    assert attribute_value('a "b" <c> & d\n') == "a &quot;b&quot; &lt;c&gt; &amp; d&#10;"
+
+
+def test_document_parses_back(tmp_path):
+    path = str(tmp_path / "shape.x3d")
+    with X3DWriter(path, validate=True) as writer:
+        writer.header("1.0")
+        writer.start("Shape", {"DEF": "shape0", "onclick": 'select("x");', "skipped": None})
+        writer.element("Material", {"diffuseColor": (1, 0, 0)})
+        writer.raw('<IndexedFaceSet coordIndex="0 1 2 -1"/>')
+        writer.end("Shape")
+        writer.footer()
+    root = ElementTree.parse(path).getroot()
+    shape = root.find("Scene/Shape")
+    assert shape.get("onclick") == 'select("x");'
+    assert "skipped" not in shape.attrib
+    assert shape.find("Material").get("diffuseColor") == "1 0 0"
+    assert shape.find("IndexedFaceSet") is not None
+    assert len(root.findall("head/meta")) == 4
+
+
+def test_compressed_output(tmp_path):
+    path = str(tmp_path / "shape.x3dz")
+    with X3DWriter(path, compress=True) as writer:
+        writer.element("Scene", text="a < b")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert f.read() == "<Scene>a &lt; b</Scene>\n"
+
+
+def test_open_file_is_left_open():
+    out = io.StringIO()
+    with X3DWriter(out) as writer:
+        writer.element("Group")
+    assert not out.closed
+    assert out.getvalue() == "<Group/>\n"
+
+
+def test_validation_rejects_bad_nesting_and_fragments():
+    writer = X3DWriter(io.StringIO(), validate=True)
+    writer.start("Scene")
+    writer.start("Shape")
+    with pytest.raises(ValueError):
+        writer.end("Scene")
+    with pytest.raises(ElementTree.ParseError):
+        writer.raw("<Shape>")
+
+
+def test_validation_rejects_unclosed_elements():
+    writer = X3DWriter(io.StringIO(), validate=True)
+    writer.start("Scene")
+    with pytest.raises(ValueError):
+        writer.close()
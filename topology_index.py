@@ -0,0 +1,341 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from OCC.Core.BRep import BRep_Tool
+from OCC.Core.BRepAdaptor import BRepAdaptor_Curve, BRepAdaptor_Surface
+from OCC.Core.BRepGProp import brepgprop
+from OCC.Core.GeomAbs import GeomAbs_Circle, GeomAbs_Line
+from OCC.Core.GProp import GProp_GProps
+from OCC.Core.TopAbs import TopAbs_EDGE, TopAbs_FACE, TopAbs_VERTEX
+from OCC.Core.TopExp import TopExp_Explorer, topexp
+from OCC.Core.TopoDS import topods
+from OCC.Core.TopTools import TopTools_IndexedMapOfShape
+
+from disk_cache import DiskCache
+from shape_cache import CACHE_DIR
+
+# Bump when the cached arrays change
+TOPOLOGY_FORMAT = "1"
+
+# Curve type of the degenerated edges, they have no 3D curve
+NO_CURVE = -1
+
+
+# Function to group values by an integer key in compressed sparse row form
+def _group_by(keys, values, count):
+    """
+    Returns:
+        offsets (count + 1 int32), the values of key k being values[offsets[k]:offsets[k + 1]]
+    """
+    offsets = np.zeros(count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(keys, minlength=count), out=offsets[1:])
+    return offsets, values[np.argsort(keys, kind="stable")].astype(np.int32)
+
+
+# Function to measure an edge, in closed form for lines and circles
+def _edge_length(edge, curve_type):
+    if curve_type == NO_CURVE:
+        return 0.0
+    if curve_type in (int(GeomAbs_Line), int(GeomAbs_Circle)):
+        curve = BRepAdaptor_Curve(edge)
+        span = abs(curve.LastParameter() - curve.FirstParameter())
+        return span if curve_type == int(GeomAbs_Line) else span * curve.Circle().Radius()
+    props = GProp_GProps()
+    brepgprop.LinearProperties(edge, props)
+    return props.Mass()
+
+
+# Function to list the unique faces, edges and vertices of a shape, in TopExp order
+def _map_shapes(shape):
+    maps = []
+    for kind in (TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX):
+        shape_map = TopTools_IndexedMapOfShape()
+        topexp.MapShapes(shape, kind, shape_map)
+        maps.append(shape_map)
+    return maps
+
+
+class TopologyIndex:
+    """Integer ids of the unique faces, edges and vertices of a shape and how they touch.
+
+    Ids are the 0 based positions in the TopExp maps of the shape. Adjacency is
+    kept in compressed sparse row arrays, e.g. the faces bounded by edge e are
+    edge_face_ids[edge_face_offsets[e]:edge_face_offsets[e + 1]]. Only the arrays
+    are cached: the sub-shapes are mapped again from the shape, the same BRep
+    giving the same order.
+    """
+
+    ARRAYS = (
+        "face_types",  # GeomAbs_SurfaceType per face
+        "edge_types",  # GeomAbs_CurveType per edge, NO_CURVE if degenerated
+        "edge_vertices",  # (first, last) vertex id per edge, -1 if missing
+        "face_edge_offsets",
+        "face_edge_ids",
+        "face_edge_seams",  # the edge is a seam of the face, bounding it on both sides
+        "edge_face_offsets",
+        "edge_face_ids",
+        "face_face_offsets",
+        "face_face_ids",
+    )
+
+    def __init__(self, shape, maps, arrays):
+        self.shape = shape
+        self._face_map, self._edge_map, self._vertex_map = maps
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self._edge_lengths = None  # measured on demand, NaN until then
+
+    @classmethod
+    def build(cls, shape):
+        """Visits every face and edge once, linear in the size of the topology"""
+        maps = _map_shapes(shape)
+        face_map, edge_map, vertex_map = maps
+        face_count, edge_count = face_map.Size(), edge_map.Size()
+
+        face_types = np.empty(face_count, dtype=np.int8)
+        pair_faces, pair_edges, pair_seams = [], [], []
+        for i in range(face_count):
+            face = topods.Face(face_map.FindKey(i + 1))
+            face_types[i] = int(BRepAdaptor_Surface(face, False).GetType())
+            # edge id -> seen twice, a seam comes once per orientation
+            edges = {}
+            explorer = TopExp_Explorer(face, TopAbs_EDGE)
+            while explorer.More():
+                edge_id = edge_map.FindIndex(explorer.Current()) - 1
+                edges[edge_id] = edge_id in edges
+                explorer.Next()
+            pair_faces.extend([i] * len(edges))
+            pair_edges.extend(edges)
+            pair_seams.extend(edges.values())
+
+        edge_types = np.empty(edge_count, dtype=np.int8)
+        edge_vertices = np.empty((edge_count, 2), dtype=np.int32)
+        for j in range(edge_count):
+            edge = topods.Edge(edge_map.FindKey(j + 1))
+            if BRep_Tool.Degenerated(edge):
+                edge_types[j] = NO_CURVE
+            else:
+                edge_types[j] = int(BRepAdaptor_Curve(edge).GetType())
+            edge_vertices[j] = (
+                vertex_map.FindIndex(topexp.FirstVertex(edge)) - 1,
+                vertex_map.FindIndex(topexp.LastVertex(edge)) - 1,
+            )
+
+        pair_faces = np.array(pair_faces, dtype=np.int32)
+        pair_edges = np.array(pair_edges, dtype=np.int32)
+        face_edge_offsets = np.zeros(face_count + 1, dtype=np.int32)
+        np.cumsum(np.bincount(pair_faces, minlength=face_count), out=face_edge_offsets[1:])
+        edge_face_offsets, edge_face_ids = _group_by(pair_edges, pair_faces, edge_count)
+
+        # two faces are neighbours when they share an edge: pair every face of an
+        # edge with the other faces of that edge
+        sizes = np.diff(edge_face_offsets)
+        owner = np.repeat(np.arange(edge_count), sizes)
+        repeats = sizes[owner]
+        first = np.repeat(edge_face_ids, repeats)
+        local = np.arange(len(first)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        second = edge_face_ids[np.repeat(edge_face_offsets[owner], repeats) + local]
+        keep = first != second
+        neighbours = np.unique(first[keep].astype(np.int64) * face_count + second[keep])
+        face_face_offsets, face_face_ids = _group_by(
+            neighbours // max(face_count, 1), neighbours % max(face_count, 1), face_count
+        )
+
+        return cls(shape, maps, {
+            "face_types": face_types,
+            "edge_types": edge_types,
+            "edge_vertices": edge_vertices,
+            "face_edge_offsets": face_edge_offsets,
+            "face_edge_ids": pair_edges,
+            "face_edge_seams": np.array(pair_seams, dtype=bool),
+            "edge_face_offsets": edge_face_offsets,
+            "edge_face_ids": edge_face_ids,
+            "face_face_offsets": face_face_offsets,
+            "face_face_ids": face_face_ids,
+        })
+
+    @classmethod
+    def from_arrays(cls, shape, arrays):
+        """Binds cached arrays to their shape, None if they do not match its topology"""
+        maps = _map_shapes(shape)
+        if (
+            len(arrays["face_types"]) != maps[0].Size()
+            or len(arrays["edge_types"]) != maps[1].Size()
+            or (arrays["edge_vertices"].max(initial=-1) >= maps[2].Size())
+        ):
+            return None
+        return cls(shape, maps, arrays)
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez(buffer, **{name: getattr(self, name) for name in self.ARRAYS})
+        return buffer.getvalue()
+
+    @property
+    def face_count(self):
+        return self._face_map.Size()
+
+    @property
+    def edge_count(self):
+        return self._edge_map.Size()
+
+    @property
+    def vertex_count(self):
+        return self._vertex_map.Size()
+
+    def face(self, face_id):
+        return topods.Face(self._face_map.FindKey(int(face_id) + 1))
+
+    def edge(self, edge_id):
+        return topods.Edge(self._edge_map.FindKey(int(edge_id) + 1))
+
+    def vertex(self, vertex_id):
+        return topods.Vertex(self._vertex_map.FindKey(int(vertex_id) + 1))
+
+    def faces(self):
+        return [self.face(i) for i in range(self.face_count)]
+
+    def face_id(self, face):
+        """-1 if face is not a face of the shape"""
+        return self._face_map.FindIndex(face) - 1
+
+    def edge_id(self, edge):
+        return self._edge_map.FindIndex(edge) - 1
+
+    def edges_of_face(self, face_id):
+        return self.face_edge_ids[self.face_edge_offsets[face_id]:self.face_edge_offsets[face_id + 1]]
+
+    def boundary_edges(self, face_id):
+        """Edges of a face, seams and degenerated edges left out"""
+        start, stop = self.face_edge_offsets[face_id], self.face_edge_offsets[face_id + 1]
+        edges = self.face_edge_ids[start:stop]
+        keep = ~self.face_edge_seams[start:stop] & (self.edge_types[edges] != NO_CURVE)
+        return edges[keep]
+
+    def edge_lengths(self, edge_ids):
+        """Lengths of edges, each measured once and then kept with the index"""
+        if self._edge_lengths is None:
+            self._edge_lengths = np.full(self.edge_count, np.nan)
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        for edge_id in np.unique(edge_ids[np.isnan(self._edge_lengths[edge_ids])]):
+            self._edge_lengths[edge_id] = _edge_length(self.edge(edge_id), int(self.edge_types[edge_id]))
+        return self._edge_lengths[edge_ids]
+
+    def faces_of_edge(self, edge_id):
+        return self.edge_face_ids[self.edge_face_offsets[edge_id]:self.edge_face_offsets[edge_id + 1]]
+
+    def neighbours(self, face_id):
+        """Faces sharing at least one edge with a face"""
+        return self.face_face_ids[self.face_face_offsets[face_id]:self.face_face_offsets[face_id + 1]]
+
+    def faces_of_type(self, surface_type):
+        return np.flatnonzero(self.face_types == int(surface_type))
+
+    def edges_of_type(self, curve_type):
+        return np.flatnonzero(self.edge_types == int(curve_type))
+
+
+class TopologyIndexCache:
+    """Topology indexes of the recently used shapes, and their arrays on disk.
+
+    A shape is found in memory when it is the same one (IsSame) as a cached
+    shape, e.g. the one returned again by the shape cache. Otherwise the
+    arrays are looked up on disk under the shape cache key of the STEP file
+    the shape was loaded from, and only built when missing. Without that key
+    the disk is skipped: hashing the content of the shape costs about as much
+    as building the index.
+    """
+
+    def __init__(self, max_entries=32, directory=None, max_disk_bytes=128 * 1024 * 1024):
+        self._max_entries = max_entries
+        self._indexes = OrderedDict()  # id -> TopologyIndex
+        self._lock = threading.Lock()
+        self._disk = DiskCache(
+            directory or os.path.join(CACHE_DIR, "topology"),
+            max_bytes=max_disk_bytes,
+            suffix=".npz",
+        )
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def make_key(self, shape_key):
+        return f"{shape_key}-{TOPOLOGY_FORMAT}"
+
+    def get(self, shape, shape_key=None):
+        """
+        shape_key: the ShapeCache key of the STEP file shape was loaded from
+        (utils.shape_cache_key), the index is only kept in memory if None
+        """
+        with self._lock:
+            for entry_id, index in self._indexes.items():
+                if index.shape.IsSame(shape):
+                    self._indexes.move_to_end(entry_id)
+                    self.hits += 1
+                    return index
+        key = self.make_key(shape_key) if shape_key is not None else None
+        index = None
+        cached_path = self._disk.get_path(key) if key is not None else None
+        if cached_path is not None:
+            try:
+                with np.load(cached_path) as arrays:
+                    index = TopologyIndex.from_arrays(shape, {name: arrays[name] for name in TopologyIndex.ARRAYS})
+            except (OSError, KeyError, ValueError):  # evicted meanwhile, or written by another version
+                index = None
+        if index is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            index = TopologyIndex.build(shape)
+            if key is not None:
+                self._disk.put(key, index.to_bytes())
+        with self._lock:
+            self._indexes[id(index)] = index
+            while len(self._indexes) > self._max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def forget(self, shape):
+        """Drops the index of a shape from memory"""
+        with self._lock:
+            for entry_id in [entry_id for entry_id, index in self._indexes.items() if index.shape.IsSame(shape)]:
+                del self._indexes[entry_id]
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._indexes),
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk": self._disk.stats(),
+        }
+
+
+_default_cache = None
+
+
+def get_topology_index(shape, shape_key=None):
+    """Returns the topology index of a shape from the process wide cache, building it once.
+
+    shape_key: the ShapeCache key of the STEP file of shape, to share the index
+    with other processes through the disk cache
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TopologyIndexCache()
+    return _default_cache.get(shape, shape_key)
+
+
+def forget_topology_index(shape):
+    """Drops the index of a shape from the process wide cache, e.g. when the shape is unloaded"""
+    if _default_cache is not None:
+        _default_cache.forget(shape)
@@ -1,10 +1,35 @@
 from OCC.Core.STEPControl import STEPControl_Reader
+from OCC.Core.IFSelect import IFSelect_RetDone
+
+from shape_cache import get_shape_cache
+
+# Key of a STEP file in the shape cache, the hash of its bytes and of the reader options
+def shape_cache_key(file_path: str):
+    return get_shape_cache().make_key(file_path, transfer="roots")
+
+# Load the STEP file, reusing the parsed shape when the same file was already read
+def load_step_file(file_path: str, use_cache=True):
+    cache = get_shape_cache() if use_cache else None
+    if cache is not None:
+        key = shape_cache_key(file_path)
+        shape = cache.get(key)
+        if shape is not None:
+            return shape
 
-# Load the STEP file
-def load_step_file(file_path: str):
     step_reader = STEPControl_Reader()
-    step_reader.ReadFile(file_path)
-    step_reader.TransferRoot()
-    shape = step_reader.Shape()
+    status = step_reader.ReadFile(file_path)
+    if status != IFSelect_RetDone:
+        raise ValueError(f"Could not read STEP file {file_path}")
+    # every root, assemblies and multi-body files have several of them
+    if step_reader.TransferRoots() == 0:
+        raise ValueError(f"No shape to transfer in STEP file {file_path}")
+    # the shape itself when there is one root, a compound of all of them otherwise
+    shape = step_reader.OneShape()
+
+    if cache is not None:
+        cache.put(key, shape)
     return shape
 
+# Hit/miss/eviction counters of the parsed shape cache
+def shape_cache_stats():
+    return get_shape_cache().stats()
@@ -0,0 +1,113 @@
+import gzip
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+X3D_DOCTYPE = (
+    '<!DOCTYPE X3D PUBLIC "ISO//Web3D//DTD X3D 3.3//EN" '
+    '"http://www.web3d.org/specifications/x3d-3.3.dtd">\n'
+)
+X3D_ATTRIBUTES = {
+    "profile": "Immersive",
+    "version": "3.3",
+    "xmlns:xsd": "http://www.w3.org/2001/XMLSchema-instance",
+    "xsd:noNamespaceSchemaLocation": "http://www.web3d.org/specifications/x3d-3.3.xsd",
+}
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"}
+
+
+# Function to format an attribute value, tuples and lists become space separated values
+def attribute_value(value):
+    if isinstance(value, (tuple, list)):
+        value = " ".join(str(v) for v in value)
+    return escape(str(value), _ATTRIBUTE_ENTITIES)
+
+
+class X3DWriter:
+    """Writes an X3D document element by element straight to a file.
+
+    Nothing but the element being written is held in memory, so the peak
+    memory is the one of the largest fragment (usually one triangle set).
+    Attributes and text are escaped. With validate=True every raw fragment is
+    parsed and the nesting of the elements is checked, which is slow and meant
+    for debugging the exporters only.
+    """
+
+    def __init__(self, file, compress=False, validate=False):
+        """file is a path, or an open text file object that is left open"""
+        if isinstance(file, str):
+            opener = gzip.open if compress else open
+            self._file = opener(file, "wt", encoding="utf-8")
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._validate = validate
+        self._open_tags = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(check=exc_type is None)
+
+    def _attributes(self, attributes):
+        return "".join(
+            f' {name}="{attribute_value(value)}"'
+            for name, value in attributes.items()
+            if value is not None
+        )
+
+    def start(self, tag, attributes=None):
+        self._file.write(f"<{tag}{self._attributes(attributes or {})}>")
+        self._open_tags.append(tag)
+
+    def end(self, tag):
+        if self._validate:
+            if not self._open_tags or self._open_tags[-1] != tag:
+                raise ValueError(f"closing <{tag}> while <{self._open_tags[-1] if self._open_tags else ''}> is open")
+        self._open_tags.pop()
+        self._file.write(f"</{tag}>\n")
+
+    def element(self, tag, attributes=None, text=None):
+        if text is None:
+            self._file.write(f"<{tag}{self._attributes(attributes or {})}/>\n")
+        else:
+            self._file.write(f"<{tag}{self._attributes(attributes or {})}>{escape(text)}</{tag}>\n")
+
+    def text(self, text):
+        self._file.write(escape(text))
+
+    def raw(self, fragment):
+        """Writes an already serialized XML fragment, e.g. a TriangleSet from the tesselator"""
+        if self._validate:
+            ElementTree.fromstring(f"<fragment>{fragment}</fragment>")
+        self._file.write(fragment)
+
+    def header(self, version, description="x3dom based shape rendering"):
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self._file.write(X3D_DOCTYPE)
+        self.start("X3D", X3D_ATTRIBUTES)
+        self._file.write("\n")
+        self.start("head")
+        self._file.write("\n")
+        for name, content in (
+            ("generator", f"xlogic-{version} X3D exporter (www.xlogiclabs.com)"),
+            ("creator", f"xlogic-{version} generator"),
+            ("identifier", "http://www.xlogiclabs.com"),
+            ("description", f"xlogic-{version} {description}"),
+        ):
+            self.element("meta", {"name": name, "content": content})
+        self.end("head")
+        self.start("Scene")
+        self._file.write("\n")
+
+    def footer(self):
+        self.end("Scene")
+        self.end("X3D")
+
+    def close(self, check=True):
+        if self._owns_file:
+            self._file.close()
+        if check and self._validate and self._open_tags:
+            raise ValueError(f"unclosed elements {self._open_tags}")
@@ -17,6 +17,7 @@
 
 import json
 import os
+import shutil
 from string import Template
 import sys
 import tempfile
@@ -27,7 +28,23 @@ from OCC.Core.Tesselator import ShapeTesselator
 from OCC import VERSION
 
 from OCC.Extend.TopologyUtils import is_edge, is_wire, discretize_edge, discretize_wire
-from OCC.Display.WebGl.simple_server import start_server
+
+from tessellation_cache import get_tessellation_cache, write_output
+from scene_server import start_scene_server
+from parallel_display import display_items, run_display_jobs, worker_count
+from shape_cache import shape_from_bytes, shape_to_bytes
+from mesh_lod import DEFAULT_LOD_FACTORS, lod_name, unmeshed_copy
+from geometry_io import buffer_geometry_json, merge_point_sets
+from gltf_export import (
+    GLBWriter,
+    line_arrays_from_point_sets,
+    mesh_arrays_from_tesselator,
+    pack_mesh,
+    unpack_mesh,
+)
+
+# Geometry output formats of ThreejsRenderer
+OUTPUT_FORMATS = ("json", "glb")
 
 
 def spinning_cursor():
@@ -48,34 +65,28 @@ def color_to_hex(rgb_color):
     return "0x%.02x%.02x%.02x" % (rh, gh, bh)
 
 
-def export_edgedata_to_json(edge_hash, point_set):
-    """Export a set of points to a LineSegment buffergeometry"""
-    # first build the array of point coordinates
-    # edges are built as follows:
-    # points_coordinates  =[P0x, P0y, P0z, P1x, P1y, P1z, P2x, P2y, etc.]
-    points_coordinates = []
-    for point in point_set:
-        points_coordinates.extend(iter(point))
-    # then build the dictionary exported to json
-    edges_data = {
-        "metadata": {
-            "version": 4.4,
-            "type": "BufferGeometry",
-            "generator": "pythonocc",
-        },
-        "uuid": edge_hash,
-        "type": "BufferGeometry",
-        "data": {
-            "attributes": {
-                "position": {
-                    "itemSize": 3,
-                    "type": "Float32Array",
-                    "array": points_coordinates,
-                }
-            }
-        },
-    }
-    return json.dumps(edges_data, indent=4)
+def export_edgedata_to_json(edge_hash, point_set, precision=None):
+    """Export a set of points to a Line buffergeometry"""
+    edges_data = buffer_geometry_json(edge_hash, point_set, precision=precision)
+    return json.dumps(edges_data, separators=(",", ":"))
+
+
+def export_edges_to_json(edges_hash, point_sets, precision=None, sidecar_path=None):
+    """Export several polylines to a single indexed LineSegments buffergeometry.
+    userData.edge_offsets holds, for each polyline, the [start, count] of its
+    segments in the index buffer, so that one edge can be drawn on its own
+    with geometry.setDrawRange
+    """
+    positions, indices, edge_offsets = merge_point_sets(point_sets)
+    edges_data = buffer_geometry_json(
+        edges_hash,
+        positions,
+        indices,
+        user_data={"edge_offsets": edge_offsets.tolist()},
+        precision=precision,
+        sidecar_path=sidecar_path,
+    )
+    return json.dumps(edges_data, separators=(",", ":"))
 
 
 HEADER_TEMPLATE = Template(
@@ -162,6 +173,7 @@ MAIN_JS_TEMPLATE = Template(
 import * as THREE from 'three';
 import { TrackballControls } from 'three/addons/controls/TrackballControls.js';
 import Stats from 'three/addons/libs/stats.module.js'
+$Imports
 
 var camera, scene, renderer, object, stats, container, shape_material;
 var controls;
@@ -186,6 +198,7 @@ var selected_target_color_r = 0;
 var selected_target_color_g = 0;
 var selected_target_color_b = 0;
 var selected_target = null;
+var highlighted_edge = null;
 init();
 animate();
 
@@ -291,6 +304,12 @@ function onDocumentMouseClick(event) {
     // perform selection
     raycaster.setFromCamera(mouse, camera);
     var intersects = raycaster.intersectObjects(scene.children);
+    if (intersects.length > 0 && intersects[0].object.isLineSegments &&
+        intersects[0].object.geometry.userData.edge_offsets) {
+        var lines = intersects[0].object;
+        highlight_edge(lines, edge_index_from_segment(lines, intersects[0].index));
+        return;
+    }
     if (intersects.length > 0) {
         var target = intersects[0].object;
         selected_target_color_r = target.material.color.r;
@@ -301,6 +320,72 @@ function onDocumentMouseClick(event) {
         selected_target = target;
     }
 }
+// loads a geometry written by geometry_io, its arrays are base64 strings or ranges of a binary sidecar file
+const TYPED_ARRAYS = {Float32Array: Float32Array, Uint16Array: Uint16Array, Uint32Array: Uint32Array};
+function load_geometry(url, on_load) {
+    fetch(url).then(response => response.json()).then(function(json) {
+        var arrays = Object.values(json.data.attributes);
+        if (json.data.index) arrays.push(json.data.index);
+        var sidecar = arrays.find(entry => entry.uri !== undefined);
+        var buffer = sidecar ? fetch(new URL(sidecar.uri, new URL(url, document.baseURI))).then(response => response.arrayBuffer()) : Promise.resolve(null);
+        buffer.then(function(sidecar_buffer) {
+            for (var entry of arrays) {
+                var typed_array = TYPED_ARRAYS[entry.type];
+                if (entry.uri !== undefined) {
+                    entry.array = new typed_array(sidecar_buffer, entry.byteOffset, entry.count);
+                } else if (typeof entry.array === 'string') {
+                    var raw = atob(entry.array);
+                    var bytes = new Uint8Array(raw.length);
+                    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+                    entry.array = new typed_array(bytes.buffer);
+                }
+            }
+            on_load(new THREE.BufferGeometryLoader().parse(json));
+        });
+    });
+}
+// index of the edge a segment of a merged edge buffer belongs to
+function edge_index_from_segment(lines, index_position) {
+    var offsets = lines.geometry.userData.edge_offsets;
+    var low = 0, high = offsets.length - 1;
+    while (low < high) {
+        var middle = (low + high + 1) >> 1;
+        if (offsets[middle][0] <= index_position) { low = middle; } else { high = middle - 1; }
+    }
+    return low;
+}
+// draws a single edge of a merged edge buffer on top of the others
+function highlight_edge(lines, edge_index) {
+    var range = lines.geometry.userData.edge_offsets[edge_index];
+    if (highlighted_edge) {
+        scene.remove(highlighted_edge);
+        highlighted_edge.geometry.dispose();
+    }
+    var geometry = new THREE.BufferGeometry();
+    geometry.setAttribute('position', lines.geometry.getAttribute('position'));
+    geometry.setIndex(lines.geometry.getIndex());
+    geometry.setDrawRange(range[0], range[1]);
+    highlighted_edge = new THREE.LineSegments(geometry, new THREE.LineBasicMaterial({color: 0xffa500}));
+    scene.add(highlighted_edge);
+}
+// levels of detail: the coarsest mesh shows as soon as it is loaded, the finer
+// ones take over as they arrive, coarse levels stay in use when the camera is far
+const LOD_DISTANCE_FACTOR = 4.0;
+function load_lod_levels(loader, lod, urls, material, on_first_level) {
+    var finest = urls.length - 1;
+    urls.forEach(function(url, level) {
+        loader.load(url, function(geometry) {
+            var mesh = new THREE.Mesh(geometry, material);
+            mesh.castShadow = true;
+            mesh.receiveShadow = true;
+            geometry.computeBoundingSphere();
+            var distance = level == finest ? 0 : geometry.boundingSphere.radius * Math.pow(LOD_DISTANCE_FACTOR, finest - level);
+            var first_level = lod.levels.length == 0;
+            lod.addLevel(mesh, distance);
+            if (first_level && on_first_level) on_first_level();
+        });
+    });
+}
 function fit_to_scene() {
     // compute bounding sphere of whole scene
     var center = new THREE.Vector3(0,0,0);
@@ -308,6 +393,8 @@ function fit_to_scene() {
     var positions = new Array();
     // compute center of all objects
     scene.traverse(function(child) {
+        // one level of detail per shape
+        if (child.parent && child.parent.isLOD && child.parent.levels[0].object !== child) return;
         if (child instanceof THREE.Mesh) {
             child.geometry.computeBoundingBox();
             var box = child.geometry.boundingBox;
@@ -363,6 +450,32 @@ function render() {
 """
 )
 
+GLB_IMPORTS_JS = "import { GLTFLoader } from 'three/addons/loaders/GLTFLoader.js';"
+
+# loads the whole scene at once, glb output mode
+GLB_LOADER_JS = Template("""
+    // coarse levels of detail first, each finer scene replaces the one shown when it arrives
+    var gltf_loader = new GLTFLoader();
+    var glb_scene = null;
+    var glb_level = -1;
+    $GlbUrls.forEach(function(url, level) {
+        gltf_loader.load(url, function(gltf) {
+            if (level < glb_level) return;
+            gltf.scene.traverse(function(child) {
+                if (child.isMesh) {
+                    child.castShadow = true;
+                    child.receiveShadow = true;
+                }
+            });
+            if (glb_scene) scene.remove(glb_scene);
+            scene.add(gltf.scene);
+            glb_scene = gltf.scene;
+            if (glb_level < 0) fit_to_scene();
+            glb_level = level;
+        });
+    });
+""")
+
 
 class HTMLHeader:
     def __init__(self, bg_gradient_color1="#000000", bg_gradient_color2="#000000"):
@@ -431,15 +544,34 @@ class HTMLHeader:
 
 
 class ThreejsRenderer:
-    def __init__(self, path=None):
+    def __init__(self, path=None, use_cache=True, output_format="json", lod_factors=DEFAULT_LOD_FACTORS):
+        """output_format: "json" writes one BufferGeometry JSON file per shape,
+        "glb" writes the whole scene as a single binary glTF file (scene.glb)
+        lod_factors: mesh_quality multipliers of the coarse levels of detail
+        written and loaded before the full mesh, coarsest first, e.g.
+        mesh_lod.COARSE_LOD_FACTORS for large parts, none by default
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}")
         self._path = tempfile.mkdtemp() if not path else path
         self._html_filename = os.path.join(self._path, "index.html")
         self._main_js_filename = os.path.join(self._path, "main.js")
+        self._glb_filename = os.path.join(self._path, "scene.glb")
+        self._output_format = output_format
+        self._lod_factors = tuple(lod_factors)
         self._3js_shapes = {}
         self._3js_edges = {}
+        # glb mode: shape hash -> (positions, normals, indices, edge point sets,
+        # [(positions, normals, indices) of each coarse level])
+        self._glb_meshes = {}
+        # tessellations are reused across renders of the same part
+        self._cache = get_tessellation_cache() if use_cache else None
         self.spinning_cursor = spinning_cursor()
         print(f"## threejs renderer")
 
+    def cache_stats(self):
+        return self._cache.stats() if self._cache is not None else None
+
     def DisplayShape(
         self,
         shape,
@@ -457,7 +589,7 @@ class ThreejsRenderer:
             print("discretize an edge")
             pnts = discretize_edge(shape)
             edge_hash = f"edg{uuid.uuid4().hex}"
-            str_to_write = export_edgedata_to_json(edge_hash, pnts)
+            str_to_write = export_edges_to_json(edge_hash, [pnts])
             edge_full_path = os.path.join(self._path, f"{edge_hash}.json")
             with open(edge_full_path, "w") as edge_file:
                 edge_file.write(str_to_write)
@@ -468,28 +600,33 @@ class ThreejsRenderer:
             print("discretize a wire")
             pnts = discretize_wire(shape)
             wire_hash = f"wir{uuid.uuid4().hex}"
-            str_to_write = export_edgedata_to_json(wire_hash, pnts)
+            str_to_write = export_edges_to_json(wire_hash, [pnts])
             wire_full_path = os.path.join(self._path, f"{wire_hash}.json")
             with open(wire_full_path, "w") as wire_file:
                 wire_file.write(str_to_write)
             # store this edge hash
             self._3js_edges[wire_hash] = [color, line_width]
             return self._3js_shapes, self._3js_edges
-        shape_uuid = uuid.uuid4().hex
+        # name the geometry after the shape content, so that repeat renders reuse it
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache.make_key(
+                shape,
+                mesh_quality=mesh_quality,
+                export_edges=export_edges,
+                output_format=self._output_format,
+            )
+            shape_uuid = cache_key[:32]
+        else:
+            shape_uuid = uuid.uuid4().hex
         shape_hash = f"shp{shape_uuid}"
-        # tesselatte
-        tess = ShapeTesselator(shape)
-        tess.Compute(
-            compute_edges=export_edges, mesh_quality=mesh_quality, parallel=True
-        )
-        # update spinning cursor
-        sys.stdout.write(
-            "\r%s mesh shape %s, %i triangles     "
-            % (next(self.spinning_cursor), shape_hash, tess.ObjGetTriangleCount())
-        )
-        sys.stdout.flush()
+        if shape_hash in self._3js_shapes:  # same part displayed twice
+            shape_hash = f"{shape_hash}_{len(self._3js_shapes)}"
         # export to 3JS
         shape_full_path = os.path.join(self._path, f"{shape_hash}.json")
+        # all the edges of the shape go to a single file
+        edges_hash = f"edg{shape_hash[3:]}"
+        edges_full_path = os.path.join(self._path, f"{edges_hash}.json")
         # add this shape to the shape dict, sotres everything related to it
         self._3js_shapes[shape_hash] = [
             export_edges,
@@ -500,34 +637,273 @@ class ThreejsRenderer:
             line_color,
             line_width,
         ]
+        if self._output_format == "glb":
+            self._display_shape_glb(shape, shape_hash, cache_key, export_edges, mesh_quality)
+            return self._3js_shapes, self._3js_edges
+        lod_paths = [
+            os.path.join(self._path, f"{lod_name(shape_hash, level)}.json")
+            for level in range(len(self._lod_factors))
+        ]
+        if (
+            cache_key is not None
+            and self._cache.fetch(cache_key, shape_full_path)
+            and (not export_edges or self._cache.fetch(f"{cache_key}-edges", edges_full_path))
+            and all(
+                self._cache.fetch(f"{cache_key}-lod{factor:g}", lod_path)
+                for factor, lod_path in zip(self._lod_factors, lod_paths)
+            )
+        ):
+            sys.stdout.write(
+                "\r%s mesh shape %s, cached     " % (next(self.spinning_cursor), shape_hash)
+            )
+            sys.stdout.flush()
+            if export_edges:
+                # store this edges hash, with black color
+                self._3js_edges[edges_hash] = [(0, 0, 0), line_width]
+            return self._3js_shapes, self._3js_edges
+        # coarse levels of detail first, they never get edges
+        for lod_tess, factor, lod_path in zip(
+            self._coarse_tesselators(shape, mesh_quality), self._lod_factors, lod_paths
+        ):
+            write_output(lod_path, lod_tess.ExportShapeToThreejsJSONString(shape_uuid))
+            if cache_key is not None:
+                self._cache.store(f"{cache_key}-lod{factor:g}", lod_path)
+        # tesselatte
+        tess = ShapeTesselator(shape)
+        tess.Compute(
+            compute_edges=export_edges, mesh_quality=mesh_quality, parallel=True
+        )
+        # update spinning cursor
+        sys.stdout.write(
+            "\r%s mesh shape %s, %i triangles     "
+            % (next(self.spinning_cursor), shape_hash, tess.ObjGetTriangleCount())
+        )
+        sys.stdout.flush()
         # generate the mesh
         # tess.ExportShapeToThreejs(shape_hash, shape_full_path)
         # and also to JSON
-        with open(shape_full_path, "w") as json_file:
-            json_file.write(tess.ExportShapeToThreejsJSONString(shape_uuid))
+        # a partial cache hit may have linked the cached files here, they are replaced
+        write_output(shape_full_path, tess.ExportShapeToThreejsJSONString(shape_uuid))
+        if cache_key is not None:
+            self._cache.store(cache_key, shape_full_path)
         # draw edges if necessary
         if export_edges:
-            # export each edge to a single json
             # get number of edges
             nbr_edges = tess.ObjGetEdgeCount()
+            edge_point_sets = []
             for i_edge in range(nbr_edges):
-                # after that, the file can be appended
-                str_to_write = ""
                 nbr_vertices = tess.ObjEdgeGetVertexCount(i_edge)
-                edge_point_set = [
-                    tess.GetEdgeVertex(i_edge, i_vert) for i_vert in range(nbr_vertices)
+                edge_point_sets.append(
+                    [tess.GetEdgeVertex(i_edge, i_vert) for i_vert in range(nbr_vertices)]
+                )
+            write_output(edges_full_path, export_edges_to_json(edges_hash, edge_point_sets))
+            if cache_key is not None:
+                self._cache.store(f"{cache_key}-edges", edges_full_path)
+            # store this edges hash, with black color
+            self._3js_edges[edges_hash] = [(0, 0, 0), line_width]
+        return self._3js_shapes, self._3js_edges
+
+    def DisplayShapes(
+        self,
+        items,
+        workers=None,
+        export_edges=False,
+        specular_color=(0.2, 0.2, 0.2),
+        shininess=0.9,
+        transparency=0.0,
+        line_color=(0, 0.0, 0.0),
+        line_width=1.0,
+        mesh_quality=1.0,
+    ):
+        """Adds many shapes at once, e.g. the solids of an assembly, tessellated
+        over a pool of worker processes that write their files as they complete.
+        items are shapes or (shape, color, name) tuples, workers=None uses all cores
+        """
+        items = display_items(items)
+        if worker_count(workers, len(items)) == 1:
+            for shape, color, _ in items:
+                self.DisplayShape(
+                    shape, export_edges, color, specular_color, shininess,
+                    transparency, line_color, line_width, mesh_quality,
+                )
+            return self._3js_shapes, self._3js_edges
+        # identical shapes are tessellated once
+        jobs = []
+        job_items = {}  # BRep bytes -> indices of the items showing that shape
+        for index, (shape, color, _) in enumerate(items):
+            if is_edge(shape) or is_wire(shape):
+                # cheap to discretize, they stay in this process
+                self.DisplayShape(shape, color=color, line_width=line_width)
+                continue
+            data = shape_to_bytes(shape, with_triangles=False)
+            if data not in job_items:
+                job_items[data] = []
+                jobs.append((data, export_edges, mesh_quality))
+            job_items[data].append(index)
+        results = run_display_jobs(
+            _tessellate_shape,
+            jobs,
+            workers,
+            _init_tessellation_worker,
+            (self._path, self._cache is not None, self._output_format, self._lod_factors),
+        )
+        for job_index, (shape_hash, has_edges, glb_mesh) in results:
+            for index in job_items[jobs[job_index][0]]:
+                entry = [
+                    export_edges,
+                    items[index][1],
+                    specular_color,
+                    shininess,
+                    transparency,
+                    line_color,
+                    line_width,
                 ]
-                # write to file
-                edge_hash = f"edg{uuid.uuid4().hex}"
-                str_to_write += export_edgedata_to_json(edge_hash, edge_point_set)
-                # create the file
-                edge_full_path = os.path.join(self._path, f"{edge_hash}.json")
-                with open(edge_full_path, "w") as edge_file:
-                    edge_file.write(str_to_write)
-                # store this edge hash, with black color
-                self._3js_edges[edge_hash] = [(0, 0, 0), line_width]
+                self._add_tessellated_shape(shape_hash, entry, has_edges, glb_mesh)
+            sys.stdout.write(
+                "\r%s mesh shape %s, %i/%i     "
+                % (next(self.spinning_cursor), shape_hash, len(self._3js_shapes), len(items))
+            )
+            sys.stdout.flush()
         return self._3js_shapes, self._3js_edges
 
+    def _add_tessellated_shape(self, shape_hash, entry, has_edges, glb_mesh):
+        # registers a shape tessellated by a worker process
+        name = shape_hash
+        if name in self._3js_shapes:  # same part displayed twice
+            name = f"{shape_hash}_{len(self._3js_shapes)}"
+            if self._output_format == "json":
+                shutil.copyfile(
+                    os.path.join(self._path, f"{shape_hash}.json"),
+                    os.path.join(self._path, f"{name}.json"),
+                )
+                if has_edges:
+                    shutil.copyfile(
+                        os.path.join(self._path, f"edg{shape_hash[3:]}.json"),
+                        os.path.join(self._path, f"edg{name[3:]}.json"),
+                    )
+                for level in range(len(self._lod_factors)):
+                    shutil.copyfile(
+                        os.path.join(self._path, f"{lod_name(shape_hash, level)}.json"),
+                        os.path.join(self._path, f"{lod_name(name, level)}.json"),
+                    )
+        self._3js_shapes[name] = entry
+        if glb_mesh is not None:
+            self._glb_meshes[name] = glb_mesh
+        elif has_edges:
+            # store this edges hash, with black color
+            self._3js_edges[f"edg{name[3:]}"] = [(0, 0, 0), entry[6]]
+
+    def _coarse_tesselators(self, shape, mesh_quality):
+        # yields the computed tesselator of each coarse level of detail, coarsest first
+        if not self._lod_factors:
+            return
+        shape = unmeshed_copy(shape)
+        for factor in self._lod_factors:
+            lod_tess = ShapeTesselator(shape)
+            lod_tess.Compute(
+                compute_edges=False, mesh_quality=mesh_quality * factor, parallel=True
+            )
+            yield lod_tess
+
+    def _display_shape_glb(self, shape, shape_hash, cache_key, export_edges, mesh_quality):
+        # the mesh arrays are kept in memory until the scene.glb file is written
+        mesh_path = os.path.join(self._path, f"{shape_hash}.mesh")
+        edges_path = os.path.join(self._path, f"{shape_hash}_edges.json")
+        lod_paths = [
+            os.path.join(self._path, f"{lod_name(shape_hash, level)}.mesh")
+            for level in range(len(self._lod_factors))
+        ]
+        edge_point_sets = []
+        lod_meshes = []
+        if (
+            cache_key is not None
+            and self._cache.fetch(cache_key, mesh_path)
+            and (not export_edges or self._cache.fetch(f"{cache_key}-edges", edges_path))
+            and all(
+                self._cache.fetch(f"{cache_key}-lod{factor:g}", lod_path)
+                for factor, lod_path in zip(self._lod_factors, lod_paths)
+            )
+        ):
+            with open(mesh_path, "rb") as mesh_file:
+                positions, normals, indices = unpack_mesh(mesh_file.read())
+            if export_edges:
+                with open(edges_path) as edges_file:
+                    edge_point_sets = json.load(edges_file)
+            for lod_path in lod_paths:
+                with open(lod_path, "rb") as mesh_file:
+                    lod_meshes.append(unpack_mesh(mesh_file.read()))
+            status = "cached"
+        else:
+            for lod_tess in self._coarse_tesselators(shape, mesh_quality):
+                lod_meshes.append(mesh_arrays_from_tesselator(lod_tess))
+            tess = ShapeTesselator(shape)
+            tess.Compute(
+                compute_edges=export_edges, mesh_quality=mesh_quality, parallel=True
+            )
+            positions, normals, indices = mesh_arrays_from_tesselator(tess)
+            if export_edges:
+                for i_edge in range(tess.ObjGetEdgeCount()):
+                    nbr_vertices = tess.ObjEdgeGetVertexCount(i_edge)
+                    edge_point_sets.append(
+                        [tess.GetEdgeVertex(i_edge, i_vert) for i_vert in range(nbr_vertices)]
+                    )
+            if cache_key is not None:
+                write_output(mesh_path, pack_mesh(positions, normals, indices))
+                self._cache.store(cache_key, mesh_path)
+                if export_edges:
+                    write_output(edges_path, json.dumps(edge_point_sets))
+                    self._cache.store(f"{cache_key}-edges", edges_path)
+                for factor, lod_path, lod_mesh in zip(self._lod_factors, lod_paths, lod_meshes):
+                    write_output(lod_path, pack_mesh(*lod_mesh))
+                    self._cache.store(f"{cache_key}-lod{factor:g}", lod_path)
+            status = "%i triangles" % (len(indices) // 3)
+        # only the scene*.glb files are served
+        for path in [mesh_path, edges_path] + lod_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        sys.stdout.write(
+            "\r%s mesh shape %s, %s     " % (next(self.spinning_cursor), shape_hash, status)
+        )
+        sys.stdout.flush()
+        self._glb_meshes[shape_hash] = (positions, normals, indices, edge_point_sets, lod_meshes)
+
+    def _glb_level_filename(self, level):
+        if level == len(self._lod_factors):
+            return self._glb_filename
+        return os.path.join(self._path, f"{lod_name('scene', level)}.glb")
+
+    def _write_glb(self, level=None):
+        """Writes the scene at a level of detail, None or the last level is the full mesh"""
+        if level is None:
+            level = len(self._lod_factors)
+        writer = GLBWriter()
+        edge_material = None
+        for shape_hash, (positions, normals, indices, edge_point_sets, lod_meshes) in self._glb_meshes.items():
+            if level < len(lod_meshes):
+                # coarse levels come without edges
+                positions, normals, indices = lod_meshes[level]
+                edge_point_sets = []
+            (
+                export_edges,
+                color,
+                specular_color,
+                shininess,
+                transparency,
+                line_color,
+                line_width,
+            ) = self._3js_shapes[shape_hash]
+            material = writer.add_material(
+                shape_hash, color, specular_color, shininess, transparency
+            )
+            writer.add_mesh(shape_hash, positions, normals, indices, material)
+            if edge_point_sets:
+                if edge_material is None:
+                    # edges are drawn in black, as in json mode
+                    edge_material = writer.add_material("edges", (0, 0, 0), unlit=True)
+                line_positions, line_indices = line_arrays_from_point_sets(edge_point_sets)
+                writer.add_lines(f"{shape_hash}_edges", line_positions, line_indices, edge_material)
+        return writer.write(self._glb_level_filename(level))
+
     def generate_html_file(self):
         """Generate the HTML file to be rendered by the web browser"""
         global BODY_TEMPLATE
@@ -535,7 +911,16 @@ class ThreejsRenderer:
         # the following line is a list that will help generating the string
         # using "".join()
         shape_string_list = ["var loader = new THREE.BufferGeometryLoader();\n"]
-        for shape_idx, shape_hash in enumerate(self._3js_shapes):
+        if self._output_format == "glb":
+            glb_urls = []
+            for level in range(len(self._lod_factors) + 1):
+                glb_size = self._write_glb(level)
+                glb_urls.append(os.path.basename(self._glb_level_filename(level)))
+                print(f"\n## {glb_urls[-1]}: {glb_size} bytes")
+            shape_string_list.append(GLB_LOADER_JS.substitute({"GlbUrls": json.dumps(glb_urls)}))
+        for shape_idx, shape_hash in enumerate(
+            [] if self._output_format == "glb" else self._3js_shapes
+        ):
             # get properties for this shape
             (
                 export_edges,
@@ -561,33 +946,32 @@ class ThreejsRenderer:
                     "transparent: true, premultipliedAlpha: true, opacity:%g,"
                     % transparency
                 )
+            # coarse levels of detail first, the full mesh last
+            urls = [
+                f"{lod_name(shape_hash, level)}.json" for level in range(len(self._lod_factors))
+            ] + [f"{shape_hash}.json"]
+            # last shape, we request for a fit_to_scene as soon as it shows up
+            on_first_level = "fit_to_scene" if shape_idx == len(self._3js_shapes) - 1 else "null"
             shape_string_list.extend(
                 (
                     "});\n",
-                    "\t\t\tloader.load('%s.json', function(geometry) {\n" % shape_hash,
-                    "\t\t\t\tvar mesh = new THREE.Mesh(geometry, %s_phong_material);\n"
-                    % shape_hash,
-                    "\t\t\t\tmesh.castShadow = true;\n",
-                    "\t\t\t\tmesh.receiveShadow = true;\n",
-                    "\t\t\t\tscene.add(mesh);\n",
+                    "\t\t\tvar %s_lod = new THREE.LOD();\n" % shape_hash,
+                    "\t\t\tscene.add(%s_lod);\n" % shape_hash,
+                    "\t\t\tload_lod_levels(loader, %s_lod, %s, %s_phong_material, %s);\n\n"
+                    % (shape_hash, json.dumps(urls), shape_hash, on_first_level),
                 )
             )
-            # last shape, we request for a fit_to_scene
-            if shape_idx == len(self._3js_shapes) - 1:
-                shape_string_list.append("\tfit_to_scene();});\n")
-            else:
-                shape_string_list.append("\t\t\t});\n\n")
         # Process edges
         edge_string_list = []
         for edge_hash in self._3js_edges:
             color, line_width = self._3js_edges[edge_hash]
             edge_string_list.extend(
                 (
-                    "\tloader.load('%s.json', function(geometry) {\n" % edge_hash,
+                    "\tload_geometry('%s.json', function(geometry) {\n" % edge_hash,
                     "\tvar line_material = new THREE.LineBasicMaterial({color: %s, linewidth: %s});\n"
                     % ((color_to_hex(color), line_width)),
-                    "\tvar line = new THREE.Line(geometry, line_material);\n",
-                    "\tscene.add(line);\n",
+                    "\tvar lines = new THREE.LineSegments(geometry, line_material);\n",
+                    "\tscene.add(lines);\n",
                     "\t});\n",
                 )
             )
@@ -595,6 +979,7 @@ class ThreejsRenderer:
         with open(self._main_js_filename, "w") as fp:
             main_js = MAIN_JS_TEMPLATE.substitute(
                 {
+                    "Imports": GLB_IMPORTS_JS if self._output_format == "glb" else "",
                     "ShapeList": "".join(shape_string_list),
                     "EdgeList": "".join(edge_string_list),
                     "Uniforms": "",
@@ -629,8 +1014,40 @@ class ThreejsRenderer:
         """render the scene into the browser."""
         # generate HTML file
         self.generate_html_file()
-        # then create a simple web server
-        start_server(addr, server_port, self._path, open_webbrowser)
+        if self._cache is not None:
+            stats = self._cache.stats()
+            print(
+                f"\n## tessellation cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%}), {stats['bytes_reused']} bytes reused"
+            )
+        # then serve the folder, compressed and with cache headers
+        start_scene_server(addr, server_port, self._path, open_webbrowser)
+
+
+# the renderer of a DisplayShapes worker process, writing to the same folder
+_worker_renderer = None
+
+
+def _init_tessellation_worker(path, use_cache, output_format, lod_factors):
+    global _worker_renderer
+    _worker_renderer = ThreejsRenderer(path, use_cache, output_format, lod_factors)
+
+
+# Function to tessellate one shape in a worker process
+def _tessellate_shape(data, export_edges, mesh_quality):
+    """
+    Returns:
+        the shape hash, whether an edges file was written, and the mesh arrays in glb mode
+    """
+    renderer = _worker_renderer
+    renderer._3js_shapes.clear()
+    renderer._3js_edges.clear()
+    renderer._glb_meshes.clear()
+    renderer.DisplayShape(
+        shape_from_bytes(data), export_edges=export_edges, mesh_quality=mesh_quality
+    )
+    shape_hash = next(iter(renderer._3js_shapes))
+    return shape_hash, bool(renderer._3js_edges), renderer._glb_meshes.get(shape_hash)
 
 
 if __name__ == "__main__":
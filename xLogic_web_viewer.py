@@ -14,11 +14,17 @@ from OCC.Core.BRepBndLib import brepbndlib_Add
 
 from OCC.Extend.DataExchange import read_step_file_with_names_colors
 
-# Load the STEP file
-big_shp = read_step_file_with_names_colors(os.path.join("models", "Plate_1.step"))
+from model_registry import ModelRegistry
+from topology_index import get_topology_index
 
+# Model used when no model id is given
+DEFAULT_MODEL = "Plate_1"  # models/Plate_1.step
 
-# Function to recognize face geometry
+# Parts are loaded on first request, nothing is parsed at import time
+registry = ModelRegistry()
+
+
+# Function to recognize face geometry, returns a description of the face
 def recognize_face(a_face):
     if not isinstance(a_face, TopoDS_Face):
         print("Please hit the 'G' key to switch to face selection mode")
@@ -32,6 +38,11 @@ def recognize_face(a_face):
         normal = gp_pln.Axis().Direction()
         print("--> Location (global coordinates)", location.X(), location.Y(), location.Z())
         print("--> Normal (global coordinates)", normal.X(), normal.Y(), normal.Z())
+        return {
+            "type": "plane",
+            "location": (location.X(), location.Y(), location.Z()),
+            "normal": (normal.X(), normal.Y(), normal.Z()),
+        }
     elif surf_type == GeomAbs_Cylinder:
         print("Identified Cylinder Geometry")
         gp_cyl = surf.Cylinder()
@@ -39,10 +50,18 @@ def recognize_face(a_face):
         axis = gp_cyl.Axis().Direction()
         print("--> Location (global coordinates)", location.X(), location.Y(), location.Z())
         print("--> Axis (global coordinates)", axis.X(), axis.Y(), axis.Z())
+        return {
+            "type": "cylinder",
+            "location": (location.X(), location.Y(), location.Z()),
+            "axis": (axis.X(), axis.Y(), axis.Z()),
+            "radius": gp_cyl.Radius(),
+        }
     elif surf_type == GeomAbs_BSplineSurface:
         print("Identified BSplineSurface Geometry")
+        return {"type": "bspline"}
     else:
         print(surf_type, "recognition not implemented")
+        return {"type": "unknown", "surface_type": int(surf_type)}
 
 # Function to recognize clicked face
 def recognize_clicked(face):
@@ -50,10 +69,14 @@ def recognize_clicked(face):
     recognize_face(face)
 
 # Function to recognize all faces in batch mode
-def recognize_batch():
-    for face in TopologyExplorer(big_shp).faces():
-        recognize_face(face)
+def recognize_batch(model_id=DEFAULT_MODEL, shape=None):
+    shape_key = None
+    if shape is None:
+        shape = registry.get(model_id)
+        shape_key = registry.shape_key(model_id)
+    faces = [recognize_face(face) for face in get_topology_index(shape, shape_key).faces()]
     print("============================")
+    return faces
 
 # Function to calculate properties of a shape
 def calculate_properties(shape):
@@ -80,10 +103,11 @@ def calculate_properties(shape):
     }
 
 # Function to get properties of all parts
-def get_all_properties():
+def get_all_properties(model_id=DEFAULT_MODEL, shape=None):
+    shape = registry.get(model_id) if shape is None else shape
     properties = []
-    for shape in TopologyExplorer(big_shp).solids():
-        props = calculate_properties(shape)
+    for solid in TopologyExplorer(shape).solids():
+        props = calculate_properties(solid)
         properties.append(props)
     return properties
 
@@ -91,14 +115,14 @@ def get_all_properties():
 # Main execution
 if __name__ == "__main__":
 
+    big_shp = read_step_file_with_names_colors(registry.resolve(DEFAULT_MODEL))
+
     # Initialize the renderer
     my_renderer = ThreejsRenderer()
-    for shp in big_shp:
-        label, c = big_shp[shp]
-        my_renderer.DisplayShape(
-            shp, 
-            color=(c.Red(), c.Green(), c.Blue()), 
-            export_edges=False,
-        )
+    # the solids are tessellated over all the cores
+    my_renderer.DisplayShapes(
+        [(shp, (c.Red(), c.Green(), c.Blue()), label) for shp, (label, c) in big_shp.items()],
+        export_edges=False,
+    )
     my_renderer.render()
     print("============================")
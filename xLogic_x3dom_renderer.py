@@ -15,22 +15,44 @@
 ##You should have received a copy of the GNU Lesser General Public License
 ##along with xlogic.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import os
 import sys
 from string import Template
 import tempfile
 import uuid
-from xml.etree import ElementTree
 
 from OCC.Core.Tesselator import ShapeTesselator
 from OCC import VERSION
 
 from OCC.Extend.TopologyUtils import is_edge, is_wire, discretize_edge, discretize_wire
-from OCC.Display.WebGl.simple_server import start_server
 
 from OCC.Core.GProp import GProp_GProps
 from OCC.Core.BRepGProp import brepgprop_VolumeProperties, brepgprop_SurfaceProperties, brepgprop_LinearProperties
 
+from geometry_io import (
+    UINT16,
+    as_points,
+    format_points,
+    index_dtype,
+    pack_float32,
+    pack_indices,
+    quantize_normals,
+    quantize_positions,
+)
+from gltf_export import mesh_arrays_from_tesselator
+from scene_server import start_scene_server
+from parallel_display import display_items, run_display_jobs, worker_count
+from shape_cache import shape_from_bytes, shape_to_bytes
+from mesh_lod import DEFAULT_LOD_FACTORS, lod_name, unmeshed_copy
+from x3d_writer import X3DWriter
+
+# ascii embeds the tesselator TriangleSet text in the x3d files, binary and
+# quantized write X3DOM BinaryGeometry buffers (float32, or int16 coordinates
+# and int8 normals) next to them
+MESH_FORMATS = ("ascii", "binary", "quantized")
+
+
 def calculate_shape_properties(shape):
     props = GProp_GProps()
     brepgprop_VolumeProperties(shape, props)
@@ -53,20 +75,6 @@ def spinning_cursor():
         yield from "|/-\\"
 
 
-X3DFILE_HEADER_TEMPLATE = Template(
-    """<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE X3D PUBLIC "ISO//Web3D//DTD X3D 3.3//EN" "http://www.web3d.org/specifications/x3d-3.3.dtd">
-<X3D profile="Immersive" version="3.3" xmlns:xsd="http://www.w3.org/2001/XMLSchema-instance" xsd:noNamespaceSchemaLocation="http://www.web3d.org/specifications/x3d-3.3.xsd">
-<head>
-    <meta name="generator" content="xlogic-$VERSION X3D exporter (www.xlogiclabs.com)"/>
-    <meta name="creator" content="xlogic-$VERSION generator"/>
-    <meta name="identifier" content="http://www.xlogiclabs.com"/>
-    <meta name="description" content="xlogic-$VERSION x3dom based shape rendering"/>
-</head>
-<Scene>
-"""
-)
-
 HEADER_TEMPLATE = Template(
     """
 <head>
@@ -182,10 +190,22 @@ BODY_TEMPLATE = Template(
     var selected_target_color = null;
     var current_selected_shape = null;
     var current_mat = null;
+    // levels of detail: a finer Inline replaces the shown one once loaded
+    function showLevel(inline) {
+        var group = inline.parentNode;
+        var level = parseInt(inline.getAttribute('data-level'));
+        if (level < parseInt(group.getAttribute('data-shown') || '-1')) return;
+        group.setAttribute('data-shown', level);
+        for (var sibling of group.children) {
+            sibling.setAttribute('render', sibling === inline ? 'true' : 'false');
+        }
+    }
     function fitCamera()
     {            
         var x3dElem = document.getElementById('xlogic-x3d-scene');            
         x3dElem.runtime.fitAll();
+        // time from navigation start to the last shape loaded, to compare mesh formats
+        console.log('scene loaded in ' + Math.round(performance.now()) + ' ms');
     }
     function select(the_shape) // called whenever a shape is clicked
     {
@@ -227,38 +247,95 @@ BODY_TEMPLATE = Template(
 )
 
 
-def export_edge_to_indexed_lineset(edge_point_set):
-    str_x3d_to_return = f"\t<LineSet vertexCount='{len(edge_point_set)}'>"
-    str_x3d_to_return += "<Coordinate point='"
-    for p in edge_point_set:
-        str_x3d_to_return += f"{p[0]} {p[1]} {p[2]} "
-    str_x3d_to_return += "'/></LineSet>\n"
-    return str_x3d_to_return
+def export_edge_to_indexed_lineset(edge_point_set, precision=7):
+    """precision is the number of significant digits of the coordinates,
+    7 is about what the float32 vertex buffers of the browser keep"""
+    points = as_points(edge_point_set)
+    return (
+        f"\t<LineSet vertexCount='{len(points)}'>"
+        f"<Coordinate point='{format_points(points, precision)}'/></LineSet>\n"
+    )
+
+
+# Function to stream polylines to an X3D writer, as a group of LineSets
+def write_linesets(writer, point_sets, precision=7):
+    # below '0' means show all
+    # -1 means doesn't show line
+    # the "Switch" node selects the group to be displayed
+    writer.start("Switch", {"whichChoice": 0, "id": "swBRP"})
+    writer.start("Group")
+    for ils_id, point_set in enumerate(point_sets):
+        writer.start("Transform", {"scale": "1 1 1"})
+        writer.start("Shape", {"DEF": f"edg{ils_id}"})
+        # empty appearance, but the x3d validator complains if nothing set
+        writer.raw("<Appearance><Material emissiveColor='0 0 0'/></Appearance>")
+        writer.raw(export_edge_to_indexed_lineset(point_set, precision))
+        writer.end("Shape")
+        writer.end("Transform")
+    writer.end("Group")
+    writer.end("Switch")
 
 
 def indexed_lineset_to_x3d_string(str_linesets, header=True, footer=True, ils_id=0):
     """takes an str_lineset, coming for instance from export_curve_to_ils,
     and export to an X3D string"""
-    x3dfile_str = (
-        X3DFILE_HEADER_TEMPLATE.substitute({"VERSION": f"{VERSION}"}) if header else ""
-    )
-    x3dfile_str += "<Switch whichChoice='0' id='swBRP'>\n"
-    x3dfile_str += "\t<Group>\n"
-
+    output = io.StringIO()
+    writer = X3DWriter(output)
+    if header:
+        writer.header(VERSION)
+    writer.start("Switch", {"whichChoice": 0, "id": "swBRP"})
+    writer.start("Group")
     for ils_id, str_lineset in enumerate(str_linesets):
-        x3dfile_str += f"\t\t<Transform scale='1 1 1'><Shape DEF='edg{ils_id}'>\n"
-        # empty appearance, but the x3d validator complains if nothing set
-        x3dfile_str += (
-            "\t\t\t<Appearance><Material emissiveColor='0 0 0'/></Appearance>\n\t\t"
-        )
-        x3dfile_str += str_lineset
-        x3dfile_str += "\t\t</Shape></Transform>\n"
-    x3dfile_str += "\t</Group>\n"
-    x3dfile_str += "</Switch>\n"
+        writer.start("Transform", {"scale": "1 1 1"})
+        writer.start("Shape", {"DEF": f"edg{ils_id}"})
+        writer.raw("<Appearance><Material emissiveColor='0 0 0'/></Appearance>")
+        writer.raw(str_lineset)
+        writer.end("Shape")
+        writer.end("Transform")
+    writer.end("Group")
+    writer.end("Switch")
     if footer:
-        x3dfile_str += "</Scene>\n</X3D>\n"
+        writer.footer()
+    return output.getvalue()
+
+
+# Function to write an X3D file holding only polylines, e.g. a discretized edge or wire
+def write_lineset_file(file_path, point_sets, compress=False, validate=False):
+    with X3DWriter(file_path, compress=compress, validate=validate) as writer:
+        writer.header(VERSION)
+        write_linesets(writer, point_sets)
+        writer.footer()
+
+
+# Function to write the coarse levels of detail of a shape next to its x3d file
+def write_lod_files(shape, x3d_filename, shape_id, exporter_options, lod_factors, validate=False):
+    """Levels are meshed coarsest first, without edges. The page shows the
+    coarsest one as soon as it is downloaded and swaps in the finer ones.
 
-    return x3dfile_str
+    Returns:
+        the bytes written
+    """
+    if not lod_factors:
+        return 0
+    # the shape holds the full mesh, which BRepMesh would keep as is
+    shape = unmeshed_copy(shape)
+    base_path = os.path.splitext(x3d_filename)[0]
+    file_size = 0
+    for level, factor in enumerate(lod_factors):
+        lod_exporter = X3DExporter(
+            shape,
+            **dict(
+                exporter_options,
+                export_edges=False,
+                mesh_quality=exporter_options["mesh_quality"] * factor,
+            ),
+        )
+        lod_exporter.compute()
+        file_paths = lod_exporter.write_to_file(
+            f"{lod_name(base_path, level)}.x3d", f"{shape_id}_lod{level}", validate=validate
+        )
+        file_size += sum(os.path.getsize(file_path) for file_path in file_paths)
+    return file_size
 
 
 class HTMLHeader:
@@ -277,14 +354,16 @@ class HTMLHeader:
 
 
 class HTMLBody:
-    def __init__(self, x3d_shapes, axes_plane, axes_plane_zoom_factor=1.0, part_names=None, part_properties=None):
-        """x3d_shapes is a list that contains uid for each shape"""
+    def __init__(self, x3d_shapes, axes_plane, axes_plane_zoom_factor=1.0, part_names=None, part_properties=None, lod_levels=0):
+        """x3d_shapes is a list that contains uid for each shape, the shp
+        ones having lod_levels coarse levels of detail"""
         self._x3d_shapes = x3d_shapes
         self.spinning_cursor = spinning_cursor()
         self._display_axes_plane = axes_plane
         self._axis_plane_zoom_factor = axes_plane_zoom_factor
         self._part_names = part_names or []
         self._part_properties = part_properties or {}
+        self._lod_levels = lod_levels
 
     def get_str(self):
         # get the location where xlogic is running from
@@ -309,6 +388,21 @@ class HTMLBody:
             )
             sys.stdout.flush()
             # only the last downloaded shape raises a fitCamera event
+            if shp_uid.startswith("shp") and self._lod_levels:
+                # one Inline per level of detail, the coarsest shown first
+                urls = [lod_name(shp_uid, level) for level in range(self._lod_levels)] + [shp_uid]
+                x3dcontent += "\t\t\t<Group>\n"
+                for level, url in enumerate(urls):
+                    onload = "showLevel(this);"
+                    if cur_shp == nb_shape and level == 0:
+                        onload += " fitCamera();"
+                    render = "" if level == 0 else ' render="false"'
+                    x3dcontent += (
+                        f'\t\t\t\t<Inline data-level="{level}"{render} onload="{onload}" '
+                        f'mapDEFToID="true" url="{url}.x3d"></Inline>\n'
+                    )
+                x3dcontent += "\t\t\t</Group>\n"
+                continue
             x3dcontent += "\t\t\t<Inline "
             if cur_shp == nb_shape:
                 x3dcontent += 'onload="fitCamera() "'
@@ -344,6 +438,7 @@ class X3DExporter:
         line_color,  # edge color
         line_width,  # edge liewidth,
         mesh_quality,  # mesh quality default is 1., good is <1, bad is >1
+        mesh_format="ascii",  # one of MESH_FORMATS
     ):
         self._shape = shape
         self._vs = vertex_shader
@@ -357,79 +452,142 @@ class X3DExporter:
         # the list of indexed face sets that compose the shape
         # if ever the map_faces_to_mesh option is enabled, this list
         # maybe composed of dozains of TriangleSet
-        self._triangle_sets = []
-        self._line_sets = []
-        self._x3d_string = ""  # the string that contains the x3d description
+        if mesh_format not in MESH_FORMATS:
+            raise ValueError(f"mesh_format must be one of {MESH_FORMATS}, not {mesh_format!r}")
+        self._mesh_format = mesh_format
+        self._tesselator = None
+        self._binary_geometry = None  # BinaryGeometry attributes, once the buffers are written
 
     def compute(self):
-        shape_tesselator = ShapeTesselator(self._shape)
-        shape_tesselator.Compute(
+        self._tesselator = ShapeTesselator(self._shape)
+        self._tesselator.Compute(
             compute_edges=self._export_edges,
             mesh_quality=self._mesh_quality,
             parallel=True,
         )
-        self._triangle_sets.append(shape_tesselator.ExportShapeToX3DTriangleSet())
-        # then process edges
-        if self._export_edges:
-            # get number of edges
-            nbr_edges = shape_tesselator.ObjGetEdgeCount()
-            for i_edge in range(nbr_edges):
-                nbr_vertices = shape_tesselator.ObjEdgeGetVertexCount(i_edge)
-                edge_point_set = [
-                    shape_tesselator.GetEdgeVertex(i_edge, i_vert)
-                    for i_vert in range(nbr_vertices)
-                ]
-                ils = export_edge_to_indexed_lineset(edge_point_set)
-                self._line_sets.append(ils)
 
-    def to_x3dfile_string(self, shape_id):
-        x3dfile_str = X3DFILE_HEADER_TEMPLATE.substitute({"VERSION": f"{VERSION}"})
-        for i, triangle_set in enumerate(self._triangle_sets):
-            x3dfile_str += "<Switch whichChoice='0' id='swBRP'>"
-            x3dfile_str += f"<Transform scale='1 1 1'>\n<Shape DEF='shape{shape_id}_{i}' onclick='selectShape(this);' onmouseover='highlightShape(this);' onmouseout='unhighlightShape(this);'>\n"
-            x3dfile_str += "<Appearance>\n"
-            #
-            # set Material or shader
-            #
-            if self._vs is None and self._fs is None:
-                x3dfile_str += "<Material id='color' diffuseColor="
-                x3dfile_str += f"'{self._color[0]} {self._color[1]} {self._color[2]}' "
-                x3dfile_str += f"shininess='{self._shininess}' "
-                x3dfile_str += f"specularColor='{self._specular_color[0]} {self._specular_color[1]} {self._specular_color[2]}' "
-                x3dfile_str += f"transparency='{self._transparency}'/>\n"
-            else:  # set shaders
-                x3dfile_str += (
-                    '<ComposedShader><ShaderPart type="VERTEX" style="display:none;">\n'
-                )
-                x3dfile_str += self._vs
-                x3dfile_str += "</ShaderPart>\n"
-                x3dfile_str += '<ShaderPart type="FRAGMENT" style="display:none;">\n'
-                x3dfile_str += self._fs
-                x3dfile_str += "</ShaderPart></ComposedShader>\n"
-            x3dfile_str += "</Appearance>\n"
-            # export triangles
-            x3dfile_str += triangle_set
-            x3dfile_str += "</Shape></Transform></Switch>\n"
-        # and now, process edges
-        if self._export_edges:
-            # below '0' means show all
-            # -1 means doesn't show line
-            # the "Switch" node selects the group to be displayed
+    def _edge_point_sets(self):
+        # yields the edges one by one, they are written as soon as read
+        for i_edge in range(self._tesselator.ObjGetEdgeCount()):
+            nbr_vertices = self._tesselator.ObjEdgeGetVertexCount(i_edge)
+            yield [
+                self._tesselator.GetEdgeVertex(i_edge, i_vert)
+                for i_vert in range(nbr_vertices)
+            ]
 
-            x3dfile_str += indexed_lineset_to_x3d_string(
-                self._line_sets, header=False, footer=False
-            )
-        x3dfile_str += "</Scene>\n</X3D>\n"
+    def write_binary_buffers(self, base_path):
+        """Writes the index, coordinate and normal buffers of the mesh next to the x3d file.
 
+        Returns:
+            the paths of the written files
+        """
+        positions, normals, indices = mesh_arrays_from_tesselator(self._tesselator)
+        positions = as_points(positions)
+        vertex_count = len(positions)
+        name = os.path.basename(base_path)
+        buffers = {"index": pack_indices(indices, vertex_count)}
+        attributes = {
+            "vertexCount": len(indices),
+            "primType": '"TRIANGLES"',
+            "index": f"{name}.index.bin",
+            "indexType": "Uint16" if index_dtype(vertex_count) == UINT16 else "Uint32",
+            "coord": f"{name}.coord.bin",
+            "solid": "false",
+        }
+        if self._mesh_format == "quantized":
+            coords, center, size = quantize_positions(positions)
+            buffers["coord"] = coords.tobytes()
+            attributes.update({"coordType": "Int16", "position": center.tolist(), "size": size.tolist()})
+        else:
+            buffers["coord"] = pack_float32(positions)
+            attributes["coordType"] = "Float32"
+        if len(normals) == len(positions) * 3:
+            attributes.update({"normal": f"{name}.normal.bin", "normalPerVertex": "true"})
+            if self._mesh_format == "quantized":
+                buffers["normal"] = quantize_normals(normals).tobytes()
+                attributes["normalType"] = "Int8"
+            else:
+                buffers["normal"] = pack_float32(as_points(normals))
+                attributes["normalType"] = "Float32"
+        file_paths = []
+        for kind, data in buffers.items():
+            file_path = f"{base_path}.{kind}.bin"
+            with open(file_path, "wb") as f:
+                f.write(data)
+            file_paths.append(file_path)
+        self._binary_geometry = attributes
+        return file_paths
+
+    def write(self, writer, shape_id):
+        """Streams the x3d description of the shape to an X3DWriter"""
+        writer.header(VERSION)
+        writer.start("Switch", {"whichChoice": 0, "id": "swBRP"})
+        writer.start("Transform", {"scale": "1 1 1"})
+        writer.start(
+            "Shape",
+            {
+                "DEF": f"shape{shape_id}_0",
+                "onclick": "selectShape(this);",
+                "onmouseover": "highlightShape(this);",
+                "onmouseout": "unhighlightShape(this);",
+            },
+        )
+        writer.start("Appearance")
         #
-        # use ElementTree to ensure xml file quality
+        # set Material or shader
         #
-        xml_et = ElementTree.fromstring(x3dfile_str)
-        return ElementTree.tostring(xml_et, encoding="utf8").decode("utf8")
+        if self._vs is None and self._fs is None:
+            writer.element(
+                "Material",
+                {
+                    "id": "color",
+                    "diffuseColor": self._color,
+                    "shininess": self._shininess,
+                    "specularColor": self._specular_color,
+                    "transparency": self._transparency,
+                },
+            )
+        else:  # set shaders
+            writer.start("ComposedShader")
+            writer.start("ShaderPart", {"type": "VERTEX", "style": "display:none;"})
+            writer.text(self._vs)
+            writer.end("ShaderPart")
+            writer.start("ShaderPart", {"type": "FRAGMENT", "style": "display:none;"})
+            writer.text(self._fs)
+            writer.end("ShaderPart")
+            writer.end("ComposedShader")
+        writer.end("Appearance")
+        if self._binary_geometry is not None:
+            # triangles live in the binary buffers, X3DOM fetches them itself
+            writer.element("BinaryGeometry", self._binary_geometry)
+        else:
+            # export triangles, the only large string held in memory
+            writer.raw(self._tesselator.ExportShapeToX3DTriangleSet())
+        writer.end("Shape")
+        writer.end("Transform")
+        writer.end("Switch")
+        # and now, process edges
+        if self._export_edges:
+            write_linesets(writer, self._edge_point_sets())
+        writer.footer()
 
-    def write_to_file(self, filename, shape_id):
-        with open(filename, "w") as f:
-            f.write(self.to_x3dfile_string(shape_id))
+    def to_x3dfile_string(self, shape_id):
+        output = io.StringIO()
+        self.write(X3DWriter(output), shape_id)
+        return output.getvalue()
+
+    def write_to_file(self, filename, shape_id, compress=False, validate=False):
+        """compress writes a gzip file, validate checks the XML as it is written (slow, for debugging)
+
+        Returns:
+            the paths of the written files, the x3d file first
+        """
+        file_paths = [filename]
+        if self._mesh_format != "ascii":
+            file_paths += self.write_binary_buffers(os.path.splitext(filename)[0])
+        with X3DWriter(filename, compress=compress, validate=validate) as writer:
+            self.write(writer, shape_id)
+        return file_paths
 
     # Add a method to detect circular areas
     def detect_circular_areas(self):
@@ -440,8 +598,27 @@ class X3DExporter:
 
 
 class XLogicX3DomRenderer:
-    def __init__(self, path=None, display_axes_plane=True, axes_plane_zoom_factor=1.0):
+    def __init__(
+        self,
+        path=None,
+        display_axes_plane=True,
+        axes_plane_zoom_factor=1.0,
+        validate_x3d=False,
+        mesh_format="ascii",
+        lod_factors=DEFAULT_LOD_FACTORS,
+    ):
+        """validate_x3d checks the XML of every written x3d file, for debugging,
+        mesh_format is one of MESH_FORMATS, lod_factors the mesh_quality
+        multipliers of the coarse levels of detail, coarsest first, e.g.
+        mesh_lod.COARSE_LOD_FACTORS for large parts, none by default"""
+        if mesh_format not in MESH_FORMATS:
+            raise ValueError(f"mesh_format must be one of {MESH_FORMATS}, not {mesh_format!r}")
         self._path = tempfile.mkdtemp() if not path else path
+        self._validate = validate_x3d
+        self._mesh_format = mesh_format
+        self._lod_factors = tuple(lod_factors)
+        self._file_sizes = {}  # shape hash -> bytes written for it
+        self.spinning_cursor = spinning_cursor()
         self._html_filename = os.path.join(self._path, "index.html")
         self._x3d_shapes = {}
         self._x3d_edges = {}
@@ -477,13 +654,8 @@ class XLogicX3DomRenderer:
             print("X3D exporter, discretize an edge")
             pnts = discretize_edge(shape)
             edge_hash = f"edg{uuid.uuid4().hex}"
-            line_set = export_edge_to_indexed_lineset(pnts)
-            x3dfile_content = indexed_lineset_to_x3d_string(
-                [line_set], ils_id=edge_hash
-            )
             edge_full_path = os.path.join(self._path, f"{edge_hash}.x3d")
-            with open(edge_full_path, "w") as edge_file:
-                edge_file.write(x3dfile_content)
+            write_lineset_file(edge_full_path, [pnts], validate=self._validate)
             # store this edge hash
             self._x3d_edges[edge_hash] = [color, line_width]
             return self._x3d_shapes, self._x3d_edges
@@ -492,32 +664,28 @@ class XLogicX3DomRenderer:
             print("X3D exporter, discretize a wire")
             pnts = discretize_wire(shape)
             wire_hash = f"wir{uuid.uuid4().hex}"
-            line_set = export_edge_to_indexed_lineset(pnts)
-            x3dfile_content = indexed_lineset_to_x3d_string(
-                [line_set], ils_id=wire_hash
-            )
             wire_full_path = os.path.join(self._path, f"{wire_hash}.x3d")
-            with open(wire_full_path, "w") as wire_file:
-                wire_file.write(x3dfile_content)
+            write_lineset_file(wire_full_path, [pnts], validate=self._validate)
             # store this edge hash
             self._x3d_edges[wire_hash] = [color, line_width]
             return self._x3d_shapes, self._x3d_edges
 
         shape_uuid = uuid.uuid4().hex
         shape_hash = f"shp{shape_uuid}"
-        x3d_exporter = X3DExporter(
-            shape,
-            vertex_shader,
-            fragment_shader,
-            export_edges,
-            color,
-            specular_color,
-            shininess,
-            transparency,
-            line_color,
-            line_width,
-            mesh_quality,
-        )
+        exporter_options = {
+            "vertex_shader": vertex_shader,
+            "fragment_shader": fragment_shader,
+            "export_edges": export_edges,
+            "color": color,
+            "specular_color": specular_color,
+            "shininess": shininess,
+            "transparency": transparency,
+            "line_color": line_color,
+            "line_width": line_width,
+            "mesh_quality": mesh_quality,
+            "mesh_format": self._mesh_format,
+        }
+        x3d_exporter = X3DExporter(shape, **exporter_options)
         x3d_exporter.compute()
         circular_areas = x3d_exporter.detect_circular_areas()
         
@@ -534,7 +702,11 @@ class XLogicX3DomRenderer:
         x3d_filename = os.path.join(self._path, f"{shape_hash}.x3d")
         # the x3d filename is computed from the shape hash
         shape_id = len(self._x3d_shapes)
-        x3d_exporter.write_to_file(x3d_filename, shape_id)
+        file_paths = x3d_exporter.write_to_file(x3d_filename, shape_id, validate=self._validate)
+        self._file_sizes[shape_hash] = sum(os.path.getsize(file_path) for file_path in file_paths)
+        self._file_sizes[shape_hash] += write_lod_files(
+            shape, x3d_filename, shape_id, exporter_options, self._lod_factors, self._validate
+        )
 
         self._x3d_shapes[shape_hash] = [
             export_edges,
@@ -552,12 +724,112 @@ class XLogicX3DomRenderer:
 
         return self._x3d_shapes, self._x3d_edges
 
+    def DisplayShapes(
+        self,
+        items,
+        workers=None,
+        vertex_shader=None,
+        fragment_shader=None,
+        export_edges=False,
+        specular_color=(0.2, 0.2, 0.2),
+        shininess=0.9,
+        transparency=0.0,
+        line_color=(0, 0.0, 0.0),
+        line_width=2.0,
+        mesh_quality=1.0,
+    ):
+        """Adds many shapes at once, e.g. the solids of an assembly, tessellated
+        over a pool of worker processes that write their x3d files as they complete.
+        items are shapes or (shape, color, name) tuples, the name becoming the part
+        name, workers=None uses all cores
+        """
+        items = display_items(items)
+        if worker_count(workers, len(items)) == 1:
+            for shape, color, name in items:
+                self.DisplayShape(
+                    shape, vertex_shader, fragment_shader, export_edges, color,
+                    specular_color, shininess, transparency, line_color, line_width,
+                    mesh_quality, part_name=name,
+                )
+            return self._x3d_shapes, self._x3d_edges
+        jobs = []
+        job_hashes = []
+        for shape, color, name in items:
+            if is_edge(shape) or is_wire(shape):
+                # cheap to discretize, they stay in this process
+                self.DisplayShape(shape, color=color, line_width=line_width)
+                continue
+            shape_hash = f"shp{uuid.uuid4().hex}"
+            exporter_options = {
+                "vertex_shader": vertex_shader,
+                "fragment_shader": fragment_shader,
+                "export_edges": export_edges,
+                "color": color,
+                "specular_color": specular_color,
+                "shininess": shininess,
+                "transparency": transparency,
+                "line_color": line_color,
+                "line_width": line_width,
+                "mesh_quality": mesh_quality,
+                "mesh_format": self._mesh_format,
+            }
+            # shapes keep the order of the items in the page, whatever the completion order
+            shape_id = len(self._x3d_shapes)
+            self._x3d_shapes[shape_hash] = [
+                export_edges,
+                color,
+                specular_color,
+                shininess,
+                transparency,
+                line_color,
+                line_width,
+            ]
+            if name:
+                self._part_names.append(name)
+            jobs.append(
+                (
+                    shape_to_bytes(shape, with_triangles=False),
+                    os.path.join(self._path, f"{shape_hash}.x3d"),
+                    shape_id,
+                    exporter_options,
+                    self._lod_factors,
+                    self._validate,
+                    bool(name),
+                )
+            )
+            job_hashes.append((shape_hash, name))
+        for job_index, (file_size, properties) in run_display_jobs(_export_x3d_shape, jobs, workers):
+            shape_hash, name = job_hashes[job_index]
+            self._file_sizes[shape_hash] = file_size
+            if name:
+                self._part_properties[name] = properties
+            sys.stdout.write(
+                "\r%s mesh shape %s, %i/%i     "
+                % (next(self.spinning_cursor), shape_hash, len(self._file_sizes), len(jobs))
+            )
+            sys.stdout.flush()
+        return self._x3d_shapes, self._x3d_edges
+
+    def size_report(self):
+        """Bytes written for the displayed shapes, x3d files and binary buffers"""
+        return {
+            "mesh_format": self._mesh_format,
+            "shapes": len(self._file_sizes),
+            "total_bytes": sum(self._file_sizes.values()),
+            "largest_shape_bytes": max(self._file_sizes.values(), default=0),
+        }
+
     def render(self, addr="localhost", server_port=8080, open_webbrowser=False):
         """Call the render() method to display the X3D scene."""
         # first generate the HTML root file
         self.generate_html_file(self._axes_plane, self._axes_plane_zoom_factor)
-        # then create a simple web server
-        start_server(addr, server_port, self._path, open_webbrowser)
+        report = self.size_report()
+        print(
+            f"\n## {report['shapes']} shapes, {report['total_bytes'] / 1024:.1f} KiB of "
+            f"{report['mesh_format']} geometry, largest {report['largest_shape_bytes'] / 1024:.1f} KiB"
+        )
+        # then serve the folder, compressed and with cache headers
+        start_scene_server(addr, server_port, self._path, open_webbrowser)
 
     def generate_html_file(self, axes_plane, axes_plane_zoom_factor):
         """Generate the HTML file to be rendered wy the web browser
@@ -572,7 +844,14 @@ class XLogicX3DomRenderer:
             # merge shapes and edges keys
             all_shapes = list(self._x3d_shapes) + list(self._x3d_edges)
             html_file.write(
-                HTMLBody(all_shapes, axes_plane, axes_plane_zoom_factor, self._part_names, self._part_properties).get_str()
+                HTMLBody(
+                    all_shapes,
+                    axes_plane,
+                    axes_plane_zoom_factor,
+                    self._part_names,
+                    self._part_properties,
+                    lod_levels=len(self._lod_factors),
+                ).get_str()
             )
             html_file.write("</html>\n")
 
@@ -580,3 +859,19 @@ class XLogicX3DomRenderer:
         # Implement the logic to create X3D content for a circular area
         # This is a placeholder and will depend on how you represent circular areas
         return f"<Shape><Cylinder radius='{area['radius']}' height='0.1'/></Shape>"
+
+
+# Function to export one shape to its x3d file in a DisplayShapes worker process
+def _export_x3d_shape(data, x3d_filename, shape_id, exporter_options, lod_factors, validate, with_properties):
+    """
+    Returns:
+        the bytes written, and the shape properties when asked for
+    """
+    shape = shape_from_bytes(data)
+    x3d_exporter = X3DExporter(shape, **exporter_options)
+    x3d_exporter.compute()
+    file_paths = x3d_exporter.write_to_file(x3d_filename, shape_id, validate=validate)
+    file_size = sum(os.path.getsize(file_path) for file_path in file_paths)
+    file_size += write_lod_files(shape, x3d_filename, shape_id, exporter_options, lod_factors, validate)
+    properties = calculate_shape_properties(shape) if with_properties else None
+    return file_size, properties
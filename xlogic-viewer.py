@@ -1,20 +1,23 @@
 from OCC.Extend.DataExchange import read_step_file_with_names_colors
 from xLogic_x3dom_renderer import XLogicX3DomRenderer
 
-filename = "models/suspension.stp"
-shapes_labels_colors = read_step_file_with_names_colors(filename)
+# DisplayShapes starts worker processes, which import this script again
+# under spawn, so nothing may run at import time
+if __name__ == "__main__":
+    filename = "models/suspension.stp"
+    shapes_labels_colors = read_step_file_with_names_colors(filename)
 
-# create the xlogic x3dom renderer
-my_renderer = XLogicX3DomRenderer()
+    # create the xlogic x3dom renderer
+    my_renderer = XLogicX3DomRenderer()
 
-# traverse shapes, render in "face" mode
-for shp in shapes_labels_colors:
-    label, c = shapes_labels_colors[shp]
-    my_renderer.DisplayShape(
-        shp, 
-        color=(c.Red(), c.Green(), c.Blue()), 
+    # render every solid in "face" mode, tessellated over all the cores,
+    # the label becomes the part name
+    my_renderer.DisplayShapes(
+        [
+            (shp, (c.Red(), c.Green(), c.Blue()), label)
+            for shp, (label, c) in shapes_labels_colors.items()
+        ],
         export_edges=False,
-        part_name=label  # Pass the part name here
     )
 
-my_renderer.render()
\ No newline at end of file
+    my_renderer.render()